@@ -3,84 +3,212 @@
 Generate evaluation dataset from receipt images and ground truth data.
 """
 import asyncio
-import json
 from pathlib import Path
 import sys
+from typing import Optional, Sequence
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.evaluation_pipeline import DatasetWriter, EvaluationPipeline
+from src.services.prediction_cache import cache_from_options
+from src.utils.dataset_shards import DatasetShard
+
+# Ensure paths are relative to the parent directory (one level higher)
+BASE_DIR = Path(__file__).parent.parent
+
+
+def _resolve(path: Path) -> Path:
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def print_progress(completed: int, total: int, image_name: str, error: Optional[str]) -> None:
+    """Print one line per processed image."""
+    status = f"❌ {error}" if error else "✅"
+    print(f"[{completed}/{total}] {image_name} {status}")
+
+
+def labelled_images(image_dir: Path, ground_truth_dir: Path) -> Sequence[str]:
+    """Names of the images in ``image_dir`` that have both ground truth files."""
+    return [
+        path.name for path in sorted(image_dir.glob("*.jpg"))
+        if (ground_truth_dir / "extraction" / f"{path.stem}.json").exists()
+        and (ground_truth_dir / "audit_results" / f"{path.stem}.json").exists()
+    ]
 
 
 async def generate_dataset_from_images(
     image_dir: Path,
     ground_truth_dir: Path,
     output_file: Path,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    concurrency: Optional[int] = None,
+    resume: bool = False,
+    no_cache: bool = False,
+    refresh: Optional[str] = None,
+    shard: Optional[Path] = None,
+    pipeline: Optional[EvaluationPipeline] = None
 ) -> None:
-    """Generate dataset by processing images and comparing with ground truth."""
-    # Ensure paths are relative to the parent directory (one level higher)
-    base_dir = Path(__file__).parent.parent
-    image_dir = base_dir / image_dir if not image_dir.is_absolute() else image_dir
-    ground_truth_dir = base_dir / ground_truth_dir if not ground_truth_dir.is_absolute() else ground_truth_dir
-    output_file = base_dir / output_file if not output_file.is_absolute() else output_file
-
-    # Use the evaluation pipeline's create_dataset_content function
-    pipeline = EvaluationPipeline()
-    dataset = await pipeline.create_dataset_content(
-        image_dir,
-        ground_truth_dir, 
-        model
-    )
-    
-    # Save dataset
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w') as f:
-        for record in dataset:
-            f.write(json.dumps(record) + '\n')
-    
-    print(f"Generated dataset with {len(dataset)} records: {output_file}")
+    """
+    Generate dataset by processing images and comparing with ground truth.
+
+    Records are streamed from the pipeline as they complete and appended to
+    ``output_file`` in fsynced batches, so memory doesn't grow with the
+    dataset; with ``resume`` images already in it are skipped. Images without
+    ground truth are skipped up front. With ``shard`` (a dataset shard index)
+    images and ground truth are read from the shard instead. Predictions are
+    reused from the prediction cache unless ``no_cache`` is set or
+    ``refresh`` names the stage.
+    """
+    image_dir = _resolve(image_dir)
+    ground_truth_dir = _resolve(ground_truth_dir)
+    output_file = _resolve(output_file)
+    pipeline = pipeline or EvaluationPipeline(cache=cache_from_options(no_cache, refresh))
+
+    dataset_shard = DatasetShard(_resolve(shard)) if shard else None
+    if dataset_shard:
+        unlabelled = {record.name for record in dataset_shard if record.ground_truth is None}
+        names = [name for name in dataset_shard.names() if name not in unlabelled]
+    else:
+        names = labelled_images(image_dir, ground_truth_dir)
+        unlabelled = {path.name for path in image_dir.glob("*.jpg")} - set(names)
+    if unlabelled:
+        print(f"Skipping {len(unlabelled)} images without ground truth")
+
+    written = failed = 0
+    try:
+        with DatasetWriter(output_file, resume=resume) as writer:
+            skip = writer.completed | unlabelled
+            total = len(names)
+            completed = sum(name in writer.completed for name in names)
+            if dataset_shard:
+                stream = pipeline.stream_shard(dataset_shard, model, concurrency, skip=skip)
+            else:
+                stream = pipeline.stream_dataset(image_dir, ground_truth_dir, model, concurrency, skip=skip)
+            async for result in stream:
+                completed += 1
+                if result.error is None:
+                    writer.write({"item": result.record.model_dump()})
+                    written += 1
+                else:
+                    failed += 1
+                print_progress(completed, total, result.name, result.error)
+            resumed = len(writer.completed)
+    finally:
+        if dataset_shard:
+            dataset_shard.close()
+
+    print(f"Generated dataset with {resumed + written} records ({written} new, {failed} failed): {output_file}")
+    if pipeline.cache is not None:
+        print(f"Prediction cache: {pipeline.cache.summary()}")
 
 
 async def main():
     """Main function."""
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Generate evaluation dataset")
     parser.add_argument(
-        "--image-dir", 
-        type=Path, 
-        default=Path("data/test"),
+        "--image-dir",
+        type=Path,
+        default=Path("scripts/data/test"),
         help="Directory containing receipt images"
     )
     parser.add_argument(
         "--ground-truth-dir",
         type=Path,
-        default=Path("data/ground_truth"),
+        default=Path("scripts/data/ground_truth"),
         help="Directory containing ground truth data"
     )
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("data/evaluation_dataset.jsonl"),
+        default=Path("scripts/data/evaluation_dataset.jsonl"),
         help="Output file for dataset"
     )
+    parser.add_argument(
+        "--split",
+        dest="splits",
+        action="append",
+        choices=["train", "valid", "test"],
+        help="Generate DATA_DIR/<split> into OUTPUT_DIR/<split>.jsonl instead of --image-dir (repeatable)"
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path("scripts/data"),
+        help="Directory containing the split directories"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("scripts/data/datasets"),
+        help="Output directory for --split datasets"
+    )
+    parser.add_argument(
+        "--shard-dir",
+        type=Path,
+        default=None,
+        help="Read --split images and ground truth from the dataset shards in this directory"
+    )
     parser.add_argument(
         "--model",
         default="gpt-4o-mini",
         help="Model to use for predictions"
     )
-    
-    args = parser.parse_args()
-    
-    await generate_dataset_from_images(
-        args.image_dir,
-        args.ground_truth_dir,
-        args.output,
-        args.model
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Receipts processed at once (default: EVAL_CONCURRENCY)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip images already in the output file"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't reuse or store cached predictions"
+    )
+    parser.add_argument(
+        "--refresh",
+        choices=["all", "extraction", "audit"],
+        default=None,
+        help="Recompute cached predictions for these stages"
     )
 
+    args = parser.parse_args()
+
+    if not args.splits:
+        await generate_dataset_from_images(
+            args.image_dir,
+            args.ground_truth_dir,
+            args.output,
+            args.model,
+            args.concurrency,
+            args.resume,
+            args.no_cache,
+            args.refresh
+        )
+        return
+
+    # One pipeline so the splits share the prediction cache and its statistics
+    pipeline = EvaluationPipeline(cache=cache_from_options(args.no_cache, args.refresh))
+    for split in args.splits:
+        print(f"\n📂 {split}")
+        await generate_dataset_from_images(
+            args.data_dir / split,
+            args.ground_truth_dir,
+            args.output_dir / f"{split}.jsonl",
+            args.model,
+            args.concurrency,
+            args.resume,
+            shard=args.shard_dir / f"{split}.index.json" if args.shard_dir else None,
+            pipeline=pipeline
+        )
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
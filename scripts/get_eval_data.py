@@ -1,29 +1,47 @@
-import openai
+#!/usr/bin/env python3
+"""
+Download an eval run's output items and save their data source items.
+
+Items are cached per run (see ``src/services/eval_results.py``), so running
+this again only fetches items added since the last download.
+"""
+import argparse
+import asyncio
+import json
 import sys
 from pathlib import Path
 
 # Add parent directory to path so we can import src
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.core.config import settings
-
+from src.services.eval_results import download_run_items, format_grader_summary, grader_columns, summarize_graders
 
-openai.api_key = settings.OPENAI_API_KEY
-eval_id = "eval_687f196505888191b986d9e3ea173264"
-run_id = "evalrun_687f19659c108191b80f13e3e4124421"
+BASE_DIR = Path(__file__).parent.parent
 
-run = openai.evals.runs.retrieve(
-    eval_id=eval_id,
-    run_id=run_id,
-)
 
-# Save to file
-import json
+async def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Download eval run results")
+    parser.add_argument("--eval-id", required=True, help="Eval ID")
+    parser.add_argument("--run-id", required=True, help="Eval run ID")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("scripts/results.json"),
+        help="Output file for the run's data source items"
+    )
+    parser.add_argument("--refresh", action="store_true", help="Drop cached items and download the run again")
+    args = parser.parse_args()
 
-# Get all items from the content array
-all_items = [content_item.item for content_item in run.data_source.source.content]
+    run = await download_run_items(args.eval_id, args.run_id, refresh=args.refresh)
+    print(f"Downloaded {run.fetched} new items ({len(run.items)} total, {run.requests} requests)")
+    print(format_grader_summary(summarize_graders(grader_columns(run.items))))
 
-with open("scripts/results.json", "w") as f:
-    json.dump(all_items, f, indent=2)
+    output = args.output if args.output.is_absolute() else BASE_DIR / args.output
+    with open(output, "w") as f:
+        json.dump([item["datasource_item"] for item in run.items], f, indent=2)
+    print(f"Saved {len(run.items)} items to {output}")
 
 
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,14 +11,16 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.prediction_cache import cache_from_options
 from src.utils.graders import get_all_graders
 
 
 class NotebookEvaluator:
     """Evaluator class for notebook-style usage."""
     
-    def __init__(self, image_dir: Path = None, ground_truth_dir: Path = None):
-        self.pipeline = EvaluationPipeline()
+    def __init__(self, image_dir: Path = None, ground_truth_dir: Path = None,
+                 use_cache: bool = True, refresh: str = None):
+        self.pipeline = EvaluationPipeline(cache=cache_from_options(not use_cache, refresh))
         self.image_dir = image_dir or Path("scripts/data/test")
         self.ground_truth_dir = ground_truth_dir or Path("scripts/data/ground_truth")
         self.dataset = None
@@ -10,7 +10,11 @@ import sys
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from src.services.cost_analysis import format_cost_summary
 from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.model_comparison import compare_models as compare_models_concurrently, format_comparison
+from src.services.prediction_cache import cache_from_options
+from src.utils.dataset_shards import DatasetShard
 from src.utils.graders import get_all_graders
 
 
@@ -18,14 +22,54 @@ from src.utils.graders import get_all_graders
 @click.option('--name', required=True, help='Name for the evaluation run')
 @click.option('--image-dir', type=Path, default=Path("scripts/data/test"), help='Directory containing test images')
 @click.option('--ground-truth-dir', type=Path, default=Path("scripts/data/ground_truth"), help='Directory containing ground truth')
+@click.option('--shard', type=Path, default=None, help='Read images and ground truth from a dataset shard index (see build-shards) instead')
 @click.option('--model', default="gpt-4o-mini", help='Model to use for evaluation')
 @click.option('--compare-models', is_flag=True, help='Compare multiple models')
+@click.option('--models', default="gpt-4o-mini,gpt-4o", help='Comma-separated models for --compare-models')
+@click.option('--model-concurrency', default=None, type=int, help='Receipts in flight per model when comparing (default: --concurrency)')
+@click.option('--rpm', 'rpm_limits', multiple=True, help='MODEL=N receipts started per minute when comparing (repeatable)')
 @click.option('--use-example-graders', is_flag=True, help='Use minimal example graders (like notebook initial_eval)')
-def run_eval(name: str, image_dir: Path, ground_truth_dir: Path, model: str, compare_models: bool, use_example_graders: bool):
+@click.option('--concurrency', default=None, type=int, help='Receipts processed at once (default: EVAL_CONCURRENCY)')
+@click.option('--checkpoint-dir', type=Path, default=Path("scripts/data/checkpoints"), help='Directory for per-run JSONL checkpoints')
+@click.option('--resume', is_flag=True, help='Skip images already in the run\'s checkpoint')
+@click.option('--no-cache', is_flag=True, help='Don\'t reuse or store cached predictions')
+@click.option('--refresh', type=click.Choice(["all", "extraction", "audit"]), default=None, help='Recompute cached predictions for these stages')
+def run_eval(name: str, image_dir: Path, ground_truth_dir: Path, shard: Path, model: str, compare_models: bool, models: str,
+             model_concurrency: int, rpm_limits, use_example_graders: bool, concurrency: int, checkpoint_dir: Path, resume: bool, no_cache: bool, refresh: str):
     """Run evaluation following the notebook pattern."""
+    if compare_models:
+        # Comparison runs read the image directory and don't write checkpoints
+        ctx = click.get_current_context()
+        unsupported = [
+            option for option, param in (("--shard", "shard"), ("--checkpoint-dir", "checkpoint_dir"), ("--resume", "resume"))
+            if ctx.get_parameter_source(param) != click.core.ParameterSource.DEFAULT
+        ]
+        if unsupported:
+            raise click.UsageError(f"--compare-models can't be combined with {', '.join(unsupported)}")
+    
+    def print_progress(completed, total, image_name, error):
+        status = f"❌ {error}" if error else "✅"
+        print(f"  [{completed}/{total}] {image_name} {status}")
+    
+    async def create_dataset(run_name: str, model_name: str):
+        options = dict(
+            concurrency=concurrency,
+            checkpoint_path=checkpoint_dir / f"{run_name}.jsonl",
+            resume=resume,
+            on_progress=print_progress
+        )
+        if shard:
+            with DatasetShard(shard) as dataset_shard:
+                dataset = await pipeline.create_dataset_from_shard(dataset_shard, model_name, **options)
+        else:
+            dataset = await pipeline.create_dataset_content(image_dir, ground_truth_dir, model_name, **options)
+        if pipeline.cache is not None:
+            print(f"💾 Prediction cache: {pipeline.cache.summary()}")
+        return dataset
+    
+    pipeline = EvaluationPipeline(cache=cache_from_options(no_cache, refresh))
+    
     async def run():
-        pipeline = EvaluationPipeline()
-        
         # Choose graders - use example graders if requested (matches notebook)
         if use_example_graders:
             from src.utils.graders import get_example_graders
@@ -36,20 +80,33 @@ def run_eval(name: str, image_dir: Path, ground_truth_dir: Path, model: str, com
             print(f"🎯 Using all comprehensive graders (18+ graders)")
         
         if compare_models:
-            models = ["gpt-4o-mini", "gpt-4o"]
-            for model_name in models:
-                print(f"\n🔍 Running evaluation for {model_name}...")
-                
-                # Create dataset using create_dataset_content
-                dataset = await pipeline.create_dataset_content(
-                    image_dir, 
-                    ground_truth_dir,
-                    model_name
-                )
-                
-                # Run evaluation
-                result = await pipeline.create_and_run_eval(f"{name}-{model_name}", dataset, graders)
-                
+            model_names = [m.strip() for m in models.split(",") if m.strip()]
+            print(f"\n🔍 Comparing {', '.join(model_names)} concurrently...")
+            
+            # Images are read and preprocessed once and sent to all models at the same time
+            runs = await compare_models_concurrently(
+                pipeline,
+                image_dir,
+                ground_truth_dir,
+                model_names,
+                concurrency=concurrency,
+                model_concurrency=model_concurrency,
+                requests_per_minute={m: float(n) for m, n in (limit.split("=", 1) for limit in rpm_limits)},
+                on_progress=print_progress
+            )
+            if pipeline.cache is not None:
+                print(f"💾 Prediction cache: {pipeline.cache.summary()}")
+            print()
+            print(format_comparison([run.summary() for run in runs.values()]))
+            
+            # Run evaluations
+            results = await asyncio.gather(*(
+                pipeline.create_and_run_eval(f"{name}-{model_name}", run.items, graders)
+                for model_name, run in runs.items()
+            ))
+            for model_name, result in zip(runs, results):
+                print(f"\n💰 {model_name}")
+                print(format_cost_summary(result["cost_summary"]))
                 if result["status"] == "success":
                     print(f"✅ {model_name} evaluation created successfully!")
                     print(f"📊 View results at: {result['report_url']}")
@@ -59,14 +116,11 @@ def run_eval(name: str, image_dir: Path, ground_truth_dir: Path, model: str, com
             print(f"🔍 Running evaluation for {model}...")
             
             # Create dataset using create_dataset_content
-            dataset = await pipeline.create_dataset_content(
-                image_dir, 
-                ground_truth_dir,
-                model
-            )
+            dataset = await create_dataset(name, model)
             
             # Run evaluation
             result = await pipeline.create_and_run_eval(name, dataset, graders)
+            print(format_cost_summary(result["cost_summary"]))
             
             if result["status"] == "success":
                 print(f"✅ Evaluation created successfully!")
@@ -1,23 +1,29 @@
 """
 API dependencies using FastAPI's dependency injection.
 """
+from functools import lru_cache
 from typing import Annotated, List
 from pathlib import Path
 from fastapi import Depends, UploadFile, HTTPException, File
 import io
 from PIL import Image
 
+from src.core.executor import run_blocking
+from src.core.metrics import stage_timer
+from src.core.timing import annotate
 from src.services.extraction import ExtractionService
 from src.services.audit import AuditService
 
 
+@lru_cache(maxsize=None)
 def get_extraction_service() -> ExtractionService:
-    """Get extraction service instance."""
+    """Get the shared extraction service instance."""
     return ExtractionService()
 
 
+@lru_cache(maxsize=None)
 def get_audit_service() -> AuditService:
-    """Get audit service instance."""
+    """Get the shared audit service instance."""
     return AuditService()
 
 
@@ -31,6 +37,11 @@ MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB for PDFs
 
 async def validate_file(file: UploadFile = File(...)) -> UploadFile:
     """Validate uploaded file is an allowed image or PDF format."""
+    with stage_timer("validation"):
+        return await _validate_file(file)
+
+
+async def _validate_file(file: UploadFile) -> UploadFile:
     if not file.filename:
         raise HTTPException(
             status_code=400,
@@ -57,7 +68,12 @@ async def validate_file(file: UploadFile = File(...)) -> UploadFile:
     return file
 
 async def process_pdf_to_images(pdf_data: bytes) -> List[bytes]:
-    """Convert PDF pages to images."""
+    """Convert PDF pages to images on the blocking-work executor."""
+    return await run_blocking(render_pdf_pages, pdf_data)
+
+
+def render_pdf_pages(pdf_data: bytes) -> List[bytes]:
+    """Render each PDF page to PNG bytes at 300 DPI."""
     try:
         import fitz  # PyMuPDF
     except ImportError:
@@ -67,6 +83,7 @@ async def process_pdf_to_images(pdf_data: bytes) -> List[bytes]:
         )
     
     pdf_document = fitz.Document(stream=pdf_data, filetype="pdf")
+    annotate(page_count=pdf_document.page_count)
     images = []
     
     for page_num in range(pdf_document.page_count):
@@ -81,6 +98,11 @@ async def process_pdf_to_images(pdf_data: bytes) -> List[bytes]:
     return images
 
 async def optimize_image_for_ocr(image_data: bytes, max_dimension: int = 2048) -> bytes:
+    """Optimize image for OCR processing on the blocking-work executor."""
+    return await run_blocking(optimize_image_bytes, image_data, max_dimension)
+
+
+def optimize_image_bytes(image_data: bytes, max_dimension: int = 2048) -> bytes:
     """
     Optimize image for OCR processing.
     - Resize if too large (keeping aspect ratio)
@@ -95,6 +117,8 @@ async def optimize_image_for_ocr(image_data: bytes, max_dimension: int = 2048) -
             detail=f"Invalid image file: {str(e)}"
         )
     
+    annotate(original_width=img.width, original_height=img.height)
+
     # Convert RGBA to RGB if needed
     if img.mode in ('RGBA', 'LA'):
         background = Image.new('RGB', img.size, (255, 255, 255))
@@ -107,6 +131,8 @@ async def optimize_image_for_ocr(image_data: bytes, max_dimension: int = 2048) -
     if max(img.size) > max_dimension:
         img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
     
+    annotate(image_width=img.width, image_height=img.height)
+
     # Save with optimization
     output = io.BytesIO()
     img.save(output, format='JPEG', quality=85, optimize=True)
@@ -0,0 +1,42 @@
+"""
+Admin endpoints for stored request profiles.
+"""
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from src.core.config import settings
+from src.core.executor import run_blocking
+from src.core.profiling import is_admin_token, list_profiles, load_profile
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _check_access(token: Optional[str]) -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    # Profiles hold stack frames and allocation sites, so they are never served without a token
+    if not settings.PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Profiling admin token is not configured")
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles")
+async def get_profiles(x_profile: Optional[str] = Header(default=None)) -> List[Dict]:
+    """List stored request profiles, newest first."""
+    _check_access(x_profile)
+    return await run_blocking(list_profiles)
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile: Optional[str] = Header(default=None)) -> Dict:
+    """
+    Return one profile: stage timings, top sampled stacks, top allocations
+    and the full folded stacks (flame graph input).
+    """
+    _check_access(x_profile)
+    profile = await run_blocking(load_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -2,9 +2,17 @@
 Health check endpoints.
 """
 from datetime import datetime, timezone
-from fastapi import APIRouter
+from typing import List, Optional
+
+from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
 
+from src.core.config import settings
+from src.core.executor import active_jobs, queue_depth
+from src.core.loop_monitor import get_loop_monitor
+from src.core.provider import cached_probe
+from src.services.warmup import warmup_complete, warmup_status
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
@@ -19,6 +27,10 @@ class ReadinessResponse(BaseModel):
     """Readiness check response."""
     status: str
     services: dict
+    warmup: dict
+    event_loop: Optional[dict] = None
+    executor: dict
+    problems: List[str] = []
 
 
 @router.get("/", response_model=HealthResponse)
@@ -31,17 +43,48 @@ async def health_check() -> HealthResponse:
 
 
 @router.get("/ready", response_model=ReadinessResponse)
-async def readiness_check() -> ReadinessResponse:
+async def readiness_check(response: Response) -> ReadinessResponse:
     """
     Readiness check endpoint.
-    
-    Verifies that all required services are available.
+
+    Not ready until the startup warm-up has finished. Reports event-loop lag percentiles and recent blocking stacks, image
+    executor saturation and the last provider reachability probe, refreshed
+    in the background so this check never waits on the provider. Returns 503
+    when p99 loop lag or the executor queue exceed their limits (or, with
+    ``READY_REQUIRE_PROVIDER``, when the provider can't be reached).
     """
-    # In a real app, you'd check database connections, external services, etc.
+    problems = []
+
+    if not warmup_complete():
+        problems.append("warming_up")
+
+    monitor = get_loop_monitor()
+    event_loop = monitor.snapshot() if monitor else None
+    if event_loop and event_loop["lag_ms"]["p99"] > settings.READY_MAX_LOOP_LAG_MS:
+        problems.append("event_loop_lag")
+
+    executor = {
+        "workers": settings.IMAGE_WORKERS,
+        "active": active_jobs(),
+        "queued": queue_depth(),
+        "saturation": round(active_jobs() / settings.IMAGE_WORKERS, 2),
+    }
+    if executor["queued"] > settings.READY_MAX_EXECUTOR_QUEUE:
+        problems.append("executor_queue")
+
+    # The warm-up's connection step seeds the probe cache; probing before then
+    # would import the OpenAI client on the event loop while warm-up imports it
+    provider = cached_probe() if warmup_complete() else {"status": "pending"}
+    if settings.READY_REQUIRE_PROVIDER and provider["status"] != "reachable":
+        problems.append("provider")
+
+    if problems:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     return ReadinessResponse(
-        status="ready",
-        services={
-            "openai": "connected",
-            "storage": "ready"
-        }
-    )
\ No newline at end of file
+        status="not_ready" if problems else "ready",
+        services={"openai": provider},
+        warmup=warmup_status(),
+        event_loop=event_loop,
+        executor=executor,
+        problems=problems,
+    )
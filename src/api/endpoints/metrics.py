@@ -0,0 +1,18 @@
+"""
+Prometheus metrics endpoint.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose pipeline metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
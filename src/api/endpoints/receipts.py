@@ -2,7 +2,8 @@
 Receipt processing endpoints.
 """
 import time
-from fastapi import APIRouter, Query
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
 from src.api.dependencies import (
@@ -10,9 +11,11 @@ from src.api.dependencies import (
     AuditServiceDep,
     ValidatedImage
 )
-from src.models.receipt import ReceiptDetails
-from src.models.audit import AuditDecision, ProcessingResult
+from src.models.receipt import ExtractionProfile, ReceiptDetails
+from src.models.audit import AuditDecision, ProcessingResult, ReasoningMode
 from src.core.config import settings
+from src.core.metrics import record_error, record_fallback, stage_timer
+from src.core.timing import annotate
 
 router = APIRouter(prefix="/receipts", tags=["receipts"])
 
@@ -23,7 +26,12 @@ async def process_receipt(
     audit_service: AuditServiceDep,
     file: ValidatedImage,
     extraction_model: str = Query(default=settings.DEFAULT_EXTRACTION_MODEL),
-    audit_model: str = Query(default=settings.DEFAULT_AUDIT_MODEL)
+    audit_model: str = Query(default=settings.DEFAULT_AUDIT_MODEL),
+    extraction_profile: ExtractionProfile = Query(
+        default=settings.PROCESS_EXTRACTION_PROFILE,
+        description="'staged' reads the header first and extracts line items only when the "
+        "audit needs them; 'lean' extracts only the fields the audit needs; 'full' extracts everything"
+    )
 ) -> ProcessingResult:
     """
     Process a receipt image end-to-end.
@@ -36,20 +44,37 @@ async def process_receipt(
     start_time = time.time()
     
     # Validate and read image
-    image_data = await file.read()
+    with stage_timer("upload_read"):
+        image_data = await file.read()
+    annotate(
+        upload_bytes=len(image_data),
+        content_type=file.content_type,
+        extraction_model=extraction_model,
+        audit_model=audit_model,
+        extraction_profile=extraction_profile,
+    )
     
     # Optimize image if requested and it's not a PDF
     if not (file.filename and file.filename.lower().endswith('.pdf')):
         from src.api.dependencies import optimize_image_for_ocr
-        image_data = await optimize_image_for_ocr(image_data)
+        with stage_timer("optimize"):
+            image_data = await optimize_image_for_ocr(image_data)
     
     try:
         # Extract receipt details
         extraction_start = time.time()
-        receipt_details = await extraction_service.extract_receipt_details(
-            image_data, file.filename or "receipt.jpg", extraction_model
-        )
+        if extraction_profile == "staged":
+            receipt_details, extraction_stages = await extraction_service.extract_receipt_staged(
+                image_data, file.filename or "receipt.jpg", extraction_model
+            )
+        else:
+            receipt_details = await extraction_service.extract_receipt_details(
+                image_data, file.filename or "receipt.jpg", extraction_model,
+                profile=extraction_profile
+            )
+            extraction_stages = [extraction_profile]
         extraction_time = time.time() - extraction_start
+        annotate(extraction_stages=extraction_stages)
         
         # Audit receipt - FIX: use correct method name
         audit_start = time.time()
@@ -74,11 +99,14 @@ async def process_receipt(
                 "audit_time_ms": audit_time * 1000
             },
             processing_successful=True,
+            extraction_stages=extraction_stages,
             error_message=None
         )
     except Exception as e:
         # Return error result with minimal data
         from src.models.receipt import Location
+        record_error("process")
+        record_fallback("process", "processing_failed")
         
         return ProcessingResult(
             receipt_details=ReceiptDetails(
@@ -119,12 +147,15 @@ async def extract_receipt(
     
     Returns detailed information including merchant, items, totals, and handwritten notes.
     """
-    image_data = await file.read()
+    with stage_timer("upload_read"):
+        image_data = await file.read()
+    annotate(upload_bytes=len(image_data), content_type=file.content_type, extraction_model=model)
     
     # Optimize image if requested and it's not a PDF
     if optimize_image and not (file.filename and file.filename.lower().endswith('.pdf')):
         from src.api.dependencies import optimize_image_for_ocr
-        image_data = await optimize_image_for_ocr(image_data)
+        with stage_timer("optimize"):
+            image_data = await optimize_image_for_ocr(image_data)
     
     return await extraction_service.extract_receipt_details(
         image_data, file.filename or "receipt.jpg", model
@@ -135,7 +166,12 @@ async def extract_receipt(
 async def audit_receipt(
     audit_service: AuditServiceDep,
     receipt_details: ReceiptDetails,
-    model: str = Query(default=settings.DEFAULT_AUDIT_MODEL)
+    model: str = Query(default=settings.DEFAULT_AUDIT_MODEL),
+    reasoning_mode: ReasoningMode = Query(
+        default=settings.AUDIT_REASONING_MODE,
+        description="'verbose' asks the model for prose reasoning; 'terse' returns reason codes "
+        "and renders the reasoning locally, using fewer output tokens"
+    )
 ) -> AuditDecision:
     """
     Evaluate receipt details against audit criteria.
@@ -146,4 +182,28 @@ async def audit_receipt(
     - Math errors in totals
     - Presence of 'X' in handwritten notes
     """
-    return await audit_service.audit_receipt(receipt_details, model)
\ No newline at end of file
+    annotate(audit_model=model, reasoning_mode=reasoning_mode)
+    return await audit_service.audit_receipt(receipt_details, model, reasoning_mode)
+
+
+@router.post("/audit/batch", response_model=List[AuditDecision])
+async def audit_receipts_batch(
+    audit_service: AuditServiceDep,
+    receipts: List[ReceiptDetails],
+    model: str = Query(default=settings.DEFAULT_AUDIT_MODEL),
+    reasoning_mode: ReasoningMode = Query(default=settings.AUDIT_REASONING_MODE)
+) -> List[AuditDecision]:
+    """
+    Evaluate a batch of receipts against audit criteria.
+    
+    Receipts are packed several to a model call; decisions are returned in
+    the same order as the submitted receipts. Batches larger than
+    ``AUDIT_BATCH_MAX_RECEIPTS`` are rejected with 422.
+    """
+    if len(receipts) > settings.AUDIT_BATCH_MAX_RECEIPTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch has {len(receipts)} receipts; the maximum is {settings.AUDIT_BATCH_MAX_RECEIPTS}"
+        )
+    annotate(audit_model=model, reasoning_mode=reasoning_mode, receipt_count=len(receipts))
+    return await audit_service.audit_receipts_packed(receipts, model, reasoning_mode)
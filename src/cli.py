@@ -1,37 +1,7 @@
-@cli.command()
-@click.option('--eval-id', required=True, help='OpenAI eval ID')
-@click.option('--run-id', required=True, help='OpenAI eval run ID')
-@click.option('--api-key', default=None, help='OpenAI API key (optional, overrides config)')
-@click.option('--per-receipt-cost', default=2.0, type=float, help='Cost per receipt (default: $2.00)')
-def summarize_costs(eval_id: str, run_id: str, api_key: str, per_receipt_cost: float):
-    """Summarize business costs from an OpenAI eval run."""
-    import openai
-    import json
-    from src.services.cost_analysis import summarize_costs_from_eval
-    from src.core.config import settings
-
-    openai.api_key = api_key or settings.OPENAI_API_KEY
-    run = openai.evals.runs.retrieve(eval_id=eval_id, run_id=run_id)
-
-    # Try to get metrics from run (user may need to adjust this for their schema)
-    metrics = getattr(run, 'metrics', None)
-    if metrics is None:
-        print("❌ No metrics found in eval run. Cannot summarize costs.")
-        return
-
-    result = {"metrics": metrics}
-    summary = summarize_costs_from_eval(result, per_receipt_cost=per_receipt_cost)
-
-    print("\n💰 Business Cost Summary:")
-    print(f"   Total Cost: ${summary['total_cost']:.2f}")
-    print(f"   System Metrics: {summary['system_metrics']}")
-    print(f"   FP Rate: {summary['fp_rate']:.3f}, FN Rate: {summary['fn_rate']:.3f}")
-    print(f"   TP: {summary['tp']}, FP: {summary['fp']}, TN: {summary['tn']}, FN: {summary['fn']}")
 """Simplified CLI for receipt processing evaluation."""
 import asyncio
 import click
 from pathlib import Path
-from src.services.evaluation_pipeline import EvaluationPipeline
 
 
 @click.group()
@@ -46,16 +16,25 @@ def cli():
 @click.option('--model', default="gpt-4o-mini", help='Model to use for evaluation')
 @click.option('--name', required=True, help='Name for the evaluation run')
 @click.option('--use-example-graders', is_flag=True, help='Use minimal example graders (like notebook initial_eval)')
-def evaluate(image_dir: Path, ground_truth_dir: Path, model: str, name: str, use_example_graders: bool):
+@click.option('--concurrency', default=None, type=int, help='Receipts processed at once (default: EVAL_CONCURRENCY)')
+@click.option('--no-cache', is_flag=True, help='Don\'t reuse or store cached predictions')
+@click.option('--refresh', type=click.Choice(["all", "extraction", "audit"]), default=None, help='Recompute cached predictions for these stages')
+def evaluate(image_dir: Path, ground_truth_dir: Path, model: str, name: str, use_example_graders: bool, concurrency: int,
+             no_cache: bool, refresh: str):
     """Run evaluation following the notebook pattern."""
+    from src.services.cost_analysis import format_cost_summary
+    from src.services.evaluation_pipeline import EvaluationPipeline
+    from src.services.prediction_cache import cache_from_options
+
     async def run():
-        pipeline = EvaluationPipeline()
+        pipeline = EvaluationPipeline(cache=cache_from_options(no_cache, refresh))
         
         # Create dataset
         dataset = await pipeline.create_dataset_content(
             image_dir, 
             ground_truth_dir,
-            model
+            model,
+            concurrency=concurrency
         )
         
         if len(dataset) == 0:
@@ -73,6 +52,9 @@ def evaluate(image_dir: Path, ground_truth_dir: Path, model: str, name: str, use
         
         # Run evaluation
         result = await pipeline.create_and_run_eval(name, dataset, graders)
+
+        print("\n💰 Business Cost Summary (needs_audit):")
+        print(format_cost_summary(result["cost_summary"]))
         
         if result["status"] == "success":
             print(f"✅ Evaluation created successfully!")
@@ -83,5 +65,409 @@ def evaluate(image_dir: Path, ground_truth_dir: Path, model: str, name: str, use
     asyncio.run(run())
 
 
+@cli.command()
+@click.option('--eval-id', required=True, help='OpenAI eval ID')
+@click.option('--run-id', required=True, help='OpenAI eval run ID')
+@click.option('--api-key', default=None, help='OpenAI API key (optional, overrides config)')
+@click.option('--per-receipt-cost', default=2.0, type=float, help='Cost per receipt (default: $2.00)')
+def summarize_costs(eval_id: str, run_id: str, api_key: str, per_receipt_cost: float):
+    """Summarize business costs from an OpenAI eval run."""
+    import openai
+    import json
+    from src.services.cost_analysis import summarize_costs_from_eval
+    from src.core.config import settings
+
+    openai.api_key = api_key or settings.OPENAI_API_KEY
+    run = openai.evals.runs.retrieve(eval_id=eval_id, run_id=run_id)
+
+    # Try to get metrics from run (user may need to adjust this for their schema)
+    metrics = getattr(run, 'metrics', None)
+    if metrics is None:
+        print("❌ No metrics found in eval run. Cannot summarize costs.")
+        return
+
+    result = {"metrics": metrics}
+    summary = summarize_costs_from_eval(result, per_receipt_cost=per_receipt_cost)
+
+    print("\n💰 Business Cost Summary:")
+    print(f"   Total Cost: ${summary['total_cost']:.2f}")
+    print(f"   System Metrics: {summary['system_metrics']}")
+    print(f"   FP Rate: {summary['fp_rate']:.3f}, FN Rate: {summary['fn_rate']:.3f}")
+    print(f"   TP: {summary['tp']}, FP: {summary['fp']}, TN: {summary['tn']}, FN: {summary['fn']}")
+
+
+@cli.command()
+@click.option('--host', default="127.0.0.1", help='Host to bind')
+@click.option('--port', default=8100, type=int, help='Port to bind')
+@click.option('--latency-ms', default=800.0, type=float, help='Median response latency in milliseconds')
+@click.option('--latency-sigma', default=0.4, type=float, help='Lognormal latency spread (0 for constant latency)')
+@click.option('--rate-limit-rate', default=0.0, type=float, help='Fraction of requests answered with 429')
+@click.option('--error-rate', default=0.0, type=float, help='Fraction of requests answered with 500')
+@click.option('--image-tokens', default=765, type=int, help='Input tokens charged per image')
+@click.option('--output-tokens', default=None, type=int, help='Fixed output tokens per response (estimated if unset)')
+@click.option('--ground-truth-dir', type=Path, default=Path("scripts/data/ground_truth"), help='Directory containing ground truth')
+@click.option('--seed', default=None, type=int, help='Random seed for latency and failure injection')
+def stub_provider(host: str, port: int, latency_ms: float, latency_sigma: float,
+                  rate_limit_rate: float, error_rate: float, image_tokens: int,
+                  output_tokens: int, ground_truth_dir: Path, seed: int):
+    """Run a local OpenAI-compatible stub provider for offline load tests."""
+    import uvicorn
+    from src.utils.stub_provider import StubConfig, create_stub_app
+
+    config = StubConfig(
+        latency_median_ms=latency_ms,
+        latency_sigma=latency_sigma,
+        rate_limit_rate=rate_limit_rate,
+        server_error_rate=error_rate,
+        image_tokens=image_tokens,
+        output_tokens=output_tokens,
+        ground_truth_dir=ground_truth_dir,
+        seed=seed,
+    )
+    print(f"🧪 Stub provider on http://{host}:{port}/v1 "
+          f"(set OPENAI_BASE_URL to point the API at it)")
+    uvicorn.run(create_stub_app(config), host=host, port=port, log_level="warning")
+
+
+@cli.command()
+@click.option('--image-dir', 'image_dirs', type=Path, multiple=True, help='Image directory (repeatable; default: scripts/data/test, valid and train)')
+@click.option('--requests', 'n_requests', default=200, type=int, help='Number of /process requests to send')
+@click.option('--concurrency', default=16, type=int, help='Concurrent in-flight requests')
+@click.option('--extraction-profile', type=click.Choice(["full", "lean", "staged"]), default=None, help='Extraction profile (default: PROCESS_EXTRACTION_PROFILE)')
+@click.option('--latency-ms', default=800.0, type=float, help='Median stub model latency in milliseconds')
+@click.option('--latency-sigma', default=0.4, type=float, help='Lognormal stub latency spread')
+@click.option('--rate-limit-rate', default=0.0, type=float, help='Fraction of stub calls answered with 429')
+@click.option('--error-rate', default=0.0, type=float, help='Fraction of stub calls answered with 500')
+@click.option('--seed', default=0, type=int, help='Random seed for the stub provider')
+@click.option('--output', type=Path, default=None, help='Results JSON path (default: benchmarks/process-<timestamp>.json)')
+@click.option('--baseline', type=Path, default=None, help='Results JSON to compare against; exits non-zero on regression')
+@click.option('--tolerance', default=0.10, type=float, help='Allowed relative regression against the baseline')
+def benchmark(image_dirs, n_requests: int, concurrency: int, extraction_profile: str,
+              latency_ms: float, latency_sigma: float, rate_limit_rate: float,
+              error_rate: float, seed: int, output: Path, baseline: Path, tolerance: float):
+    """Load test /receipts/process against the stub provider."""
+    import json
+    from datetime import datetime
+    from src.utils.stub_provider import StubConfig
+    from src.utils.load_benchmark import (
+        DEFAULT_IMAGE_DIRS, BenchmarkConfig, compare_results, run_benchmark, save_results
+    )
+
+    config = BenchmarkConfig(
+        image_dirs=image_dirs or DEFAULT_IMAGE_DIRS,
+        requests=n_requests,
+        concurrency=concurrency,
+        stub=StubConfig(
+            latency_median_ms=latency_ms,
+            latency_sigma=latency_sigma,
+            rate_limit_rate=rate_limit_rate,
+            server_error_rate=error_rate,
+            seed=seed,
+        ),
+    )
+    if extraction_profile:
+        config.extraction_profile = extraction_profile
+
+    print(f"🏁 Sending {n_requests} requests at concurrency {concurrency}...")
+    results = asyncio.run(run_benchmark(config))
+
+    output = output or Path("benchmarks") / f"process-{datetime.now():%Y%m%d-%H%M%S}.json"
+    save_results(results, output)
+
+    print(f"\n📈 Throughput: {results['throughput_rps']:.1f} req/s "
+          f"({results['failures']} failures)")
+    for stage, stats in results["latency_ms"].items():
+        print(f"   {stage:<26} p50 {stats['p50']:>9.1f}ms  p95 {stats['p95']:>9.1f}ms  p99 {stats['p99']:>9.1f}ms")
+    print(f"   CPU: {results['cpu_ms_per_request']:.1f}ms/request, peak RSS {results['peak_rss_mb']:.0f}MB")
+    lag = results["event_loop_lag_ms"]
+    print(f"   Event-loop lag: p50 {lag['p50']:.1f}ms  p99 {lag['p99']:.1f}ms  max {lag['max']:.1f}ms")
+    print(f"💾 Results saved to {output}")
+
+    if baseline:
+        regressions = compare_results(results, json.loads(baseline.read_text()), tolerance)
+        if regressions:
+            print(f"❌ Regressions against {baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            raise SystemExit(1)
+        print(f"✅ No regressions against {baseline}")
+
+
+@cli.command()
+@click.option('--image-dir', 'image_dirs', type=Path, multiple=True, help='Image directory (repeatable; default: scripts/data/test, valid and train)')
+@click.option('--limit', default=None, type=int, help='Maximum number of images')
+@click.option('--repeat', default=1, type=int, help='Runs per image and path (fastest is reported)')
+@click.option('--no-pdf', is_flag=True, help='Skip the PDF rendering path')
+@click.option('--output', type=Path, default=None, help='Results JSON path (default: benchmarks/images-<timestamp>.json)')
+def image_benchmark(image_dirs, limit: int, repeat: int, no_pdf: bool, output: Path):
+    """Benchmark image and PDF preprocessing settings over the dataset."""
+    from datetime import datetime
+    from src.utils.image_benchmark import format_table, run_image_benchmark
+    from src.utils.load_benchmark import DEFAULT_IMAGE_DIRS, save_results
+
+    results = run_image_benchmark(
+        image_dirs=image_dirs or DEFAULT_IMAGE_DIRS,
+        limit=limit,
+        repeat=repeat,
+        include_pdf=not no_pdf,
+    )
+
+    print(f"🖼️  {results['images']} images\n")
+    print(format_table(results["summary"]))
+
+    output = output or Path("benchmarks") / f"images-{datetime.now():%Y%m%d-%H%M%S}.json"
+    save_results(results, output)
+    print(f"\n💾 Results saved to {output}")
+
+
+@cli.command()
+@click.option('--image-dir', type=Path, default=Path("scripts/data/test"), help='Directory containing test images')
+@click.option('--ground-truth-dir', type=Path, default=Path("scripts/data/ground_truth"), help='Directory containing ground truth')
+@click.option('--model', default="gpt-4o-mini", help='Audit model')
+@click.option('--extractions', 'extraction_source', type=click.Choice(["ground_truth", "cached"]), default="ground_truth",
+              help='Audit input: ground truth extractions or cached predicted extractions')
+@click.option('--extraction-model', default=None, help='Model whose cached extractions to audit (default: --model)')
+@click.option('--concurrency', default=None, type=int, help='Audits run at once (default: EVAL_CONCURRENCY)')
+@click.option('--no-cache', is_flag=True, help='Don\'t reuse or store cached audits')
+@click.option('--refresh', is_flag=True, help='Recompute cached audits')
+@click.option('--output', type=Path, default=None, help='Write records and confusion matrices to this JSON file')
+def audit_eval(image_dir: Path, ground_truth_dir: Path, model: str, extraction_source: str, extraction_model: str,
+               concurrency: int, no_cache: bool, refresh: bool, output: Path):
+    """Evaluate audit decisions alone, skipping extraction."""
+    import json
+    from src.services.cost_analysis import audit_confusion_matrices
+    from src.services.evaluation_pipeline import EvaluationPipeline
+    from src.services.prediction_cache import cache_from_options
+
+    if no_cache and extraction_source == "cached":
+        raise click.UsageError("--extractions cached needs the prediction cache")
+    cache = cache_from_options(no_cache, "audit" if refresh else None)
+
+    def print_failure(completed, total, image_name, error):
+        if error:
+            print(f"  [{completed}/{total}] {image_name} ❌ {error}")
+
+    async def run():
+        pipeline = EvaluationPipeline(cache=cache)
+        return await pipeline.create_audit_only_records(
+            image_dir,
+            ground_truth_dir,
+            model,
+            extraction_source=extraction_source,
+            extraction_model=extraction_model,
+            concurrency=concurrency,
+            on_progress=print_failure,
+        )
+
+    records = asyncio.run(run())
+    matrices = audit_confusion_matrices(records)
+
+    print(f"\n🔍 Audit-only evaluation of {model} on {len(records)} receipts ({extraction_source} extractions)")
+    if cache is not None:
+        print(f"💾 Prediction cache: {cache.summary()}")
+    print(f"\n{'field':<20} {'tp':>4} {'fp':>4} {'tn':>4} {'fn':>4} {'accuracy':>9} {'precision':>10} {'recall':>7}")
+    for field, m in matrices.items():
+        print(
+            f"{field:<20} {m['tp']:>4} {m['fp']:>4} {m['tn']:>4} {m['fn']:>4} "
+            f"{m['accuracy']:>9.3f} {m['precision']:>10.3f} {m['recall']:>7.3f}"
+        )
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            "model": model,
+            "extractions": extraction_source,
+            "confusion_matrices": matrices,
+            "records": [record.model_dump() for record in records],
+        }, indent=2))
+        print(f"\n💾 Results saved to {output}")
+
+
+@cli.command()
+@click.argument('dataset', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--use-example-graders', is_flag=True, help='Use minimal example graders (like notebook initial_eval)')
+@click.option('--output', type=Path, default=None, help='Write per-grader results to this JSON file')
+def grade(dataset: Path, use_example_graders: bool, output: Path):
+    """Run the string_check and text_similarity graders locally on a dataset JSONL."""
+    import json
+    import time
+    from src.utils.graders import get_all_graders, get_example_graders
+    from src.utils.local_graders import format_results, load_dataset_items, run_local_graders
+
+    graders = get_example_graders() if use_example_graders else get_all_graders()
+    items = load_dataset_items(dataset)
+    start = time.perf_counter()
+    results = run_local_graders(graders, items)
+    elapsed = time.perf_counter() - start
+
+    print(f"🎯 Graded {len(items)} records locally in {elapsed:.2f}s\n")
+    print(format_results(results))
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            "dataset": str(dataset),
+            "count": len(items),
+            "graders": [result.as_dict() for result in results],
+        }, indent=2))
+        print(f"\n💾 Results saved to {output}")
+
+
+@cli.command()
+@click.option('--fp-rate', default="0:0.2:41", help='False positive rates: "a,b,c" or "start:stop:num"')
+@click.option('--fn-rate', default="0:0.2:41", help='False negative rates: "a,b,c" or "start:stop:num"')
+@click.option('--per-receipt-cost', default="0.2", help='Model cost per receipt in dollars')
+@click.option('--audit-cost', default=None, help='Cost of one audit (default: $2)')
+@click.option('--missed-audit-cost', default=None, help='Cost of one missed audit (default: $30)')
+@click.option('--receipt-count', default=None, help='Receipts per year (default: 1,000,000)')
+@click.option('--audit-fraction', default=None, help='Fraction of receipts needing an audit (default: 0.05)')
+@click.option('--model', 'models', multiple=True,
+              help='NAME:DATASET.jsonl:PER_RECEIPT_COST; error rates come from the dataset (repeatable)')
+@click.option('--resamples', default=2000, type=int, help='Bootstrap resamples per model')
+@click.option('--confidence', default=0.95, type=float, help='Confidence level of bootstrap intervals')
+@click.option('--seed', default=None, type=int, help='Random seed for bootstrapping')
+@click.option('--output', type=Path, default=None, help='Write the sweep and model comparison to this JSON file')
+def cost_sweep(fp_rate: str, fn_rate: str, per_receipt_cost: str, audit_cost: str, missed_audit_cost: str,
+               receipt_count: str, audit_fraction: str, models, resamples: int, confidence: float, seed: int,
+               output: Path):
+    """Sweep business cost over error rates, model cost, audit prices and volumes."""
+    import json
+    import time
+    import numpy as np
+    from src.services.cost_analysis import audit_decision_arrays, confusion_counts
+    from src.utils.cost_calculator import axis_values, bootstrap_costs, pareto_frontier, sweep_costs
+    from src.utils.local_graders import load_dataset_items
+
+    scenario_axes = {
+        name: axis_values(spec)
+        for name, spec in (
+            ("audit_cost", audit_cost),
+            ("missed_audit_cost", missed_audit_cost),
+            ("receipt_count", receipt_count),
+            ("audit_fraction", audit_fraction),
+        )
+        if spec is not None
+    }
+
+    start = time.perf_counter()
+    sweep = sweep_costs(
+        fp_rate=axis_values(fp_rate),
+        fn_rate=axis_values(fn_rate),
+        per_receipt_cost=axis_values(per_receipt_cost),
+        **scenario_axes,
+    )
+    elapsed = time.perf_counter() - start
+    summary = sweep.summary()
+    print(f"💰 {summary['points']:,} scenarios priced in {elapsed * 1000:.1f}ms")
+    print(f"   Cost range: ${summary['min']:,.0f} - ${summary['max']:,.0f}")
+    print(f"   Cheapest: {summary['cheapest']}")
+    results = {"sweep": summary, "models": []}
+
+    if models:
+        # Bootstrap at the base scenario: the first value of each price and volume axis
+        base = {name: float(values[0]) for name, values in scenario_axes.items()}
+        rows = []
+        for spec in models:
+            name, rest = spec.split(":", 1)
+            dataset, cost = rest.rsplit(":", 1)
+            counts = confusion_counts(*audit_decision_arrays(load_dataset_items(Path(dataset))))
+            tp, fp, tn, fn = (int(counts[key][0]) for key in ("tp", "fp", "tn", "fn"))
+            row = {"model": name, "per_receipt_cost": float(cost), "records": tp + fp + tn + fn}
+            row.update(bootstrap_costs(
+                tp, fp, tn, fn, float(cost),
+                n_resamples=resamples, confidence=confidence, seed=seed, **base,
+            ))
+            rows.append(row)
+
+        frontier = pareto_frontier(
+            [row["per_receipt_cost"] for row in rows],
+            [row["fp_rate"] for row in rows],
+            [row["fn_rate"] for row in rows],
+        )
+        # Share of price and volume scenarios in which each model is the cheapest
+        model_costs = np.stack([
+            sweep_costs(
+                fp_rate=row["fp_rate"], fn_rate=row["fn_rate"], per_receipt_cost=row["per_receipt_cost"],
+                **scenario_axes,
+            ).costs
+            for row in rows
+        ])
+        wins = np.bincount(model_costs.argmin(axis=0).ravel(), minlength=len(rows)) / model_costs[0].size
+        for row, on_frontier, share in zip(rows, frontier, wins):
+            row["pareto"] = bool(on_frontier)
+            row["cheapest_share"] = float(share)
+
+        print(f"\n{'model':<16} {'$/receipt':>9} {'fp rate':>8} {'fn rate':>8} "
+              f"{'cost':>12} {f'{confidence:.0%} CI':>25} {'cheapest':>8}  pareto")
+        for row in sorted(rows, key=lambda r: r["cost"]):
+            low, high = row["cost_ci"]
+            print(
+                f"{row['model']:<16} {row['per_receipt_cost']:>9.4f} {row['fp_rate']:>8.3f} {row['fn_rate']:>8.3f} "
+                f"{'$' + format(row['cost'], ',.0f'):>12} {f'${low:,.0f} - ${high:,.0f}':>25} "
+                f"{row['cheapest_share']:>8.0%}  {'✓' if row['pareto'] else ''}"
+            )
+        results["models"] = rows
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results saved to {output}")
+
+
+@cli.command()
+@click.option('--data-dir', type=Path, default=Path("scripts/data"), help='Directory containing the split directories')
+@click.option('--output-dir', type=Path, default=Path("scripts/data/shards"), help='Directory for the shard files')
+@click.option('--split', 'splits', multiple=True, type=click.Choice(["train", "valid", "test"]),
+              help='Splits to build (default: all)')
+@click.option('--ground-truth-dir', type=Path, default=None, help='Ground truth to embed (default: DATA_DIR/ground_truth)')
+@click.option('--workers', default=None, type=int, help='Preprocessing threads')
+def build_shards(data_dir: Path, output_dir: Path, splits, ground_truth_dir: Path, workers: int):
+    """Pack preprocessed receipt images into one memory-mappable shard per split."""
+    import time
+    from src.utils.dataset_shards import SPLITS, build_shards as build
+
+    start = time.perf_counter()
+    indexes = build(data_dir, output_dir, splits or SPLITS, ground_truth_dir, workers)
+    for split, index in indexes.items():
+        labelled = sum(record["ground_truth"] is not None for record in index["records"])
+        print(f"📦 {split}: {len(index['records'])} images ({labelled} with ground truth), "
+              f"{index['size'] / 1e6:.1f} MB -> {output_dir / f'{split}.index.json'}")
+    print(f"✅ Built {len(indexes)} shards in {time.perf_counter() - start:.1f}s")
+
+
+@cli.command()
+@click.option('--eval-id', required=True, help='Eval ID')
+@click.option('--run-id', required=True, help='Eval run ID')
+@click.option('--page-size', default=100, type=int, help='Output items per page request (max 100)')
+@click.option('--refresh', is_flag=True, help='Drop cached items and download the run again')
+@click.option('--output', type=Path, default=None, help='Write per-grader score columns to this JSON file')
+def eval_results(eval_id: str, run_id: str, page_size: int, refresh: bool, output: Path):
+    """Download an eval run's output items into the local cache and summarize grader scores."""
+    import json
+    import time
+    from src.services.eval_results import (
+        columns_to_json, download_run_items, format_grader_summary, grader_columns, summarize_graders
+    )
+
+    start = time.perf_counter()
+    run = asyncio.run(download_run_items(eval_id, run_id, page_size=page_size, refresh=refresh))
+    print(f"📥 {run.run_id} ({run.run_status}): {len(run.items)} items, {run.fetched} new, "
+          f"{run.requests} requests in {time.perf_counter() - start:.1f}s\n")
+
+    columns = grader_columns(run.items)
+    summary = summarize_graders(columns)
+    print(format_grader_summary(summary))
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            "eval_id": eval_id,
+            "run_id": run_id,
+            "summary": summary,
+            "columns": columns_to_json(columns),
+        }))
+        print(f"\n💾 Results saved to {output}")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,44 @@
+"""
+Lazily imported, cached Agents SDK objects.
+
+Importing the Agents SDK takes seconds, so it is loaded on first use (or in
+the startup warm-up) instead of when ``src.main`` is imported. Agents and
+their structured output schemas are cached: the SDK otherwise regenerates the
+pydantic JSON schema of the output type on every model call.
+"""
+from functools import lru_cache
+from typing import Any
+
+from src.core.provider import configure_provider
+
+
+@lru_cache(maxsize=None)
+def output_schema(output_type: type):
+    """Structured output schema for ``output_type``, generated once."""
+    from agents import AgentOutputSchema
+    return AgentOutputSchema(output_type)
+
+
+@lru_cache(maxsize=256)
+def get_agent(name: str, instructions: str, model: str, output_type: type):
+    """
+    Return a cached agent for the given instructions, model and output type.
+
+    Extraction agents have fixed instructions and always hit the cache; audit
+    instructions depend on the retrieved examples, so those are bounded by the
+    cache size.
+    """
+    from agents import Agent
+    configure_provider()
+    return Agent(
+        name=name,
+        instructions=instructions,
+        model=model,
+        output_type=output_schema(output_type),
+    )
+
+
+async def run_agent(agent, input: Any):
+    """Run an agent to completion and return the SDK run result."""
+    from agents import Runner
+    return await Runner.run(agent, input)
@@ -4,6 +4,7 @@ Application configuration.
 from functools import lru_cache
 import os
 from pathlib import Path
+from typing import Dict, List, Literal
 from dotenv import load_dotenv
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -24,9 +25,83 @@ class Settings(BaseSettings):
 
     # OpenAI Configuration
     OPENAI_API_KEY: str = Field(default="", min_length=1, description="OpenAI API key is required")
+    # Point model calls at an OpenAI-compatible server, e.g. the local stub provider
+    # (python -m src.cli stub-provider) at http://localhost:8100/v1
+    OPENAI_BASE_URL: str = ""
     DEFAULT_EXTRACTION_MODEL: str = "gpt-4o-mini"
     DEFAULT_AUDIT_MODEL: str = "gpt-4o-mini"
 
+    # Extraction profile used by /receipts/process ("lean" requests only audit fields,
+    # "staged" reads the header first and extracts line items only when needed)
+    PROCESS_EXTRACTION_PROFILE: Literal["full", "lean", "staged"] = "full"
+
+    # Audit Few-Shot Examples. The bank must not overlap the evaluation ground truth
+    # (scripts/data/ground_truth), or eval audits would be shown their own labels
+    AUDIT_EXAMPLE_RETRIEVAL: bool = True
+    AUDIT_EXAMPLE_BANK_DIR: str = str(project_root / "scripts" / "data" / "example_bank")
+    AUDIT_EXAMPLES_K: int = 3
+    AUDIT_EXAMPLES_TOKEN_BUDGET: int = 1200
+
+    # Audit output mode: "verbose" (model-written reasoning) or "terse" (reason codes,
+    # reasoning rendered locally; fewer output tokens, opt in per request or here)
+    AUDIT_REASONING_MODE: Literal["terse", "verbose"] = "verbose"
+
+    # Packed Audits (several receipts per model call)
+    AUDIT_PACK_MAX_RECEIPTS: int = 10
+    AUDIT_PACK_TOKEN_BUDGET: int = 6000
+    AUDIT_PACK_CONCURRENCY: int = 4  # Packs of one batch sent to the model at once
+    AUDIT_BATCH_MAX_RECEIPTS: int = 200  # Larger /audit/batch requests are rejected with 422
+
+    # Metrics and Blocking Work
+    METRICS_ENABLED: bool = True
+    IMAGE_WORKERS: int = 4  # Threads for image preprocessing and PDF rendering
+
+    # Server-Timing headers and sampled slow-request log (JSONL, written off the request path)
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: float = 5000.0
+    SLOW_REQUEST_SAMPLE_RATE: float = 1.0
+    SLOW_REQUEST_LOG_PATH: str = str(project_root / "logs" / "slow_requests.jsonl")
+
+    # Per-request profiling (the middleware is only installed when enabled). Requests
+    # are profiled when their X-Profile header matches the admin token, or at the sample rate
+    PROFILING_ENABLED: bool = False
+    PROFILING_ADMIN_TOKEN: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TRACEMALLOC_FRAMES: int = 1
+    PROFILING_MAX_PROFILES: int = 100
+    PROFILING_DIR: str = str(project_root / "logs" / "profiles")
+
+    # Receipts processed concurrently when generating evaluation datasets
+    EVAL_CONCURRENCY: int = 8
+    # Dataset items appended and fsynced to JSONL outputs per write
+    DATASET_WRITE_BATCH_SIZE: int = 32
+    # Content-addressed cache of evaluation predictions (see src/services/prediction_cache.py)
+    PREDICTION_CACHE_DIR: str = str(project_root / ".cache" / "predictions")
+    # Downloaded eval run output items (see src/services/eval_results.py)
+    EVAL_RESULTS_CACHE_DIR: str = str(project_root / ".cache" / "eval_runs")
+
+    # Startup warm-up, run in the background by lifespan; /health/ready reports not
+    # ready until it completes
+    WARMUP_ENABLED: bool = True
+    WARMUP_STEPS: List[Literal["agents", "examples", "images", "pdf", "connections"]] = [
+        "agents", "examples", "images", "pdf", "connections"
+    ]
+
+    # Event-loop monitoring: lag is sampled every interval, and the loop thread's stack is
+    # captured whenever the loop stalls beyond the block threshold
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 50.0
+    LOOP_MONITOR_WINDOW: int = 1200  # Lag samples kept for percentiles (~1 minute at 50 ms)
+    LOOP_BLOCK_THRESHOLD_MS: float = 250.0
+
+    # Readiness: not ready when p99 loop lag or the image executor queue exceed these
+    READY_MAX_LOOP_LAG_MS: float = 1000.0
+    READY_MAX_EXECUTOR_QUEUE: int = 32
+    READY_REQUIRE_PROVIDER: bool = False  # Also fail readiness when the provider probe fails
+    PROVIDER_PROBE_TTL_S: float = 30.0
+    PROVIDER_PROBE_TIMEOUT_S: float = 2.0
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
 
@@ -35,6 +110,10 @@ class Settings(BaseSettings):
 
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking
+    # Fraction of records kept per level; unlisted levels are always kept
+    LOG_SAMPLE_RATES: Dict[str, float] = {"DEBUG": 0.1}
 
     # Pydantic-settings config
     model_config = SettingsConfigDict(env_file=str(env_path), case_sensitive=True)
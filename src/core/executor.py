@@ -0,0 +1,106 @@
+"""
+Thread pool for blocking work (image decoding/encoding, PDF rendering).
+
+Running PIL and PyMuPDF calls here keeps them off the event loop so one large
+upload doesn't stall every other in-flight request.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY, Gauge
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_queued = 0
+_active = 0
+_counts_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            thread_name_prefix="image-worker",
+        )
+    return _executor
+
+
+def queue_depth() -> int:
+    """Jobs submitted but not yet started."""
+    return _queued
+
+
+def active_jobs() -> int:
+    """Jobs currently running on a worker thread."""
+    return _active
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking function on the shared executor.
+
+    The caller's context is copied to the worker so request timings and
+    annotations made inside ``func`` are attributed to the request.
+
+    Args:
+        func: Function to call
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        The function's return value
+    """
+    global _queued
+    loop = asyncio.get_running_loop()
+    with _counts_lock:
+        _queued += 1
+    state = {"started": False}
+
+    def job():
+        global _queued, _active
+        with _counts_lock:
+            state["started"] = True
+            _queued -= 1
+            _active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with _counts_lock:
+                _active -= 1
+
+    try:
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_executor(), context.run, job)
+    finally:
+        with _counts_lock:
+            if not state["started"]:
+                # Cancelled before a worker picked the job up
+                _queued -= 1
+                state["started"] = True
+
+
+def shutdown_executor() -> None:
+    """Stop the executor, waiting for running jobs."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+REGISTRY.register(Gauge(
+    "receipt_executor_queue_depth",
+    "Blocking jobs waiting for a worker thread",
+    callback=queue_depth,
+))
+REGISTRY.register(Gauge(
+    "receipt_executor_active_jobs",
+    "Blocking jobs running on worker threads",
+    callback=active_jobs,
+))
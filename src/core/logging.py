@@ -1,20 +1,147 @@
+"""
+Non-blocking structured logging.
+
+Records are tagged with the request ID and pipeline stage from context
+variables, sampled by level, and put on a bounded queue; a background
+``QueueListener`` formats them as JSON and writes them to stdout, so the
+request path never waits on a stream flush.
+"""
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
 from src.core.config import settings
 
+request_id_var: ContextVar[str] = ContextVar("request_id", default="")
+stage_var: ContextVar[str] = ContextVar("log_stage", default="")
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current request ID and stage to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.stage = stage_var.get()
+        return True
+
+
+class LevelSamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records per level.
+
+    Levels without a configured rate are always kept, so warnings and errors
+    are never sampled away unless explicitly configured.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {logging.getLevelName(level.upper()): rate for level, rate in rates.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value not in ("", None):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable format with the request ID, for local development."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s")
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks now (they reference live objects),
+        # but leave the JSON formatting to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging() -> None:
+    """
+    Configure logging for the application.
+
+    Safe to call repeatedly; only the first call installs handlers.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(LevelSamplingFilter(settings.LOG_SAMPLE_RATES))
+    _queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
 
-def setup_logging():
-    """Configure logging for the application."""
-    log_level = getattr(logging, settings.LOG_LEVEL.upper())
-    
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
     # Set specific loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
\ No newline at end of file
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the background listener."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
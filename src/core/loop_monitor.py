@@ -0,0 +1,174 @@
+"""
+Continuous event-loop lag monitoring.
+
+A background task wakes every ``LOOP_MONITOR_INTERVAL_MS`` and records how
+late the loop ran it. A watchdog thread checks that task's heartbeat; when the
+loop has not run it for more than ``LOOP_BLOCK_THRESHOLD_MS`` the watchdog
+captures the loop thread's stack, so whatever is blocking the loop shows up
+in the log and at ``/health/ready`` instead of only as tail latency.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.metrics import REGISTRY, Counter, Histogram
+from src.utils.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.register(Histogram(
+    "receipt_event_loop_lag_seconds",
+    "How late the event loop ran the lag monitor's timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+LOOP_BLOCKS = REGISTRY.register(Counter(
+    "receipt_event_loop_blocks_total",
+    "Times the event loop was blocked beyond the threshold",
+))
+
+
+def _format_stack(frame, limit: int) -> List[str]:
+    """Innermost ``limit`` frames of a stack as ``function (file:line)``, outermost first."""
+    return [
+        f"{entry.name} ({entry.filename}:{entry.lineno})"
+        for entry in traceback.extract_stack(frame, limit=None)[-limit:]
+    ]
+
+
+class LoopMonitor:
+    """Measures event-loop lag and samples the stack while the loop is blocked."""
+
+    def __init__(
+        self,
+        interval: float,
+        block_threshold: float,
+        window: int = 1000,
+        max_samples: int = 20,
+        stack_depth: int = 25
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stack_depth = stack_depth
+        self.lags_ms: Deque[float] = deque(maxlen=window)
+        self.blocking_samples: Deque[Dict] = deque(maxlen=max_samples)
+        self.blocks = 0
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[Dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            self.lags_ms.append(lag * 1000)
+            LOOP_LAG.observe(lag)
+            pending = self._pending
+            if pending is not None:
+                # The watchdog saw the stall while it was happening; now we know how long it was
+                pending["blocked_ms"] = round(lag * 1000, 1)
+                self._pending = None
+
+    def _watch(self) -> None:
+        check_interval = min(self.interval, self.block_threshold) / 2
+        sampled_heartbeat = None
+        while not self._stop.wait(check_interval):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.block_threshold or heartbeat == sampled_heartbeat:
+                continue
+            sampled_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            sample = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "blocked_ms": round(overdue * 1000, 1),
+                "stack": _format_stack(frame, self.stack_depth),
+            }
+            del frame
+            self.blocks += 1
+            LOOP_BLOCKS.inc()
+            self.blocking_samples.append(sample)
+            if self._heartbeat == heartbeat:
+                self._pending = sample
+            logger.warning(
+                "Event loop blocked for over %.0f ms",
+                self.block_threshold * 1000,
+                extra={"blocked_ms": sample["blocked_ms"], "stack": sample["stack"]},
+            )
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the timer task and the watchdog thread."""
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self, recent: int = 5) -> Dict:
+        """Lag percentiles over the window and the most recent blocking samples."""
+        return {
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "lag_ms": summarize(list(self.lags_ms)),
+            "blocked_count": self.blocks,
+            "recent_blocks": list(self.blocking_samples)[-recent:],
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """Return the running monitor, or None when it is disabled or not started."""
+    return _monitor
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """Start the process-wide monitor on the running loop, if enabled."""
+    global _monitor
+    if not settings.LOOP_MONITOR_ENABLED or _monitor is not None:
+        return _monitor
+    _monitor = LoopMonitor(
+        interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+        block_threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+        window=settings.LOOP_MONITOR_WINDOW,
+    )
+    _monitor.start()
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    """Stop the process-wide monitor, if running."""
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
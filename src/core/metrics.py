@@ -0,0 +1,336 @@
+"""
+Prometheus metrics for the receipt pipeline.
+
+A small in-process registry rendered in the Prometheus text format at
+``/metrics``. Label children are created under a lock; observations are plain
+list/dict updates made from the event loop thread, so recording a sample costs
+a dict lookup and a few integer increments.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.config import settings
+from src.core.logging import stage_var
+from src.core.timing import add_stage, add_tokens
+
+# Route of the request being served, used as the ``endpoint`` label
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="")
+
+# Model calls take seconds; image work and validation take milliseconds
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class holding label children keyed by label values."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child(self, labels: Tuple[str, ...]):
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labels, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def _new_child(self):
+        return [0.0]
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._child(labels)[0] += amount
+
+    def value(self, *labels: str) -> float:
+        child = self._children.get(labels)
+        return child[0] if child else 0.0
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child[0])}"
+            for labels, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return [0.0]
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._child(labels)[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._child(labels)[0] -= amount
+
+    def value(self, *labels: str) -> float:
+        if self.callback:
+            return self.callback()
+        child = self._children.get(labels)
+        return child[0] if child else 0.0
+
+    def _samples(self) -> List[str]:
+        if self.callback:
+            return [f"{self.name} {_format_value(float(self.callback()))}"]
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child[0])}"
+            for labels, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * (n_buckets + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(len(self.buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        child = self._child(labels)
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+
+    def count(self, *labels: str) -> int:
+        child = self._children.get(labels)
+        return sum(child.counts) if child else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "receipt_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ("stage", "model", "endpoint"),
+))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "receipt_request_duration_seconds",
+    "HTTP request duration",
+    ("endpoint", "method", "status"),
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "receipt_requests_in_flight",
+    "HTTP requests currently being served",
+))
+FALLBACKS = REGISTRY.register(Counter(
+    "receipt_fallbacks_total",
+    "Degraded results returned instead of failing (e.g. empty receipt, forced audit)",
+    ("component", "reason"),
+))
+ERRORS = REGISTRY.register(Counter(
+    "receipt_errors_total",
+    "Exceptions caught in the pipeline",
+    ("stage", "model"),
+))
+MODEL_TOKENS = REGISTRY.register(Counter(
+    "receipt_model_tokens_total",
+    "Model tokens used",
+    ("stage", "model", "kind"),
+))
+MODEL_COST = REGISTRY.register(Counter(
+    "receipt_model_cost_dollars_total",
+    "Estimated model cost in dollars",
+    ("stage", "model"),
+))
+
+
+def observe_stage(stage: str, seconds: float, model: str = "") -> None:
+    """Record the duration of a pipeline stage for the current endpoint and request."""
+    add_stage(stage, seconds)
+    if settings.METRICS_ENABLED:
+        STAGE_DURATION.observe(seconds, stage, model, current_endpoint.get())
+
+
+@contextmanager
+def stage_timer(stage: str, model: str = "") -> Iterator[None]:
+    """Time a block as a pipeline stage, tagging log records inside it with the stage."""
+    token = stage_var.set(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, model)
+        stage_var.reset(token)
+
+
+def record_fallback(component: str, reason: str, count: int = 1) -> None:
+    """Count degraded results returned from an ``except`` path."""
+    if settings.METRICS_ENABLED:
+        FALLBACKS.inc(component, reason, amount=count)
+
+
+def record_error(stage: str, model: str = "") -> None:
+    """Count an exception caught in a pipeline stage."""
+    if settings.METRICS_ENABLED:
+        ERRORS.inc(stage, model)
+
+
+def record_usage(stage: str, model: str, result) -> None:
+    """
+    Count tokens and estimated cost for a model call.
+
+    Args:
+        stage: Pipeline stage that made the call
+        model: Model name
+        result: Agents SDK run result; results without usage are ignored
+    """
+    from src.utils.cost_calculator import estimate_model_cost
+
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    if not isinstance(input_tokens, int) or not isinstance(output_tokens, int):
+        return
+    add_tokens(input_tokens, output_tokens)
+    if not settings.METRICS_ENABLED:
+        return
+    MODEL_TOKENS.inc(stage, model, "input", amount=input_tokens)
+    MODEL_TOKENS.inc(stage, model, "output", amount=output_tokens)
+    MODEL_COST.inc(stage, model, amount=estimate_model_cost(model, input_tokens, output_tokens))
+
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests and request duration."""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[set] = None
+
+    def _endpoint(self, scope) -> str:
+        # Label by documented API paths only so unknown URLs can't grow the label set
+        if self._routes is None:
+            app = scope["app"]
+            self._routes = set(app.openapi().get("paths", {})) | {"/metrics"}
+        path = scope["path"]
+        return path if path in self._routes else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        token = current_endpoint.set(endpoint)
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, endpoint, scope["method"], status[0]
+            )
+            current_endpoint.reset(token)
@@ -0,0 +1,261 @@
+"""
+Opt-in per-request profiling.
+
+When ``PROFILING_ENABLED`` is set, receipt requests carrying the admin
+``X-Profile`` header (or picked at ``PROFILING_SAMPLE_RATE``) run under a
+wall-clock stack sampler and ``tracemalloc``. The folded stacks and top
+allocations are stored in ``PROFILING_DIR`` and listed at ``/admin/profiles``.
+When profiling is disabled the middleware is not installed at all.
+"""
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.core.config import settings
+from src.core.logging import request_id_var
+from src.core.timing import current_timings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Threads sampled besides the one serving the request (image preprocessing, PDF rendering)
+WORKER_THREAD_PREFIX = "image-worker"
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        filename = filename[len(cwd) + 1:]
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _fold(frame) -> str:
+    """Render a stack as ``root;...;leaf`` for flame graph tools."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _is_idle_worker(frame) -> bool:
+    """True when a worker thread is parked waiting for a job."""
+    filename = frame.f_code.co_filename
+    return filename.endswith(("threading.py", "queue.py")) or (
+        frame.f_code.co_name == "_worker" and filename.endswith("thread.py")
+    )
+
+
+class WallClockSampler:
+    """Samples the stacks of selected threads at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _thread_names(self) -> Dict[int, str]:
+        return {
+            thread.ident: thread.name for thread in threading.enumerate()
+            if thread.ident == self.thread_id or thread.name.startswith(WORKER_THREAD_PREFIX)
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            names = self._thread_names()
+            frames = sys._current_frames()
+            for ident, name in names.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if ident != self.thread_id and _is_idle_worker(frame):
+                    continue
+                thread_label = "event-loop" if ident == self.thread_id else name
+                self.stacks[f"{thread_label};{_fold(frame)}"] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> Optional[tracemalloc.Snapshot]:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+    return snapshot
+
+
+def _finish_profiling(sampler: WallClockSampler) -> List[Dict]:
+    """Stop sampling and tracing (blocking: joins the sampler thread) and return the top allocations."""
+    sampler.stop()
+    return _top_allocations(_stop_tracemalloc())
+
+
+def _top_allocations(snapshot: Optional[tracemalloc.Snapshot], limit: int = 25) -> List[Dict]:
+    if snapshot is None:
+        return []
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return [
+        {
+            "location": str(stat.traceback[0]),
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """True when ``token`` is the configured admin token, compared in constant time."""
+    if not token or not settings.PROFILING_ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(token.encode(), settings.PROFILING_ADMIN_TOKEN.encode())
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def save_profile(profile: Dict, stacks: Counter) -> None:
+    """Write a profile's JSON summary and folded stacks, pruning the oldest beyond the limit."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile['id']}.json").write_text(json.dumps(profile, indent=2))
+    (directory / f"{profile['id']}.folded").write_text(
+        "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+    )
+
+    summaries = sorted(directory.glob("*.json"))
+    for old in summaries[:max(0, len(summaries) - settings.PROFILING_MAX_PROFILES)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def list_profiles() -> List[Dict]:
+    """Summaries of stored profiles, newest first."""
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            profile = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        profiles.append({
+            key: profile.get(key)
+            for key in ("id", "timestamp", "request_id", "method", "path", "status", "duration_ms", "samples")
+        })
+    return profiles
+
+
+def load_profile(profile_id: str) -> Optional[Dict]:
+    """Load one stored profile with its folded stacks, or None if unknown."""
+    path = profile_dir() / f"{Path(profile_id).name}.json"
+    if not path.exists():
+        return None
+    profile = json.loads(path.read_text())
+    folded = path.with_suffix(".folded")
+    profile["folded"] = folded.read_text() if folded.exists() else ""
+    return profile
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling opted-in requests under ``path_prefix``."""
+
+    def __init__(self, app, path_prefix: str = ""):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    def _should_profile(self, scope) -> bool:
+        if settings.PROFILING_ADMIN_TOKEN:
+            for name, value in scope.get("headers", []):
+                if name == PROFILE_HEADER:
+                    return is_admin_token(value.decode("latin-1"))
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.path_prefix)
+            or not self._should_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = WallClockSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        _start_tracemalloc()
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            from src.core.executor import run_blocking
+            duration_ms = (time.perf_counter() - start) * 1000
+            top_allocations = await run_blocking(_finish_profiling, sampler)
+            timings = current_timings.get()
+            profile = {
+                "id": profile_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "request_id": request_id_var.get(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status[0],
+                "duration_ms": round(duration_ms, 1),
+                "interval_ms": settings.PROFILING_INTERVAL_MS,
+                "samples": sampler.samples,
+                "stages_ms": {k: round(v, 1) for k, v in timings.stages.items()} if timings else {},
+                "top_stacks": [
+                    {"stack": stack, "samples": count}
+                    for stack, count in sampler.stacks.most_common(20)
+                ],
+                "top_allocations": top_allocations,
+            }
+            await run_blocking(save_profile, profile, sampler.stacks)
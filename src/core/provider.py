@@ -0,0 +1,174 @@
+"""
+Model provider configuration for the OpenAI Agents SDK.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Optional
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+# The Agents SDK and OpenAI client are imported inside the functions below so
+# that importing the app stays fast; they load on the first model call or in
+# the startup warm-up
+
+_configured = False
+# Client installed for agent model calls by use_openai_client (None: the SDK builds its own)
+_client: Optional["AsyncOpenAI"] = None
+
+_probe_result: Optional[Dict] = None
+_probe_checked = 0.0
+_probe_task: Optional[asyncio.Task] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def build_openai_client(http_client: Optional["httpx.AsyncClient"] = None) -> "AsyncOpenAI":
+    """
+    Build the OpenAI client used for model calls.
+
+    Args:
+        http_client: Optional custom HTTP client (e.g. an in-process ASGI transport)
+
+    Returns:
+        Client pointed at ``OPENAI_BASE_URL`` when set, otherwise the OpenAI API
+    """
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL or None,
+        http_client=http_client,
+    )
+
+
+def use_openai_client(client: Optional["AsyncOpenAI"], tracing: bool = False) -> None:
+    """
+    Route all agent model calls through ``client``.
+
+    Unless ``tracing`` is set, tracing is disabled so a local stub provider
+    doesn't cause trace uploads to the real platform with a placeholder key.
+
+    Args:
+        client: Client for model calls; None restores the SDK's own client
+            (e.g. the value ``get_openai_client`` returned before an override)
+        tracing: Keep tracing on and export traces with this client
+    """
+    global _client
+    from agents import set_default_openai_client, set_tracing_disabled
+    set_default_openai_client(client, use_for_tracing=tracing and client is not None)
+    if not tracing:
+        set_tracing_disabled(True)
+    _client = client
+
+
+def get_openai_client() -> Optional["AsyncOpenAI"]:
+    """The client installed by ``use_openai_client``, or None when the Agents SDK builds its own."""
+    return _client
+
+
+def configure_provider() -> None:
+    """
+    Configure the Agents SDK for the Responses API and the configured provider.
+
+    Safe to call repeatedly; only the first call has any effect.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    # Disable sensitive data logging to prevent image and receipt data in logs
+    # (read by the SDK when it is first imported)
+    os.environ["OPENAI_AGENTS_DONT_LOG_MODEL_DATA"] = "1"
+    from agents import set_default_openai_api
+
+    # Use the Responses API instead of chat completions
+    set_default_openai_api("responses")
+
+    if settings.OPENAI_BASE_URL:
+        use_openai_client(build_openai_client())
+
+
+async def _list_models(client: "AsyncOpenAI") -> None:
+    await client.with_options(
+        timeout=settings.PROVIDER_PROBE_TIMEOUT_S, max_retries=0
+    ).models.list()
+
+
+async def _run_probe(client: Optional["AsyncOpenAI"] = None) -> Dict:
+    import openai
+    start = time.perf_counter()
+    try:
+        if client is not None:
+            await _list_models(client)
+        else:
+            # Building a client loads the CA bundle, which takes long enough to stall the loop
+            from src.core.executor import run_blocking
+            async with await run_blocking(build_openai_client) as client:
+                await _list_models(client)
+        status, error = "reachable", None
+    except openai.AuthenticationError as e:
+        status, error = "unauthorized", type(e).__name__
+    except (openai.APIConnectionError, openai.APITimeoutError) as e:
+        status, error = "unreachable", type(e).__name__
+    except Exception as e:
+        status, error = "error", type(e).__name__
+    result = {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+async def probe_provider(client: Optional["AsyncOpenAI"] = None) -> Dict:
+    """
+    Check that the model provider is reachable by listing its models.
+
+    Results are cached for ``PROVIDER_PROBE_TTL_S`` and concurrent callers
+    share one in-flight probe, so readiness polling doesn't turn into a
+    stream of provider requests.
+
+    Args:
+        client: Client to probe with, keeping its connection pooled (default:
+            a short-lived client closed after the probe)
+
+    Returns:
+        ``status`` (reachable, unauthorized, unreachable or error), probe
+        latency and when it was checked
+    """
+    global _probe_result, _probe_checked, _probe_task
+    if _probe_result is not None and time.monotonic() - _probe_checked < settings.PROVIDER_PROBE_TTL_S:
+        return _probe_result
+
+    loop = asyncio.get_running_loop()
+    if _probe_task is None or _probe_task.done() or _probe_task.get_loop() is not loop:
+        _probe_task = loop.create_task(_run_probe(client))
+    task = _probe_task
+    result = await asyncio.shield(task)
+    if task is _probe_task:
+        _probe_result, _probe_checked, _probe_task = result, time.monotonic(), None
+    return result
+
+
+def cached_probe() -> Dict:
+    """
+    The last provider probe result, without waiting for a probe.
+
+    When the result is missing or older than ``PROVIDER_PROBE_TTL_S`` a
+    refresh starts in the background on the pooled client from
+    ``get_openai_client``; until the first probe finishes the status is
+    ``pending``. Readiness checks therefore never wait on the provider.
+    """
+    global _refresh_task
+    stale = _probe_result is None or time.monotonic() - _probe_checked >= settings.PROVIDER_PROBE_TTL_S
+    loop = asyncio.get_running_loop()
+    if stale and (_refresh_task is None or _refresh_task.done() or _refresh_task.get_loop() is not loop):
+        _refresh_task = loop.create_task(probe_provider(get_openai_client()))
+    return _probe_result if _probe_result is not None else {"status": "pending"}
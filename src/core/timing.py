@@ -0,0 +1,180 @@
+"""
+Per-request stage timings, ``Server-Timing`` headers and the slow-request log.
+
+Stages recorded through ``src.core.metrics.stage_timer`` are also collected
+on the current request's ``RequestTimings``. Receipt endpoints return them in
+a ``Server-Timing`` header, and requests slower than
+``SLOW_REQUEST_THRESHOLD_MS`` are sampled into a JSONL log written by a
+background thread.
+"""
+import json
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.config import settings
+from src.core.logging import request_id_var
+
+
+class RequestTimings:
+    """Stage durations and payload metadata for one request."""
+
+    __slots__ = ("start", "stages", "metadata")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.metadata: Dict[str, Any] = {}
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Add a stage duration; repeated stages (e.g. two model calls) accumulate."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+    def add_tokens(self, input_tokens: int, output_tokens: int) -> None:
+        self.metadata["input_tokens"] = self.metadata.get("input_tokens", 0) + input_tokens
+        self.metadata["output_tokens"] = self.metadata.get("output_tokens", 0) + output_tokens
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """Render the ``Server-Timing`` header value."""
+        entries = [f"{stage};dur={ms:.1f}" for stage, ms in self.stages.items()]
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def add_stage(stage: str, seconds: float) -> None:
+    """Record a stage on the current request, if any."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add_stage(stage, seconds)
+
+
+def annotate(**metadata: Any) -> None:
+    """Attach payload metadata (sizes, dimensions, models) to the current request."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.metadata.update(metadata)
+
+
+def add_tokens(input_tokens: int, output_tokens: int) -> None:
+    """Add model token usage to the current request."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add_tokens(input_tokens, output_tokens)
+
+
+class SlowRequestLog:
+    """Appends slow-request records to a JSONL file from a background thread."""
+
+    def __init__(self, path: Path, max_queue: int = 1000):
+        self.path = path
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                f.write(json.dumps(record) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def write(self, record: Dict) -> None:
+        """Queue a record without blocking; drops it when the queue is full."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-request-log", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+_slow_log: Optional[SlowRequestLog] = None
+
+
+def get_slow_request_log() -> SlowRequestLog:
+    """Return the process-wide slow-request log."""
+    global _slow_log
+    if _slow_log is None:
+        _slow_log = SlowRequestLog(Path(settings.SLOW_REQUEST_LOG_PATH))
+    return _slow_log
+
+
+def close_slow_request_log() -> None:
+    """Flush and close the slow-request log, if it was used."""
+    global _slow_log
+    if _slow_log is not None:
+        _slow_log.close()
+        _slow_log = None
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding ``Server-Timing`` to matching paths and logging slow requests."""
+
+    def __init__(self, app, path_prefix: str = ""):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((
+                        b"server-timing",
+                        timings.server_timing(timings.elapsed_ms()).encode("latin-1"),
+                    ))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+            total_ms = timings.elapsed_ms()
+            if (
+                total_ms >= settings.SLOW_REQUEST_THRESHOLD_MS
+                and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE
+            ):
+                get_slow_request_log().write({
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "request_id": request_id_var.get(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status[0],
+                    "total_ms": round(total_ms, 1),
+                    "stages_ms": {stage: round(ms, 1) for stage, ms in timings.stages.items()},
+                    **timings.metadata,
+                })
@@ -1,22 +1,43 @@
 """
 Main FastAPI application.
 """
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from src.core.config import settings
-from src.api.endpoints import receipts, health
+from src.core.executor import shutdown_executor
+from src.core.logging import setup_logging, shutdown_logging
+from src.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from src.core.metrics import MetricsMiddleware
+from src.core.timing import ServerTimingMiddleware, close_slow_request_log
+from src.services.warmup import start_warmup, stop_warmup
+from src.api.endpoints import admin, receipts, health, metrics
+from src.api.middleware.request_context import RequestContextMiddleware
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
-    print("Starting Receipt Processing API...")
+    setup_logging()
+    logger.info("Starting Receipt Processing API...")
+    start_loop_monitor()
+    # Load the Agents SDK, codecs, example index and provider connection in the
+    # background; /health/ready reports not ready until this finishes
+    start_warmup()
     yield
     # Shutdown
-    print("Shutting down...")
+    logger.info("Shutting down...")
+    await stop_warmup()
+    await stop_loop_monitor()
+    shutdown_executor()
+    close_slow_request_log()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -34,10 +55,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.PROFILING_ENABLED:
+    from src.core.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware, path_prefix=f"{settings.API_V1_STR}/receipts")
+app.add_middleware(ServerTimingMiddleware, path_prefix=f"{settings.API_V1_STR}/receipts")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 # Include routers
 app.include_router(receipts.router, prefix=settings.API_V1_STR)
 app.include_router(health.router, prefix=settings.API_V1_STR)
+app.include_router(admin.router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router)
 
 
 @app.get("/")
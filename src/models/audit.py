@@ -1,7 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, List, Literal
 from src.models.receipt import ReceiptDetails
 
+# "verbose" asks the model for prose reasoning; "terse" asks for reason codes
+# and renders the reasoning locally
+ReasoningMode = Literal["terse", "verbose"]
+
+TravelReason = Literal[
+    "FUEL", "LODGING", "AIRFARE", "CAR_RENTAL", "VEHICLE_SUPPLIES",
+    "OTHER_TRAVEL", "NON_TRAVEL_ITEMS"
+]
+AmountReason = Literal["UNDER_LIMIT", "OVER_LIMIT", "TOTAL_MISSING"]
+MathReason = Literal["TOTALS_MATCH", "WITHIN_ONE_CENT", "TOTALS_MISMATCH", "INSUFFICIENT_DATA"]
+HandwrittenReason = Literal["NO_NOTES", "NO_X_IN_NOTES", "X_IN_NOTES"]
+
 
 class AuditDecision(BaseModel):
     not_travel_related: bool = Field(
@@ -24,6 +36,65 @@ class AuditDecision(BaseModel):
     )
 
 
+class TerseAuditDecision(BaseModel):
+    """Audit decision with a reason code per criterion instead of prose reasoning."""
+    not_travel_related: bool = Field(
+        description="True if the receipt is not travel-related"
+    )
+    not_travel_related_reason: TravelReason = Field(
+        description="Kind of expense that decided NOT_TRAVEL_RELATED"
+    )
+    amount_over_limit: bool = Field(
+        description="True if the total amount exceeds $50"
+    )
+    amount_over_limit_reason: AmountReason = Field(
+        description="Why AMOUNT_OVER_LIMIT was decided"
+    )
+    math_error: bool = Field(
+        description="True if there are math errors in the receipt"
+    )
+    math_error_reason: MathReason = Field(
+        description="Outcome of checking that line items and tax sum to the total"
+    )
+    handwritten_x: bool = Field(
+        description="True if there is an 'X' in the handwritten notes"
+    )
+    handwritten_x_reason: HandwrittenReason = Field(
+        description="What the handwritten notes contain"
+    )
+    needs_audit: bool = Field(
+        description="Final determination if receipt needs auditing"
+    )
+
+
+class PackedAuditDecision(AuditDecision):
+    """Audit decision for one receipt inside a packed (multi-receipt) audit call."""
+    receipt_id: str = Field(
+        description="ID of the receipt this decision belongs to"
+    )
+
+
+class PackedAuditResult(BaseModel):
+    """Structured output of a packed audit call."""
+    decisions: List[PackedAuditDecision] = Field(
+        description="One audit decision per receipt, identified by receipt_id"
+    )
+
+
+class PackedTerseAuditDecision(TerseAuditDecision):
+    """Terse audit decision for one receipt inside a packed audit call."""
+    receipt_id: str = Field(
+        description="ID of the receipt this decision belongs to"
+    )
+
+
+class PackedTerseAuditResult(BaseModel):
+    """Structured output of a packed audit call in terse mode."""
+    decisions: List[PackedTerseAuditDecision] = Field(
+        description="One audit decision per receipt, identified by receipt_id"
+    )
+
+
 class ProcessingResult(BaseModel):
     receipt_details: ReceiptDetails
     audit_decision: AuditDecision
@@ -32,6 +103,10 @@ class ProcessingResult(BaseModel):
     processing_successful: bool = Field(
         description="True if the entire processing pipeline completed successfully"
     )
+    extraction_stages: List[str] = Field(
+        default_factory=list,
+        description="Extraction passes that ran, e.g. ['header'] or ['header', 'line_items']"
+    )
     error_message: str | None = Field(
         default=None,
         description="Error message if processing failed"
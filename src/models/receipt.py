@@ -1,8 +1,48 @@
 """
 Receipt data models.
 """
-from pydantic import BaseModel
-from typing import Optional, List
+import re
+
+from pydantic import BaseModel, Field
+from typing import Iterable, Optional, List, Literal
+
+# "full" extracts every ReceiptDetails field; "lean" only what the audit needs;
+# "staged" reads the header first and only extracts line items when needed
+ExtractionProfile = Literal["full", "lean", "staged"]
+
+ExpenseCategory = Literal[
+    "fuel", "lodging", "airfare", "car_rental", "vehicle_supplies",
+    "other_travel", "non_travel", "mixed", "unclear"
+]
+
+# Line item category used when a header category stands in for the line items
+EXPENSE_CATEGORY_LABELS = {
+    "fuel": "Fuel",
+    "lodging": "Lodging",
+    "airfare": "Airfare",
+    "car_rental": "Car Rental",
+    "vehicle_supplies": "Auto",
+    "other_travel": "Travel",
+    "non_travel": "Non-travel",
+}
+
+# A standalone "x" in a note, e.g. "X", "x - see manager" or "X."
+_X_NOTE_RE = re.compile(r"(^|[^a-z])x([^a-z]|$)", re.IGNORECASE)
+
+
+def parse_amount(value: Optional[str]) -> Optional[float]:
+    """Parse a monetary string such as "$1,204.00", returning None when it is not a number."""
+    if value is None:
+        return None
+    try:
+        return float(str(value).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def has_x_mark(notes: Iterable[str]) -> bool:
+    """True when any handwritten note contains an "X", which always requires an audit."""
+    return any(_X_NOTE_RE.search(note) for note in notes)
 
 
 class Location(BaseModel):
@@ -32,4 +72,90 @@ class ReceiptDetails(BaseModel):
     subtotal: Optional[str] = None
     tax: Optional[str] = None
     total: Optional[str] = None
-    handwritten_notes: List[str]
\ No newline at end of file
+    handwritten_notes: List[str]
+
+
+class LeanLineItem(BaseModel):
+    """Line item fields needed by the audit, with compact keys to save output tokens."""
+    c: Optional[str] = Field(default=None, description="Category of the item")
+    t: Optional[str] = Field(default=None, description="Total price for the line item")
+
+
+class LeanReceiptDetails(BaseModel):
+    """Audit-relevant receipt fields, with compact keys to save output tokens."""
+    m: Optional[str] = Field(default=None, description="Merchant name")
+    i: List[LeanLineItem] = Field(description="Purchased line items")
+    st: Optional[str] = Field(default=None, description="Subtotal before tax")
+    tx: Optional[str] = Field(default=None, description="Tax amount")
+    tt: Optional[str] = Field(default=None, description="Final total")
+    n: List[str] = Field(description="Handwritten notes, each listed separately")
+
+    def to_receipt_details(self) -> ReceiptDetails:
+        """Map the compact keys back to ``ReceiptDetails``, leaving other fields null."""
+        return ReceiptDetails(
+            merchant=self.m,
+            location=Location(),
+            time=None,
+            items=[LineItem(category=item.c, total=item.t) for item in self.i],
+            subtotal=self.st,
+            tax=self.tx,
+            total=self.tt,
+            handwritten_notes=self.n,
+        )
+
+    @classmethod
+    def from_receipt_details(cls, details: ReceiptDetails) -> "LeanReceiptDetails":
+        """Project full receipt details onto the lean fields."""
+        return cls(
+            m=details.merchant,
+            i=[LeanLineItem(c=item.category, t=item.total) for item in details.items],
+            st=details.subtotal,
+            tx=details.tax,
+            tt=details.total,
+            n=details.handwritten_notes,
+        )
+
+
+class ReceiptHeader(BaseModel):
+    """Header fields read by the fast first pass of staged extraction."""
+    m: Optional[str] = Field(default=None, description="Merchant name")
+    c: ExpenseCategory = Field(
+        description="Kind of expense the purchased items represent; 'mixed' if the items "
+        "span travel and non-travel kinds, 'unclear' if it cannot be told from the receipt"
+    )
+    ni: Optional[int] = Field(default=None, description="Number of purchased line items")
+    st: Optional[str] = Field(default=None, description="Subtotal before tax")
+    tx: Optional[str] = Field(default=None, description="Tax amount")
+    tt: Optional[str] = Field(default=None, description="Final total")
+    n: List[str] = Field(description="Handwritten notes, each listed separately")
+
+    def to_receipt_details(self) -> ReceiptDetails:
+        """
+        Build ``ReceiptDetails`` from the header alone.
+
+        The line items are summarised as one item carrying the expense category
+        and the pre-tax amount, so the totals still reconcile for the audit.
+        Without a subtotal the amount is the total less tax; when those can't
+        be parsed the item has no total rather than a tax-inclusive one.
+        """
+        line_total = self.st
+        if line_total is None:
+            total = parse_amount(self.tt)
+            tax = parse_amount(self.tx) if self.tx is not None else 0.0
+            if total is not None and tax is not None:
+                line_total = f"{total - tax:.2f}"
+
+        return ReceiptDetails(
+            merchant=self.m,
+            location=Location(),
+            time=None,
+            items=[LineItem(
+                category=EXPENSE_CATEGORY_LABELS.get(self.c),
+                quantity="1",
+                total=line_total,
+            )],
+            subtotal=self.st,
+            tax=self.tx,
+            total=self.tt,
+            handwritten_notes=self.n,
+        )
@@ -77,3 +77,27 @@ demonstrate how you should act:
 
 Return a structured response with your evaluation.
 """
+
+# Appended to the audit prompt when several receipts are audited in one call
+AUDIT_PACKED_INSTRUCTIONS = """
+You will receive several receipts in a single message, each wrapped in a
+<receipt id="..."> tag. Audit every receipt independently using the criteria and
+examples above; do not let one receipt influence the decision for another.
+
+Return one decision per receipt in `decisions`, setting `receipt_id` to the id of the
+receipt it belongs to. Return exactly one decision for every receipt id.
+"""
+
+# Appended to the audit prompt in terse mode, replacing prose reasoning with codes
+AUDIT_TERSE_INSTRUCTIONS = """
+Do not write any prose reasoning. Instead, for each criterion return the reason code
+that best explains your decision:
+
+- not_travel_related_reason: FUEL, LODGING, AIRFARE, CAR_RENTAL, VEHICLE_SUPPLIES,
+  OTHER_TRAVEL, or NON_TRAVEL_ITEMS
+- amount_over_limit_reason: UNDER_LIMIT, OVER_LIMIT, or TOTAL_MISSING
+- math_error_reason: TOTALS_MATCH, WITHIN_ONE_CENT, TOTALS_MISMATCH, or INSUFFICIENT_DATA
+- handwritten_x_reason: NO_NOTES, NO_X_IN_NOTES, or X_IN_NOTES
+
+The examples show the expected output format.
+"""
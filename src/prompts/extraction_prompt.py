@@ -37,4 +37,51 @@ Carefully examine the receipt image and identify the following key information:
 
 Your response should be structured and complete, capturing all available information
 from the receipt.
-"""
\ No newline at end of file
+"""
+
+# Reduced prompt for the audit path: only the fields the audit criteria use
+EXTRACTION_PROMPT_LEAN = """
+Given an image of a retail receipt, extract only the information needed to audit it
+and format it as a structured response using the compact field names below.
+
+* m: Merchant name
+* i: Every purchased line item, each with:
+  * c: Category (infer from context if not explicit, e.g. Fuel, Lodging, Office)
+  * t: Total price for the line item
+* st: Subtotal before tax
+* tx: Tax amount
+* tt: Final total
+* n: Any handwritten notes or annotations on the receipt (list each separately)
+
+## Important Guidelines
+
+* If information is unclear or missing, return null for that field
+* Format all monetary values as decimal numbers
+* Distinguish between printed text and handwritten notes
+* Be precise with amounts and totals
+* Include every line item, including fees and discounts
+"""
+
+# First pass of staged extraction: header fields only, read from a low-detail image
+EXTRACTION_PROMPT_HEADER = """
+Given an image of a retail receipt, read only the receipt header and totals and format
+them as a structured response using the compact field names below.
+
+* m: Merchant name
+* c: The kind of expense the purchased items represent: fuel, lodging, airfare,
+  car_rental, vehicle_supplies (e.g. oil, parts, car wash), other_travel, non_travel,
+  mixed (items span travel and non-travel kinds), or unclear
+* ni: Number of purchased line items
+* st: Subtotal before tax
+* tx: Tax amount
+* tt: Final total
+* n: Any handwritten notes or annotations on the receipt (list each separately)
+
+## Important Guidelines
+
+* Do not list the individual line items
+* If information is unclear or missing, return null for that field
+* Use "unclear" rather than guessing the expense category
+* Format all monetary values as decimal numbers
+* Pay close attention to handwritten marks such as an "X"
+"""
@@ -1,20 +1,29 @@
 """
 Service for auditing receipts based on business rules using OpenAI Agents SDK.
 """
+import asyncio
 import logging
-import os
-from typing import Optional
-from agents import Agent, Runner, set_default_openai_api
-from src.models.audit import AuditDecision
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+from src.models.audit import (
+    AuditDecision,
+    PackedAuditResult,
+    PackedTerseAuditResult,
+    ReasoningMode,
+    TerseAuditDecision,
+)
 from src.models.receipt import ReceiptDetails, Location, LineItem
+from src.core.agent_cache import get_agent, run_agent
 from src.core.config import settings
-from src.prompts.audit_prompts import AUDIT_PROMPT_IMPROVED
-
-# Configure to use Responses API
-set_default_openai_api("responses")
-
-# Disable sensitive data logging to prevent receipt data in logs
-os.environ["OPENAI_AGENTS_DONT_LOG_MODEL_DATA"] = "1"
+from src.core.metrics import record_error, record_fallback, record_usage, stage_timer
+from src.prompts.audit_prompts import (
+    AUDIT_PROMPT_IMPROVED,
+    AUDIT_PACKED_INSTRUCTIONS,
+    AUDIT_TERSE_INSTRUCTIONS,
+)
+from src.services.example_bank import NEAR_DUPLICATE_SCORE, format_example, get_example_bank, retrieval_enabled
+from src.utils.reason_codes import to_audit_decision
+from src.utils.tokens import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -118,67 +127,158 @@ def get_audit_examples():
     ]
 
 
+@lru_cache(maxsize=None)
+def static_examples(terse: bool = False) -> str:
+    """The static few-shot examples rendered for the audit prompt, built once."""
+    return "".join(
+        format_example(example["input"], example["output"], terse=terse)
+        for example in get_audit_examples()
+    )
+
+
 class AuditService:
     """Service for evaluating receipts against audit criteria using OpenAI Agents SDK."""
     
-    def __init__(self):
-        """Initialize audit service."""
-        # Configure to use Responses API
-        set_default_openai_api("responses")
-        # No client needed - agents handle this internally
-        self.examples = self._prepare_examples()
+    # No client needed - agents are built (and the provider configured) on first use
     
-    def _prepare_examples(self) -> str:
-        """Prepare few-shot examples for the audit prompt."""
-        examples = get_audit_examples()
-        
-        example_format = """
-<example>
-    <input>
-        {input}
-    </input>
-    <output>
-        {output}
-    </output>
-</example>
-"""
+    def _static_examples(self, terse: bool) -> str:
+        return static_examples(terse)
+    
+    def _select_examples(
+        self,
+        receipt_details: ReceiptDetails,
+        terse: bool = False,
+        exclude: Optional[Set[str]] = None
+    ) -> str:
+        """
+        Select few-shot examples for a receipt.
+        
+        Uses the most similar examples from the example bank when retrieval is
+        enabled and the bank has labelled examples, falling back to the static
+        examples otherwise. ``exclude`` marks the evaluation path: its bank
+        examples (the image stem of the receipt being evaluated) and
+        near-exact copies of the receipt are never selected.
+        """
+        if not retrieval_enabled():
+            return self._static_examples(terse)
         
-        examples_string = ""
-        for example in examples:
-            example_input = example["input"].model_dump_json()
-            correct_output = example["output"].model_dump_json()
-            examples_string += example_format.format(input=example_input, output=correct_output)
+        retrieved = get_example_bank().retrieve(
+            receipt_details,
+            k=settings.AUDIT_EXAMPLES_K,
+            token_budget=settings.AUDIT_EXAMPLES_TOKEN_BUDGET,
+            exclude=exclude,
+            terse=terse,
+            max_score=NEAR_DUPLICATE_SCORE if exclude else None,
+        )
+        if not retrieved:
+            return self._static_examples(terse)
         
-        return examples_string
+        return "".join(
+            result.example.terse_text if terse else result.example.text
+            for result in retrieved
+        )
+    
+    def _select_examples_for_batch(
+        self,
+        receipts: List[ReceiptDetails],
+        terse: bool = False,
+        exclude: Optional[Set[str]] = None
+    ) -> str:
+        """
+        Select few-shot examples shared by a batch of receipts.
+        
+        Takes the union of each receipt's retrieved examples, best scores first,
+        under the same count and token limits as a single audit. ``exclude``
+        and, with it, near-exact copies are skipped as in ``_select_examples``.
+        """
+        if not retrieval_enabled():
+            return self._static_examples(terse)
+        
+        bank = get_example_bank()
+        best_scores: Dict[str, float] = {}
+        candidates = {}
+        for receipt in receipts:
+            for result in bank.retrieve(
+                receipt,
+                k=settings.AUDIT_EXAMPLES_K,
+                token_budget=settings.AUDIT_EXAMPLES_TOKEN_BUDGET,
+                exclude=exclude,
+                terse=terse,
+                max_score=NEAR_DUPLICATE_SCORE if exclude else None,
+            ):
+                example_id = result.example.example_id
+                if result.score > best_scores.get(example_id, -1.0):
+                    best_scores[example_id] = result.score
+                    candidates[example_id] = result.example
+        
+        selected = []
+        used_tokens = 0
+        for example_id in sorted(best_scores, key=best_scores.get, reverse=True):
+            example = candidates[example_id]
+            tokens = example.terse_tokens if terse else example.tokens
+            if len(selected) >= settings.AUDIT_EXAMPLES_K:
+                break
+            if used_tokens + tokens > settings.AUDIT_EXAMPLES_TOKEN_BUDGET:
+                continue
+            selected.append(example.terse_text if terse else example.text)
+            used_tokens += tokens
+        
+        return "".join(selected) if selected else self._static_examples(terse)
+    
+    def _build_prompt(self, examples: str, terse: bool, packed: bool = False) -> str:
+        """Assemble the audit instructions for the requested output mode."""
+        prompt = AUDIT_PROMPT_IMPROVED.format(examples=examples)
+        if terse:
+            prompt += AUDIT_TERSE_INSTRUCTIONS
+        if packed:
+            prompt += AUDIT_PACKED_INSTRUCTIONS
+        return prompt
     
     async def audit_receipt(
         self,
         receipt_details: ReceiptDetails,
-        model: str = "gpt-4o-mini"
+        model: str = "gpt-4o-mini",
+        reasoning_mode: Optional[ReasoningMode] = None,
+        exclude_examples: Optional[Set[str]] = None
     ) -> AuditDecision:
-        """Audit a receipt based on business rules using OpenAI Agents SDK."""
+        """
+        Audit a receipt based on business rules using OpenAI Agents SDK.
+        
+        In ``terse`` mode the model returns a reason code per criterion and the
+        ``reasoning`` text is rendered locally, which cuts output tokens; in
+        ``verbose`` mode the model writes the reasoning itself. Defaults to
+        ``AUDIT_REASONING_MODE``. ``exclude_examples`` names example bank
+        entries to keep out of the prompt, e.g. the receipt under evaluation.
+        """
+        terse = (reasoning_mode or settings.AUDIT_REASONING_MODE) == "terse"
         receipt_json = receipt_details.model_dump_json(indent=2)
         
         # Use the improved prompt with examples
-        prompt = AUDIT_PROMPT_IMPROVED.format(examples=self.examples)
+        prompt = self._build_prompt(self._select_examples(receipt_details, terse, exclude_examples), terse)
         
         try:
             # Create audit agent
-            agent = Agent(
-                name="receipt_audit_agent",
-                instructions=prompt,
-                model=model,
-                output_type=AuditDecision
+            agent = get_agent(
+                "receipt_audit_agent",
+                prompt,
+                model,
+                TerseAuditDecision if terse else AuditDecision
             )
             
             # Run the agent with receipt data
             input_message = f"Audit this receipt data:\n\n{receipt_json}"
-            result = await Runner.run(agent, input_message)
+            with stage_timer("audit", model):
+                result = await run_agent(agent, input_message)
+            record_usage("audit", model, result)
             
+            if terse:
+                return to_audit_decision(result.final_output, receipt_details)
             return result.final_output
             
         except Exception as e:
-            logger.error(f"Error during audit: {str(e)}")
+            logger.error(f"Error during audit: {str(e)}", extra={"model": model})
+            record_error("audit", model)
+            record_fallback("audit", "forced_audit")
             return AuditDecision(
                 not_travel_related=False,
                 amount_over_limit=False,
@@ -187,4 +287,140 @@ class AuditService:
                 reasoning=f"Audit error: {str(e)}",
                 needs_audit=True
             )
-
+    
+    def _pack(self, receipt_jsons: List[str]) -> List[List[int]]:
+        """
+        Group receipt indices into packs bounded by count and token budget.
+        
+        A receipt larger than the token budget on its own still gets a pack.
+        """
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, receipt_json in enumerate(receipt_jsons):
+            tokens = estimate_tokens(receipt_json)
+            if current and (
+                len(current) >= settings.AUDIT_PACK_MAX_RECEIPTS
+                or current_tokens + tokens > settings.AUDIT_PACK_TOKEN_BUDGET
+            ):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+    
+    async def _audit_pack(
+        self,
+        receipts: List[ReceiptDetails],
+        receipt_jsons: List[str],
+        model: str,
+        reasoning_mode: ReasoningMode,
+        exclude_examples: Optional[Set[str]] = None
+    ) -> List[AuditDecision]:
+        """Audit one pack of receipts in a single call, falling back per receipt."""
+        if len(receipts) == 1:
+            return [await self.audit_receipt(receipts[0], model, reasoning_mode, exclude_examples)]
+        
+        terse = reasoning_mode == "terse"
+        receipt_ids = [f"r{i}" for i in range(len(receipts))]
+        receipts_by_id = dict(zip(receipt_ids, receipts))
+        prompt = self._build_prompt(
+            self._select_examples_for_batch(receipts, terse, exclude_examples), terse, packed=True
+        )
+        input_message = "Audit each of these receipts:\n\n" + "\n".join(
+            f'<receipt id="{receipt_id}">\n{receipt_json}\n</receipt>'
+            for receipt_id, receipt_json in zip(receipt_ids, receipt_jsons)
+        )
+        
+        decisions: Dict[str, Optional[AuditDecision]] = {}
+        try:
+            agent = get_agent(
+                "receipt_packed_audit_agent",
+                prompt,
+                model,
+                PackedTerseAuditResult if terse else PackedAuditResult
+            )
+            with stage_timer("audit_packed", model):
+                result = await run_agent(agent, input_message)
+            record_usage("audit_packed", model, result)
+            
+            for packed in result.final_output.decisions:
+                if packed.receipt_id not in receipts_by_id:
+                    continue
+                if packed.receipt_id in decisions:
+                    # Ambiguous output for this ID; re-audit it on its own
+                    decisions[packed.receipt_id] = None
+                    continue
+                if terse:
+                    decisions[packed.receipt_id] = to_audit_decision(
+                        packed, receipts_by_id[packed.receipt_id]
+                    )
+                else:
+                    decisions[packed.receipt_id] = AuditDecision.model_validate(
+                        packed.model_dump(exclude={"receipt_id"})
+                    )
+        except Exception as e:
+            logger.warning(f"Packed audit failed, falling back to single audits: {str(e)}")
+            record_error("audit_packed", model)
+            decisions = {}
+        
+        missing = [
+            i for i, receipt_id in enumerate(receipt_ids)
+            if decisions.get(receipt_id) is None
+        ]
+        if missing:
+            logger.warning(f"Packed audit returned no valid decision for {len(missing)} of {len(receipts)} receipts")
+            record_fallback("audit_packed", "single_audit", len(missing))
+            fallbacks = await asyncio.gather(
+                *(self.audit_receipt(receipts[i], model, reasoning_mode, exclude_examples) for i in missing)
+            )
+            for i, decision in zip(missing, fallbacks):
+                decisions[receipt_ids[i]] = decision
+        
+        return [decisions[receipt_id] for receipt_id in receipt_ids]
+    
+    async def audit_receipts_packed(
+        self,
+        receipts: List[ReceiptDetails],
+        model: str = "gpt-4o-mini",
+        reasoning_mode: Optional[ReasoningMode] = None,
+        exclude_examples: Optional[Set[str]] = None
+    ) -> List[AuditDecision]:
+        """
+        Audit many receipts, packing several into each model call.
+        
+        Receipts are grouped by ``AUDIT_PACK_MAX_RECEIPTS`` and
+        ``AUDIT_PACK_TOKEN_BUDGET`` so the criteria and few-shot examples are
+        sent once per pack rather than once per receipt. At most
+        ``AUDIT_PACK_CONCURRENCY`` packs are in flight at once, so a large
+        batch doesn't hit the provider's rate limit in one burst. Receipts whose
+        decision is missing or invalid in the packed output are re-audited
+        individually. ``exclude_examples`` is kept out of every pack's examples.
+        
+        Returns:
+            Audit decisions in the same order as ``receipts``
+        """
+        reasoning_mode = reasoning_mode or settings.AUDIT_REASONING_MODE
+        receipt_jsons = [receipt.model_dump_json() for receipt in receipts]
+        packs = self._pack(receipt_jsons)
+        semaphore = asyncio.Semaphore(settings.AUDIT_PACK_CONCURRENCY)
+        
+        async def audit_pack(pack: List[int]) -> List[AuditDecision]:
+            async with semaphore:
+                return await self._audit_pack(
+                    [receipts[i] for i in pack],
+                    [receipt_jsons[i] for i in pack],
+                    model,
+                    reasoning_mode,
+                    exclude_examples
+                )
+        
+        pack_results = await asyncio.gather(*(audit_pack(pack) for pack in packs))
+        
+        decisions: List[Optional[AuditDecision]] = [None] * len(receipts)
+        for pack, pack_decisions in zip(packs, pack_results):
+            for i, decision in zip(pack, pack_decisions):
+                decisions[i] = decision
+        return decisions
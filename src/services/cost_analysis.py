@@ -1,8 +1,24 @@
 """
 Business cost analysis integration for evaluation results.
 """
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+
+from src.models.audit import EvaluationRecord
 from src.utils.cost_calculator import calculate_costs, calculate_system_metrics
 
+# Audit decision fields compared between ground truth and prediction
+AUDIT_FIELDS = ("needs_audit", "not_travel_related", "amount_over_limit", "math_error", "handwritten_x")
+
+# Long-form count names used by some saved eval results
+_COUNT_ALIASES = {
+    "tp": "true_positives",
+    "fp": "false_positives",
+    "tn": "true_negatives",
+    "fn": "false_negatives",
+}
+
 
 def summarize_costs_from_eval(eval_result: dict, per_receipt_cost: float = 2.0):
     """
@@ -11,20 +27,19 @@ def summarize_costs_from_eval(eval_result: dict, per_receipt_cost: float = 2.0):
     """
     # Example: eval_result["metrics"] = {"tp": 100, "fp": 5, "tn": 80, "fn": 10}
     metrics = eval_result.get("metrics", {})
-    tp = metrics.get("tp", 0)
-    fp = metrics.get("fp", 0)
-    tn = metrics.get("tn", 0)
-    fn = metrics.get("fn", 0)
-    
-    # Calculate error rates
-    total = tp + fp + tn + fn
-    fp_rate = fp / total if total else 0
-    fn_rate = fn / total if total else 0
-    
+    tp, fp, tn, fn = (
+        int(metrics.get(key, metrics.get(alias, 0))) for key, alias in _COUNT_ALIASES.items()
+    )
+
+    # Error rates are conditional on the true class, as calculate_costs expects:
+    # FP rate over receipts that don't need an audit, FN rate over those that do
+    system_metrics = calculate_system_metrics(tp, fp, tn, fn)
+    fp_rate = system_metrics["fp_rate"]
+    fn_rate = system_metrics["fn_rate"]
+
     # Calculate costs
     total_cost = calculate_costs(fp_rate, fn_rate, per_receipt_cost)
-    system_metrics = calculate_system_metrics(tp, fp, tn, fn)
-    
+
     return {
         "total_cost": total_cost,
         "system_metrics": system_metrics,
@@ -35,3 +50,96 @@ def summarize_costs_from_eval(eval_result: dict, per_receipt_cost: float = 2.0):
         "tn": tn,
         "fn": fn,
     }
+
+
+def audit_decision_arrays(records: Iterable[Union[EvaluationRecord, Dict]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ground truth and predicted audit decisions as boolean arrays.
+
+    Args:
+        records: ``EvaluationRecord``s or dataset items (``{"item": {...}}``)
+
+    Returns:
+        ``(actual, predicted)``, each of shape ``(len(records), len(AUDIT_FIELDS))``
+    """
+    actual, predicted = [], []
+    for record in records:
+        if isinstance(record, EvaluationRecord):
+            actual.append([getattr(record.correct_audit_decision, field) for field in AUDIT_FIELDS])
+            predicted.append([getattr(record.predicted_audit_decision, field) for field in AUDIT_FIELDS])
+        else:
+            item = record.get("item", record)
+            actual.append([item["correct_audit_decision"][field] for field in AUDIT_FIELDS])
+            predicted.append([item["predicted_audit_decision"][field] for field in AUDIT_FIELDS])
+    shape = (len(actual), len(AUDIT_FIELDS))
+    return (
+        np.array(actual, dtype=bool).reshape(shape),
+        np.array(predicted, dtype=bool).reshape(shape),
+    )
+
+
+def confusion_counts(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, np.ndarray]:
+    """TP/FP/TN/FN counts per column of boolean ``actual`` and ``predicted`` arrays."""
+    actual, predicted = np.asarray(actual, dtype=bool), np.asarray(predicted, dtype=bool)
+    return {
+        "tp": np.count_nonzero(actual & predicted, axis=0),
+        "fp": np.count_nonzero(~actual & predicted, axis=0),
+        "tn": np.count_nonzero(~actual & ~predicted, axis=0),
+        "fn": np.count_nonzero(actual & ~predicted, axis=0),
+    }
+
+
+def audit_confusion_matrices(records: Iterable[Union[EvaluationRecord, Dict]]) -> Dict[str, Dict]:
+    """
+    Confusion matrix and system metrics for ``needs_audit`` and each audit criterion.
+
+    A positive is a ``True`` decision (audit needed, criterion violated).
+
+    Returns:
+        ``{field: {"tp", "fp", "tn", "fn", **calculate_system_metrics}}``
+    """
+    counts = confusion_counts(*audit_decision_arrays(records))
+    matrices = {}
+    for column, field in enumerate(AUDIT_FIELDS):
+        c = {key: int(values[column]) for key, values in counts.items()}
+        matrices[field] = {**c, **calculate_system_metrics(c["tp"], c["fp"], c["tn"], c["fn"])}
+    return matrices
+
+
+def summarize_costs_from_records(
+    records: Iterable[Union[EvaluationRecord, Dict]],
+    per_receipt_cost: float = 2.0
+) -> Dict:
+    """
+    Business cost summary computed locally from dataset records.
+
+    The ``needs_audit`` confusion matrix feeds ``summarize_costs_from_eval``;
+    the per-criterion matrices are included for diagnosis.
+
+    Returns:
+        ``summarize_costs_from_eval`` output plus ``"metrics"`` (the
+        ``needs_audit`` counts) and ``"confusion_matrices"`` (per field)
+    """
+    matrices = audit_confusion_matrices(records)
+    needs_audit = matrices["needs_audit"]
+    metrics = {key: needs_audit[key] for key in _COUNT_ALIASES}
+    return {
+        **summarize_costs_from_eval({"metrics": metrics}, per_receipt_cost),
+        "metrics": metrics,
+        "confusion_matrices": matrices,
+    }
+
+
+def format_cost_summary(summary: Dict) -> str:
+    """Cost, error rates and per-field confusion counts as printable lines."""
+    lines = [
+        f"   Total Cost: ${summary['total_cost']:,.2f}",
+        f"   FP Rate: {summary['fp_rate']:.3f}, FN Rate: {summary['fn_rate']:.3f}",
+        f"   {'field':<20} {'tp':>6} {'fp':>6} {'tn':>6} {'fn':>6} {'accuracy':>9} {'recall':>7}",
+    ]
+    for field, m in summary.get("confusion_matrices", {}).items():
+        lines.append(
+            f"   {field:<20} {m['tp']:>6} {m['fp']:>6} {m['tn']:>6} {m['fn']:>6} "
+            f"{m['accuracy']:>9.3f} {m['recall']:>7.3f}"
+        )
+    return "\n".join(lines)
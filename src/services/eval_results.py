@@ -0,0 +1,260 @@
+"""
+Incremental downloader for eval run output items.
+
+Output items are cached per run under ``EVAL_RESULTS_CACHE_DIR/<run_id>/``:
+``items.jsonl`` holds one item per line, keyed by its id, and
+``manifest.json`` records how far the download got. The list endpoint is
+cursor-paged, so pages can't be fetched in parallel; instead one walker pages
+forward from the oldest item (resuming after the last page it saved) while a
+second pages backward from the newest, and each stops when it reaches an item
+that is already known. A first download meets in the middle, a re-run of a
+still-running eval only fetches the items added since, and a finished run
+that is fully cached makes no requests at all.
+
+``grader_columns`` turns items into one array per grader of scores and
+pass/fail, for summaries over large runs.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Run statuses after which no more output items appear
+FINAL_RUN_STATUSES = {"completed", "failed", "canceled"}
+
+
+class EvalResultsCache:
+    """
+    Output items and download progress per eval run.
+
+    Args:
+        root: Cache directory (default: ``EVAL_RESULTS_CACHE_DIR``)
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.EVAL_RESULTS_CACHE_DIR)
+
+    def run_dir(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    def load_manifest(self, run_id: str) -> Dict:
+        path = self.run_dir(run_id) / "manifest.json"
+        if not path.exists():
+            return {"forward_after": None, "complete": False, "run_status": None}
+        return json.loads(path.read_text())
+
+    def save_manifest(self, run_id: str, manifest: Dict) -> None:
+        path = self.run_dir(run_id) / "manifest.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest))
+        tmp_path.replace(path)
+
+    def load_items(self, run_id: str) -> Dict[str, Dict]:
+        """Cached items by id; a partial last line from an interrupted write is ignored."""
+        items: Dict[str, Dict] = {}
+        path = self.run_dir(run_id) / "items.jsonl"
+        if not path.exists():
+            return items
+        with open(path) as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                items[item["id"]] = item
+        return items
+
+    def append_items(self, run_id: str, items: Sequence[Dict]) -> None:
+        if not items:
+            return
+        path = self.run_dir(run_id) / "items.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(json.dumps(item) + "\n" for item in items))
+
+    def clear(self, run_id: str) -> None:
+        for name in ("items.jsonl", "manifest.json"):
+            (self.run_dir(run_id) / name).unlink(missing_ok=True)
+
+
+@dataclass
+class RunItems:
+    """A run's output items, ordered by data source item, and what the download cost."""
+    eval_id: str
+    run_id: str
+    run_status: Optional[str]
+    items: List[Dict]
+    fetched: int
+    requests: int
+
+
+async def download_run_items(
+    eval_id: str,
+    run_id: str,
+    client: Any = None,
+    cache: Optional[EvalResultsCache] = None,
+    page_size: int = 100,
+    refresh: bool = False
+) -> RunItems:
+    """
+    Download a run's output items, fetching only those not already cached.
+
+    Args:
+        client: ``AsyncOpenAI`` client (default: one built from settings)
+        cache: Item cache (default: ``EVAL_RESULTS_CACHE_DIR``)
+        page_size: Items per page request (max 100)
+        refresh: Drop the cached items and download the run again
+    """
+    if client is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    cache = cache or EvalResultsCache()
+    if refresh:
+        cache.clear(run_id)
+
+    manifest = cache.load_manifest(run_id)
+    items = cache.load_items(run_id)
+    known: Set[str] = set(items)
+    requests = 0
+    fetched = 0
+
+    if manifest["complete"] and manifest["run_status"] in FINAL_RUN_STATUSES:
+        logger.info(f"Eval run {run_id}: all {len(items)} items cached")
+        return RunItems(eval_id, run_id, manifest["run_status"], _ordered(items), 0, 0)
+
+    run = await client.evals.runs.retrieve(run_id, eval_id=eval_id)
+    requests += 1
+    # The run's status before paging, so items added while paging are picked up next time
+    run_status = run.status
+
+    def save(page_items: List[Dict]) -> None:
+        nonlocal fetched
+        new = [item for item in page_items if item["id"] not in known]
+        known.update(item["id"] for item in new)
+        items.update((item["id"], item) for item in new)
+        cache.append_items(run_id, new)
+        fetched += len(new)
+
+    async def walk(order: str, after: Optional[str]) -> bool:
+        """Page in one direction until reaching a known item; True when the run's end was reached."""
+        nonlocal requests
+        params: Dict[str, Any] = {"eval_id": eval_id, "order": order, "limit": page_size}
+        if after:
+            params["after"] = after
+        page = await client.evals.runs.output_items.list(run_id, **params)
+        while True:
+            requests += 1
+            page_items = [item.model_dump(mode="json") for item in page.data]
+            met = next((i for i, item in enumerate(page_items) if item["id"] in known), None)
+            new = page_items[:met]
+            save(new)
+            if order == "asc" and new:
+                # Resume point for an interrupted download
+                manifest["forward_after"] = new[-1]["id"]
+                cache.save_manifest(run_id, manifest)
+            if met is not None:
+                return False
+            if not page.has_next_page():
+                return True
+            page = await page.get_next_page()
+
+    walkers = [walk("desc", None)]
+    if not manifest["complete"]:
+        walkers.append(walk("asc", manifest["forward_after"]))
+    await asyncio.gather(*walkers)
+
+    manifest["complete"] = True
+    manifest["run_status"] = run_status
+    cache.save_manifest(run_id, manifest)
+    logger.info(f"Eval run {run_id}: {fetched} new items, {len(items)} total, {requests} requests")
+    return RunItems(eval_id, run_id, run_status, _ordered(items), fetched, requests)
+
+
+def _ordered(items: Dict[str, Dict]) -> List[Dict]:
+    return sorted(items.values(), key=lambda item: (item.get("datasource_item_id", 0), item["id"]))
+
+
+def grader_columns(items: Sequence[Dict]) -> Dict:
+    """
+    Columnar view of per-grader results.
+
+    Returns:
+        ``{"item_id", "datasource_item_id", "status"}`` lists and ``"graders"``:
+        ``{name: {"score": float array, "passed": float array}}`` with one entry
+        per item, NaN where the grader has no result for it
+    """
+    names: List[str] = []
+    for item in items:
+        for result in item.get("results", []):
+            if result["name"] not in names:
+                names.append(result["name"])
+    scores = np.full((len(names), len(items)), np.nan)
+    passed = np.full((len(names), len(items)), np.nan)
+    rows = {name: i for i, name in enumerate(names)}
+    for column, item in enumerate(items):
+        for result in item.get("results", []):
+            row = rows[result["name"]]
+            scores[row, column] = result.get("score", np.nan)
+            passed[row, column] = float(result.get("passed", False))
+    return {
+        "item_id": [item["id"] for item in items],
+        "datasource_item_id": [item.get("datasource_item_id") for item in items],
+        "status": [item.get("status") for item in items],
+        "graders": {name: {"score": scores[i], "passed": passed[i]} for i, name in enumerate(names)},
+    }
+
+
+def summarize_graders(columns: Dict) -> List[Dict]:
+    """Count, pass rate and mean/min/max score per grader, ignoring missing results."""
+    summary = []
+    for name, column in columns["graders"].items():
+        graded = ~np.isnan(column["passed"])
+        count = int(graded.sum())
+        scores = column["score"][graded]
+        summary.append({
+            "name": name,
+            "count": count,
+            "pass_rate": float(column["passed"][graded].mean()) if count else None,
+            "mean_score": float(np.nanmean(scores)) if count else None,
+            "min_score": float(np.nanmin(scores)) if count else None,
+            "max_score": float(np.nanmax(scores)) if count else None,
+        })
+    return summary
+
+
+def columns_to_json(columns: Dict) -> Dict:
+    """``grader_columns`` output with arrays as lists (NaN as null)."""
+    def values(array: np.ndarray) -> List[Optional[float]]:
+        return [None if np.isnan(value) else float(value) for value in array]
+
+    return {
+        **{key: value for key, value in columns.items() if key != "graders"},
+        "graders": {
+            name: {"score": values(column["score"]), "passed": values(column["passed"])}
+            for name, column in columns["graders"].items()
+        },
+    }
+
+
+def format_grader_summary(summary: Sequence[Dict]) -> str:
+    """Table of per-grader pass rates and scores."""
+    width = max((len(row["name"]) for row in summary), default=6)
+    lines = [f"{'grader':<{width}}  {'count':>6}  {'pass rate':>9}  {'mean':>7}  {'min':>7}  {'max':>7}"]
+    for row in summary:
+        if not row["count"]:
+            lines.append(f"{row['name']:<{width}}  {0:>6}")
+            continue
+        lines.append(
+            f"{row['name']:<{width}}  {row['count']:>6}  {row['pass_rate']:>9.1%}  "
+            f"{row['mean_score']:>7.3f}  {row['min_score']:>7.3f}  {row['max_score']:>7.3f}"
+        )
+    return "\n".join(lines)
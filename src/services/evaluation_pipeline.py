@@ -1,7 +1,10 @@
 """Evaluation pipeline following the notebook pattern."""
 import asyncio
+import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Collection, Dict, Iterable, List, Literal, NamedTuple, Optional, Set
 import json
 from datetime import datetime
 
@@ -10,16 +13,206 @@ from src.models.receipt import ReceiptDetails
 from src.models.audit import AuditDecision, EvaluationRecord
 from src.services.extraction import ExtractionService
 from src.services.audit import AuditService
+from src.services.prediction_cache import (
+    PredictionCache,
+    audit_prompt_hash,
+    hash_bytes,
+    is_fallback_audit,
+    is_fallback_extraction,
+)
 from src.core.config import settings
+from src.utils.dataset_shards import DatasetShard, ShardRecord
+
+logger = logging.getLogger(__name__)
+
+# Called after each image with (completed, total, image name, error or None)
+ProgressCallback = Callable[[int, int, str, Optional[str]], None]
+
+
+def load_checkpoint(checkpoint_path: Path) -> Dict[str, Dict]:
+    """
+    Load completed dataset items from a JSONL checkpoint.
+
+    A truncated last line (from an interrupted run) is ignored.
+
+    Returns:
+        Dataset items keyed by receipt image name
+    """
+    items: Dict[str, Dict] = {}
+    if not checkpoint_path.exists():
+        return items
+    with open(checkpoint_path) as f:
+        for line in f:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            items[item["item"]["receipt_image_path"]] = item
+    return items
+
+
+class RecordResult(NamedTuple):
+    """A finished receipt: its record, or the error that kept it out of the dataset."""
+    name: str
+    record: Optional[EvaluationRecord]
+    error: Optional[str]
+
+
+class DatasetWriter:
+    """
+    Appends dataset items to a JSONL file in batches, fsyncing each batch.
+    
+    Without ``resume`` the file is started over. With ``resume`` its complete
+    lines are kept (a partial last line from an interrupted run is dropped)
+    and their receipt names collected in ``completed``; the file is streamed,
+    so resuming a large dataset doesn't load it into memory.
+    
+    Args:
+        path: Output file
+        resume: Keep the items already in ``path``
+        batch_size: Items per write and fsync (default ``DATASET_WRITE_BATCH_SIZE``)
+    """
+    
+    def __init__(self, path: Path, resume: bool = False, batch_size: Optional[int] = None):
+        self.path = path
+        self.batch_size = batch_size or settings.DATASET_WRITE_BATCH_SIZE
+        self.completed: Set[str] = set()
+        self.written = 0
+        self._batch: List[str] = []
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Rewrite resumed items to a temporary file first so a crash here can't lose them
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as out:
+            if resume and path.exists():
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            continue
+                        self.completed.add(item["item"]["receipt_image_path"])
+                        out.write(line if line.endswith("\n") else line + "\n")
+        os.replace(tmp_path, path)
+        self._file = open(path, "a")
+    
+    def write(self, item: Dict) -> None:
+        self._batch.append(json.dumps(item))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write and fsync the pending batch."""
+        if not self._batch:
+            return
+        self._file.write("\n".join(self._batch) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.written += len(self._batch)
+        self._batch.clear()
+    
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+    
+    def __enter__(self) -> "DatasetWriter":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _log_progress(completed: int, total: int, image_name: str, error: Optional[str]) -> None:
+    if error:
+        logger.warning(f"[{completed}/{total}] {image_name} failed: {error}")
+    else:
+        logger.info(f"[{completed}/{total}] {image_name}")
 
 
 class EvaluationPipeline:
     """Pipeline for running evaluations following the notebook pattern."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[PredictionCache] = None):
+        """
+        Args:
+            cache: Prediction cache; when set, extractions and audits whose
+                image, model and prompts are unchanged are reused
+        """
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.extraction_service = ExtractionService()
         self.audit_service = AuditService()
+        self.cache = cache
+    
+    async def predict_extraction(
+        self,
+        image_data: bytes,
+        filename: str,
+        model: str,
+        prepare: Optional[Callable[[], Awaitable[str]]] = None,
+        image_hash: Optional[str] = None
+    ) -> ReceiptDetails:
+        """
+        Extract a receipt, reusing a cached extraction of the same image, model and prompt.
+        
+        Args:
+            prepare: Returns the preprocessed, base64 encoded image; lets callers
+                sending one image to several models share its preprocessing.
+                Only called when the extraction isn't cached.
+            image_hash: Hash of the original image file when ``image_data`` is
+                already preprocessed (e.g. from a dataset shard)
+        """
+        async def extract() -> ReceiptDetails:
+            if prepare is None:
+                return await self.extraction_service.extract_receipt_details(image_data, filename, model=model)
+            return await self.extraction_service.extract_prepared(await prepare(), model)
+        
+        if self.cache is None:
+            return await extract()
+        
+        key = self.cache.extraction_key(image_hash or hash_bytes(image_data), model)
+        cached = self.cache.get("extraction", key, ReceiptDetails)
+        if cached is not None:
+            return cached
+        details = await extract()
+        # Don't cache the empty fallback from a failed call, so the next run retries it
+        if not is_fallback_extraction(details):
+            self.cache.put("extraction", key, details)
+        return details
+    
+    async def predict_audit(
+        self,
+        receipt_details: ReceiptDetails,
+        model: str,
+        example_id: Optional[str] = None
+    ) -> AuditDecision:
+        """
+        Audit a receipt, reusing a cached audit of the same receipt, model and prompt.
+        
+        Args:
+            example_id: Example bank ID of the receipt under evaluation (its
+                image stem), kept out of the audit's few-shot examples so the
+                audit is never shown its own label
+        """
+        # Verbose reasoning so the reasoning quality grader has prose to judge
+        reasoning_mode = "verbose"
+        exclude_examples = {example_id} if example_id else None
+        if self.cache is None:
+            return await self.audit_service.audit_receipt(
+                receipt_details, model=model, reasoning_mode=reasoning_mode, exclude_examples=exclude_examples
+            )
+        
+        key = self.cache.audit_key(
+            receipt_details, model, reasoning_mode, audit_prompt_hash(reasoning_mode), example_id
+        )
+        cached = self.cache.get("audit", key, AuditDecision)
+        if cached is not None:
+            return cached
+        decision = await self.audit_service.audit_receipt(
+            receipt_details, model=model, reasoning_mode=reasoning_mode, exclude_examples=exclude_examples
+        )
+        if not is_fallback_audit(decision):
+            self.cache.put("audit", key, decision)
+        return decision
     
     async def create_evaluation_record(
         self,
@@ -39,12 +232,8 @@ class EvaluationPipeline:
         with open(image_path, 'rb') as f:
             image_data = f.read()
         
-        predicted_details = await self.extraction_service.extract_receipt_details(
-            image_data, image_path.name, model=model
-        )
-        predicted_audit = await self.audit_service.audit_receipt(
-            predicted_details, model=model
-        )
+        predicted_details = await self.predict_extraction(image_data, image_path.name, model)
+        predicted_audit = await self.predict_audit(predicted_details, model, image_path.stem)
         
         return EvaluationRecord(
             receipt_image_path=str(image_path.name),
@@ -54,21 +243,265 @@ class EvaluationPipeline:
             predicted_audit_decision=predicted_audit,
         )
     
+    async def create_shard_record(self, record: ShardRecord, model: str = "gpt-4o-mini") -> EvaluationRecord:
+        """Create an evaluation record for a receipt from a dataset shard, skipping preprocessing."""
+        if record.ground_truth is None:
+            raise LookupError("no ground truth")
+        
+        async def prepare() -> str:
+            return self.extraction_service._image_to_base64(record.payload)
+        
+        predicted_details = await self.predict_extraction(
+            record.payload, record.name, model, prepare=prepare, image_hash=record.source_sha256
+        )
+        predicted_audit = await self.predict_audit(predicted_details, model, Path(record.name).stem)
+        
+        return EvaluationRecord(
+            receipt_image_path=record.name,
+            correct_receipt_details=ReceiptDetails.model_validate(record.ground_truth["extraction"]),
+            predicted_receipt_details=predicted_details,
+            correct_audit_decision=AuditDecision.model_validate(record.ground_truth["audit"]),
+            predicted_audit_decision=predicted_audit,
+        )
+    
     async def create_dataset_content(
         self,
         receipt_image_dir: Path,
         ground_truth_dir: Path,
-        model: str = "gpt-4o-mini"
+        model: str = "gpt-4o-mini",
+        concurrency: Optional[int] = None,
+        checkpoint_path: Optional[Path] = None,
+        resume: bool = False,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> List[Dict]:
+        """
+        Create dataset content following notebook format.
+        
+        At most ``concurrency`` receipts (default ``EVAL_CONCURRENCY``) are
+        processed at once. With ``checkpoint_path`` each item is appended to a
+        JSONL file as soon as it completes, so an interrupted run keeps its
+        progress; ``resume`` skips the images already in the checkpoint instead
+        of starting it over. A failing image is reported through
+        ``on_progress`` and left out rather than failing the whole run, so a
+        resumed run retries it.
+        
+        Returns:
+            Dataset items in image name order, including resumed ones
+        """
+        image_paths = sorted(receipt_image_dir.glob("*.jpg"))
+        return await self._build_dataset(
+            [path.name for path in image_paths],
+            lambda name: self.create_evaluation_record(receipt_image_dir / name, ground_truth_dir, model),
+            concurrency,
+            checkpoint_path,
+            resume,
+            on_progress,
+        )
+    
+    async def create_dataset_from_shard(
+        self,
+        shard: DatasetShard,
+        model: str = "gpt-4o-mini",
+        concurrency: Optional[int] = None,
+        checkpoint_path: Optional[Path] = None,
+        resume: bool = False,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> List[Dict]:
+        """
+        Create dataset content from a packed dataset shard.
+        
+        Same as ``create_dataset_content``, but images are read from the
+        shard's memory map already preprocessed and ground truth comes from its
+        index. Receipts without ground truth are reported as failed.
+        """
+        return await self._build_dataset(
+            shard.names(),
+            lambda name: self.create_shard_record(shard[name], model),
+            concurrency,
+            checkpoint_path,
+            resume,
+            on_progress,
+        )
+    
+    async def stream_records(
+        self,
+        names: Iterable[str],
+        create_record: Callable[[str], Awaitable[EvaluationRecord]],
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[RecordResult]:
+        """
+        Create records and yield them as they complete.
+        
+        At most ``concurrency`` (default ``EVAL_CONCURRENCY``) records are in
+        flight and ``names`` is consumed lazily, so memory stays bounded
+        however many receipts there are. Failures are yielded with their error
+        rather than raised. Closing the generator early cancels the records
+        still in flight.
+        """
+        limit = concurrency or settings.EVAL_CONCURRENCY
+        
+        async def create(name: str) -> RecordResult:
+            try:
+                return RecordResult(name, await create_record(name), None)
+            except Exception as e:
+                return RecordResult(name, None, f"{type(e).__name__}: {e}")
+        
+        pending = iter(names)
+        exhausted = False
+        in_flight: Set[asyncio.Future] = set()
+        try:
+            while True:
+                while not exhausted and len(in_flight) < limit:
+                    name = next(pending, None)
+                    if name is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(asyncio.ensure_future(create(name)))
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+    
+    def stream_dataset(
+        self,
+        receipt_image_dir: Path,
+        ground_truth_dir: Path,
+        model: str = "gpt-4o-mini",
+        concurrency: Optional[int] = None,
+        skip: Collection[str] = ()
+    ) -> AsyncIterator[RecordResult]:
+        """Stream records for the images in a directory (except ``skip``) as they complete."""
+        names = (path.name for path in sorted(receipt_image_dir.glob("*.jpg")) if path.name not in skip)
+        return self.stream_records(
+            names,
+            lambda name: self.create_evaluation_record(receipt_image_dir / name, ground_truth_dir, model),
+            concurrency,
+        )
+    
+    def stream_shard(
+        self,
+        shard: DatasetShard,
+        model: str = "gpt-4o-mini",
+        concurrency: Optional[int] = None,
+        skip: Collection[str] = ()
+    ) -> AsyncIterator[RecordResult]:
+        """Stream records for the receipts in a dataset shard (except ``skip``) as they complete."""
+        names = (name for name in shard.names() if name not in skip)
+        return self.stream_records(names, lambda name: self.create_shard_record(shard[name], model), concurrency)
+    
+    async def _build_dataset(
+        self,
+        names: List[str],
+        create_record: Callable[[str], Awaitable[EvaluationRecord]],
+        concurrency: Optional[int],
+        checkpoint_path: Optional[Path],
+        resume: bool,
+        on_progress: Optional[ProgressCallback]
     ) -> List[Dict]:
-        """Create dataset content following notebook format."""
-        tasks = [
-            self.create_evaluation_record(image_path, ground_truth_dir, model)
-            for image_path in receipt_image_dir.glob("*.jpg")
-        ]
-        records = await asyncio.gather(*tasks)
+        """Create records for ``names`` concurrently, with checkpointing and resume."""
+        completed_items = load_checkpoint(checkpoint_path) if checkpoint_path and resume else {}
+        pending = [name for name in names if name not in completed_items]
+        total = len(names)
+        completed = total - len(pending)
+        on_progress = on_progress or _log_progress
+        writer = DatasetWriter(checkpoint_path, resume=resume) if checkpoint_path else None
+        
+        start = time.perf_counter()
+        try:
+            async for result in self.stream_records(pending, create_record, concurrency):
+                completed += 1
+                if result.error is None:
+                    item = {"item": result.record.model_dump()}
+                    completed_items[result.name] = item
+                    if writer:
+                        writer.write(item)
+                on_progress(completed, total, result.name, result.error)
+        finally:
+            if writer:
+                writer.close()
+        
+        failed = len(pending) - sum(name in completed_items for name in pending)
+        logger.info(
+            f"Dataset: {len(completed_items)} of {total} records "
+            f"({len(pending) - failed} new, {failed} failed) in {time.perf_counter() - start:.1f}s"
+        )
+        if self.cache is not None:
+            logger.info(f"Prediction cache: {self.cache.summary()}")
         
         # Format for OpenAI Evals
-        return [{"item": record.model_dump()} for record in records]
+        return [completed_items[name] for name in names if name in completed_items]
+    
+    async def create_audit_only_records(
+        self,
+        receipt_image_dir: Path,
+        ground_truth_dir: Path,
+        model: str = "gpt-4o-mini",
+        extraction_source: Literal["ground_truth", "cached"] = "ground_truth",
+        extraction_model: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> List[EvaluationRecord]:
+        """
+        Evaluate the audit step alone, without running extraction.
+        
+        Each receipt is audited from its ground truth extraction, or from the
+        cached extraction by ``extraction_model`` (default ``model``) for the
+        image when ``extraction_source`` is ``cached``; images without one are
+        reported and skipped. The receipt's own ground truth pair is kept out
+        of the audit's retrieved examples, so the audit is never shown its
+        answer. Up to ``concurrency`` audits run at once, and audits go
+        through the prediction cache when the pipeline has one.
+        
+        Returns:
+            Records whose predicted receipt details are the audit's input
+        """
+        if extraction_source == "cached" and self.cache is None:
+            raise ValueError("Cached extractions need a prediction cache")
+        
+        image_paths = sorted(receipt_image_dir.glob("*.jpg"))
+        total = len(image_paths)
+        completed = 0
+        on_progress = on_progress or _log_progress
+        semaphore = asyncio.Semaphore(concurrency or settings.EVAL_CONCURRENCY)
+        records: Dict[str, EvaluationRecord] = {}
+        
+        async def process(image_path: Path) -> None:
+            nonlocal completed
+            error = None
+            try:
+                correct_details = ReceiptDetails.model_validate_json(
+                    (ground_truth_dir / "extraction" / f"{image_path.stem}.json").read_text()
+                )
+                correct_audit = AuditDecision.model_validate_json(
+                    (ground_truth_dir / "audit_results" / f"{image_path.stem}.json").read_text()
+                )
+                if extraction_source == "cached":
+                    key = self.cache.extraction_key(hash_bytes(image_path.read_bytes()), extraction_model or model)
+                    details = self.cache.get("extraction", key, ReceiptDetails)
+                    if details is None:
+                        raise LookupError("no cached extraction")
+                else:
+                    details = correct_details
+                async with semaphore:
+                    predicted_audit = await self.predict_audit(details, model, image_path.stem)
+                records[image_path.name] = EvaluationRecord(
+                    receipt_image_path=image_path.name,
+                    correct_receipt_details=correct_details,
+                    predicted_receipt_details=details,
+                    correct_audit_decision=correct_audit,
+                    predicted_audit_decision=predicted_audit,
+                )
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            completed += 1
+            on_progress(completed, total, image_path.name, error)
+        
+        await asyncio.gather(*(process(image_path) for image_path in image_paths))
+        return [records[path.name] for path in image_paths if path.name in records]
     
     def get_graders(self) -> List[Dict]:
         """Get all graders as defined in the notebook."""
@@ -82,9 +515,19 @@ class EvaluationPipeline:
         dataset: List[Dict],
         graders: Optional[List[Dict]] = None
     ) -> Dict:
-        """Create and run evaluation on OpenAI platform."""
+        """
+        Create and run evaluation on OpenAI platform.
+
+        The ``needs_audit`` confusion matrix and business cost summary are
+        computed locally from the dataset and returned under ``"metrics"`` and
+        ``"cost_summary"``, whether or not the platform run succeeds.
+        """
+        from src.services.cost_analysis import summarize_costs_from_records
+
         if graders is None:
             graders = self.get_graders()
+        cost_summary = summarize_costs_from_records(dataset)
+        local_results = {"metrics": cost_summary["metrics"], "cost_summary": cost_summary}
         
         try:
             # Create eval (with caching behavior like notebook)
@@ -107,13 +550,15 @@ class EvaluationPipeline:
                 "eval_id": eval_cfg.id,
                 "run_id": eval_run.id,
                 "report_url": eval_run.report_url,
-                "status": "success"
+                "status": "success",
+                **local_results,
             }
             
         except Exception as e:
             return {
                 "status": "error",
-                "error": str(e)
+                "error": str(e),
+                **local_results,
             }
     
     async def _create_eval_cached(self, name: str, graders: List[Dict]):
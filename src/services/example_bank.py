@@ -0,0 +1,343 @@
+"""
+Few-shot example bank for the audit prompt.
+
+Builds a small local TF-IDF index over ground truth (extraction, audit) pairs so
+each receipt can be audited with the most similar labelled examples instead of
+a fixed set.
+"""
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.config import settings
+from src.models.audit import AuditDecision
+from src.models.receipt import ReceiptDetails, has_x_mark, parse_amount
+from src.utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+EXAMPLE_FORMAT = """
+<example>
+    <input>
+        {input}
+    </input>
+    <output>
+        {output}
+    </output>
+</example>
+"""
+
+# Retrieval scores at or above this are copies of the receipt being audited; only
+# dropped on the evaluation path, where the bank may contain the receipt itself
+NEAR_DUPLICATE_SCORE = 0.98
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def format_example(
+    receipt: ReceiptDetails,
+    decision: AuditDecision,
+    terse: bool = False
+) -> str:
+    """Render one (input, output) pair in the audit prompt example format."""
+    if terse:
+        from src.utils.reason_codes import to_terse_decision
+        output = to_terse_decision(decision, receipt).model_dump_json()
+    else:
+        output = decision.model_dump_json()
+    return EXAMPLE_FORMAT.format(input=receipt.model_dump_json(), output=output)
+
+
+def _amount_bucket(total: Optional[float]) -> str:
+    """Bucket the receipt total around the $50 audit limit."""
+    if total is None:
+        return "amount:missing"
+    if total < 10:
+        return "amount:lt10"
+    if total < 25:
+        return "amount:10-25"
+    if total < 45:
+        return "amount:25-45"
+    if total <= 55:
+        return "amount:near_limit"
+    if total < 100:
+        return "amount:55-100"
+    return "amount:gt100"
+
+
+def receipt_features(receipt: ReceiptDetails) -> List[str]:
+    """
+    Turn a receipt into bag-of-features tokens for similarity search.
+
+    Features cover the merchant name, line item categories and descriptions,
+    the total relative to the audit limit, and the shape of the handwritten
+    notes and totals, which are the inputs the audit criteria depend on.
+    """
+    features: List[str] = []
+
+    for word in _WORD_RE.findall((receipt.merchant or "").lower()):
+        if len(word) > 1:
+            features.append(f"merchant:{word}")
+
+    for item in receipt.items:
+        features.append(f"category:{(item.category or 'none').lower()}")
+        for word in _WORD_RE.findall((item.description or "").lower()):
+            if len(word) > 2:
+                features.append(f"item:{word}")
+
+    item_count = len(receipt.items)
+    features.append("items:1" if item_count <= 1 else "items:2-3" if item_count <= 3 else "items:4+")
+
+    total = parse_amount(receipt.total)
+    features.append(_amount_bucket(total))
+    if total is not None:
+        features.append("limit:over" if total > 50 else "limit:under")
+
+    features.append("tax:present" if receipt.tax else "tax:missing")
+    features.append("subtotal:present" if receipt.subtotal else "subtotal:missing")
+
+    if not receipt.handwritten_notes:
+        features.append("notes:none")
+    else:
+        features.append("notes:present")
+        if has_x_mark(receipt.handwritten_notes):
+            features.append("notes:x")
+
+    return features
+
+
+def load_ground_truth(ground_truth_dir: Path) -> List[Tuple[str, ReceiptDetails, AuditDecision]]:
+    """
+    Load labelled (extraction, audit) pairs from a ground truth directory.
+
+    Args:
+        ground_truth_dir: Directory containing ``extraction`` and ``audit_results``
+
+    Returns:
+        List of (image stem, receipt details, audit decision), skipping
+        receipts without an audit result or with invalid JSON
+    """
+    extraction_dir = ground_truth_dir / "extraction"
+    audit_dir = ground_truth_dir / "audit_results"
+    if not extraction_dir.exists():
+        logger.warning(f"Ground truth directory not found: {extraction_dir}")
+        return []
+
+    pairs = []
+    for extraction_path in sorted(extraction_dir.glob("*.json")):
+        audit_path = audit_dir / extraction_path.name
+        if not audit_path.exists():
+            continue
+        try:
+            receipt = ReceiptDetails.model_validate_json(extraction_path.read_text())
+            decision = AuditDecision.model_validate_json(audit_path.read_text())
+        except ValueError as e:
+            logger.warning(f"Skipping invalid ground truth {extraction_path.name}: {e}")
+            continue
+        pairs.append((extraction_path.stem, receipt, decision))
+    return pairs
+
+
+@dataclass
+class Example:
+    """A labelled audit example and its sparse TF-IDF vector."""
+    example_id: str
+    receipt: ReceiptDetails
+    decision: AuditDecision
+    text: str
+    tokens: int
+    terse_text: str = ""
+    terse_tokens: int = 0
+    vector: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict:
+        """Return the example in the ``get_audit_examples()`` format."""
+        return {"input": self.receipt, "output": self.decision}
+
+
+@dataclass
+class RetrievedExample:
+    """An example returned from a similarity search."""
+    example: Example
+    score: float
+
+
+class ExampleBank:
+    """TF-IDF index over labelled audit examples."""
+
+    def __init__(self, examples: Iterable[Example]):
+        self.examples: List[Example] = list(examples)
+        self.idf: Dict[str, float] = {}
+        self._build_index()
+
+    @property
+    def labelled_count(self) -> int:
+        """Examples loaded from ground truth, not counting the static ones."""
+        return sum(not example.example_id.startswith("static:") for example in self.examples)
+
+    @classmethod
+    def from_ground_truth(
+        cls,
+        ground_truth_dir: Path,
+        include_static: bool = True
+    ) -> "ExampleBank":
+        """
+        Build the bank from ``extraction``/``audit_results`` JSON pairs.
+
+        Args:
+            ground_truth_dir: Directory containing ``extraction`` and ``audit_results``
+            include_static: Also index the hand-written examples from ``get_audit_examples()``
+
+        Returns:
+            Indexed example bank
+        """
+        pairs = []
+
+        if include_static:
+            from src.services.audit import get_audit_examples
+            for i, example in enumerate(get_audit_examples()):
+                pairs.append((f"static:{i}", example["input"], example["output"]))
+
+        pairs.extend(load_ground_truth(ground_truth_dir))
+
+        examples = []
+        for example_id, receipt, decision in pairs:
+            text = format_example(receipt, decision)
+            terse_text = format_example(receipt, decision, terse=True)
+            examples.append(
+                Example(
+                    example_id=example_id,
+                    receipt=receipt,
+                    decision=decision,
+                    text=text,
+                    tokens=estimate_tokens(text),
+                    terse_text=terse_text,
+                    terse_tokens=estimate_tokens(terse_text),
+                )
+            )
+        return cls(examples)
+
+    def _build_index(self) -> None:
+        """Compute IDF weights and L2-normalised TF-IDF vectors."""
+        doc_features = [Counter(receipt_features(e.receipt)) for e in self.examples]
+
+        document_frequency: Counter = Counter()
+        for features in doc_features:
+            document_frequency.update(features.keys())
+
+        n_docs = len(self.examples)
+        self.idf = {
+            feature: math.log((1 + n_docs) / (1 + df)) + 1.0
+            for feature, df in document_frequency.items()
+        }
+
+        for example, features in zip(self.examples, doc_features):
+            example.vector = self._vectorize(features)
+
+    def _vectorize(self, features: Counter) -> Dict[str, float]:
+        """Weight feature counts by IDF, dropping features unseen in the bank."""
+        vector = {
+            feature: count * self.idf[feature]
+            for feature, count in features.items()
+            if feature in self.idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm == 0:
+            return {}
+        return {feature: weight / norm for feature, weight in vector.items()}
+
+    def search(
+        self,
+        receipt: ReceiptDetails,
+        exclude: Optional[Set[str]] = None
+    ) -> List[RetrievedExample]:
+        """Rank every example by cosine similarity to the receipt."""
+        query = self._vectorize(Counter(receipt_features(receipt)))
+        exclude = exclude or set()
+
+        results = []
+        for example in self.examples:
+            if example.example_id in exclude:
+                continue
+            score = sum(
+                weight * example.vector.get(feature, 0.0)
+                for feature, weight in query.items()
+            )
+            results.append(RetrievedExample(example=example, score=score))
+
+        results.sort(key=lambda r: r.score, reverse=True)
+        return results
+
+    def retrieve(
+        self,
+        receipt: ReceiptDetails,
+        k: int = 3,
+        token_budget: int = 1200,
+        relative_cutoff: float = 0.6,
+        exclude: Optional[Set[str]] = None,
+        terse: bool = False,
+        max_score: Optional[float] = None
+    ) -> List[RetrievedExample]:
+        """
+        Select up to ``k`` similar examples that fit within ``token_budget``.
+
+        Examples scoring below ``relative_cutoff`` times the best score are
+        dropped, so a receipt with a close labelled neighbour gets a short
+        prompt while an unusual receipt gets the full ``k``. With
+        ``max_score`` (e.g. ``NEAR_DUPLICATE_SCORE`` when evaluating),
+        examples scoring at or above it are skipped as copies of the receipt.
+
+        Args:
+            receipt: Receipt to be audited
+            k: Maximum number of examples
+            token_budget: Maximum estimated tokens for all examples combined
+            relative_cutoff: Minimum score as a fraction of the top score
+            exclude: Example IDs to skip (e.g. the receipt under evaluation)
+            terse: Budget with the size of the terse (reason code) rendering
+            max_score: Skip examples scoring at or above this (default: no limit)
+
+        Returns:
+            Selected examples, most similar first
+        """
+        ranked = self.search(receipt, exclude=exclude)
+        if max_score is not None:
+            ranked = [result for result in ranked if result.score < max_score]
+        if not ranked:
+            return []
+
+        min_score = ranked[0].score * relative_cutoff
+        selected: List[RetrievedExample] = []
+        used_tokens = 0
+        for result in ranked:
+            if len(selected) >= k or result.score < min_score:
+                break
+            tokens = result.example.terse_tokens if terse else result.example.tokens
+            if used_tokens + tokens > token_budget:
+                continue
+            selected.append(result)
+            used_tokens += tokens
+
+        return selected
+
+
+@lru_cache()
+def get_example_bank() -> ExampleBank:
+    """Return the process-wide example bank, building it on first use."""
+    bank = ExampleBank.from_ground_truth(Path(settings.AUDIT_EXAMPLE_BANK_DIR))
+    logger.info(f"Loaded audit example bank with {len(bank.examples)} examples")
+    if settings.AUDIT_EXAMPLE_RETRIEVAL and not bank.labelled_count:
+        logger.warning(
+            f"Audit example bank {settings.AUDIT_EXAMPLE_BANK_DIR} has no labelled examples; "
+            "example retrieval is disabled and the static examples are used"
+        )
+    return bank
+
+
+def retrieval_enabled() -> bool:
+    """True when ``AUDIT_EXAMPLE_RETRIEVAL`` is set and the bank has labelled examples to retrieve."""
+    return settings.AUDIT_EXAMPLE_RETRIEVAL and get_example_bank().labelled_count > 0
@@ -4,79 +4,152 @@ Extraction service using OpenAI Agents SDK patterns.
 import asyncio
 import base64
 import logging
-import os
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from agents import Agent, Runner, set_default_openai_api
+from src.core.agent_cache import get_agent, run_agent
 from src.core.config import settings
-from src.models.receipt import ReceiptDetails
-from src.prompts.extraction_prompt import EXTRACTION_PROMPT
+from src.core.executor import run_blocking
+from src.core.metrics import (
+    record_error,
+    record_fallback,
+    record_usage,
+    stage_timer,
+)
+from src.core.timing import annotate
+from src.models.receipt import (
+    ExtractionProfile,
+    LeanReceiptDetails,
+    Location,
+    ReceiptDetails,
+    ReceiptHeader,
+    has_x_mark,
+    parse_amount,
+)
+from src.prompts.extraction_prompt import (
+    EXTRACTION_PROMPT,
+    EXTRACTION_PROMPT_HEADER,
+    EXTRACTION_PROMPT_LEAN,
+)
 from src.utils.image_processing import preprocess_image
 
-# Configure OpenAI Agents to use Responses API (default behavior)
-# Explicitly ensure we're using responses API instead of chat completions
-set_default_openai_api("responses")
-
 # Disable verbose logging to prevent image data spam
 # enable_verbose_stdout_logging()  # Commented out to reduce log spam
 
-# Disable sensitive data logging to prevent image data in logs
-os.environ["OPENAI_AGENTS_DONT_LOG_MODEL_DATA"] = "1"
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prompt, structured output type and user instruction for each extraction profile
+EXTRACTION_PROFILES = {
+    "full": (
+        EXTRACTION_PROMPT,
+        ReceiptDetails,
+        "Extract the receipt details from this image according to the ReceiptDetails schema.",
+    ),
+    "lean": (
+        EXTRACTION_PROMPT_LEAN,
+        LeanReceiptDetails,
+        "Extract the audit fields from this receipt image using the compact schema.",
+    ),
+    "header": (
+        EXTRACTION_PROMPT_HEADER,
+        ReceiptHeader,
+        "Read the header and totals of this receipt image using the compact schema.",
+    ),
+}
+
+# Header categories that cannot decide NOT_TRAVEL_RELATED on their own
+AMBIGUOUS_CATEGORIES = {"mixed", "unclear"}
+
+
+def line_items_needed(header: ReceiptHeader) -> Optional[str]:
+    """
+    Decide whether the audit needs the full line-item extraction.
+    
+    The header alone is enough when it already forces an audit (an X in the
+    notes, a total over the limit, or a non-travel expense), or when a single
+    travel item's subtotal, tax and total reconcile.
+    
+    Returns:
+        Why line items are needed, or None when the header is sufficient
+    """
+    total = parse_amount(header.tt)
+    
+    # needs_audit is already true whatever the line items say
+    if has_x_mark(header.n):
+        return None
+    if total is not None and total > 50:
+        return None
+    if header.c == "non_travel":
+        return None
+    
+    if header.c in AMBIGUOUS_CATEGORIES:
+        return "ambiguous_category"
+    if total is None:
+        return "missing_total"
+    if header.ni != 1:
+        return "math_check"
+    
+    subtotal = parse_amount(header.st)
+    tax = parse_amount(header.tx)
+    if subtotal is not None and abs(subtotal + (tax or 0) - total) > 0.01:
+        return "math_check"
+    return None
+
+
+def _empty_receipt() -> ReceiptDetails:
+    """Empty receipt returned when extraction fails."""
+    return ReceiptDetails(
+        merchant=None,
+        location=Location(city=None, state=None, zipcode=None),
+        time=None,
+        items=[],
+        subtotal=None,
+        tax=None,
+        total=None,
+        handwritten_notes=[]
+    )
+
 
 class ExtractionService:
     """Service for extracting receipt details from images using OpenAI Agents."""
 
-    def __init__(self):
-        # Configure the SDK to use Responses API explicitly
-        # This should make it use /responses endpoint instead of /chat/completions
-        set_default_openai_api("responses")
-        pass  # No client needed - agents handle this internally
+    # No client needed - agents are built (and the provider configured) on first use
 
     def _image_to_base64(self, image_data: bytes) -> str:
         """Convert image bytes to base64 string."""
         return base64.b64encode(image_data).decode("utf-8")
 
-    async def extract_receipt_details(
-        self,
-        file_data: bytes,
-        filename: str,
-        model: str = "gpt-o4-mini"  # Use vision-capable model
-    ) -> ReceiptDetails:
-        """Extract structured data from receipt image or PDF."""
-
-        print("=== STARTING EXTRACTION ===", flush=True)
-        logger.info("Starting extraction process")
-
+    async def _prepare_image(self, file_data: bytes, filename: str) -> str:
+        """Render PDFs, preprocess the image and return it base64 encoded."""
         # Check if it's a PDF
         if filename.lower().endswith('.pdf'):
-            print("Processing PDF...", flush=True)
             from src.api.dependencies import process_pdf_to_images
-            images = await process_pdf_to_images(file_data)
+            with stage_timer("pdf_render"):
+                images = await process_pdf_to_images(file_data)
 
             if images:
                 file_data = images[0]
             else:
                 raise ValueError("PDF has no pages")
 
-        print("Preprocessing image...", flush=True)
-        processed_image = preprocess_image(file_data)
+        with stage_timer("preprocessing"):
+            processed_image = await run_blocking(preprocess_image, file_data)
 
-        print("Encoding to base64...", flush=True)
-        b64_image = self._image_to_base64(processed_image)
+        with stage_timer("base64"):
+            b64_image = self._image_to_base64(processed_image)
+        annotate(image_bytes=len(processed_image), base64_chars=len(b64_image))
+        return b64_image
 
-        print("Creating agent...", flush=True)
-        agent = Agent(
-            name="receipt_extraction_agent",
-            instructions=EXTRACTION_PROMPT,
-            model=model,
-            output_type=ReceiptDetails  # Structured output
-        )
+    async def _run_extraction(
+        self,
+        b64_image: str,
+        model: str,
+        profile: str,
+        detail: str = "auto"
+    ):
+        """Run the extraction agent for a profile and return its structured output."""
+        instructions, output_type, user_instruction = EXTRACTION_PROFILES[profile]
 
-        print("Running agent...", flush=True)
+        agent = get_agent("receipt_extraction_agent", instructions, model, output_type)
 
         # Use the correct message format from the SDK examples
         messages = [
@@ -85,39 +158,118 @@ class ExtractionService:
                 "content": [
                     {
                         "type": "input_image",
-                        "detail": "auto",  # Auto detail for receipt text
+                        "detail": detail,
                         "image_url": f"data:image/jpeg;base64,{b64_image}",
                     },
                 ],
             },
             {
                 "role": "user",
-                "content": "Extract the receipt details from this image according to the ReceiptDetails schema.",
+                "content": user_instruction,
             },
         ]
 
-        try:
-            result = await Runner.run(agent, messages)
+        stage = f"extraction_{profile}"
+        with stage_timer(stage, model):
+            result = await run_agent(agent, messages)
+        record_usage(stage, model, result)
 
-            print(f"=== EXTRACTION COMPLETE ===", flush=True)
-            print(f"=== RESULT TYPE: {type(result.final_output)} ===", flush=True)
+        # The SDK automatically parses to the output_type
+        return result.final_output
 
-            # The SDK automatically parses to the output_type
-            return result.final_output
+    async def extract_receipt_details(
+        self,
+        file_data: bytes,
+        filename: str,
+        model: str = "gpt-o4-mini",  # Use vision-capable model
+        profile: ExtractionProfile = "full"
+    ) -> ReceiptDetails:
+        """
+        Extract structured data from receipt image or PDF.
+        
+        The ``lean`` profile asks the model only for the fields the audit uses,
+        under compact keys, and maps the result back to ``ReceiptDetails`` with
+        the remaining fields null. ``staged`` runs ``extract_receipt_staged``.
+        """
+        if profile == "staged":
+            receipt_details, _ = await self.extract_receipt_staged(file_data, filename, model)
+            return receipt_details
+
+        logger.debug("Starting extraction", extra={"profile": profile, "model": model})
+
+        b64_image = await self._prepare_image(file_data, filename)
+        return await self.extract_prepared(b64_image, model, profile)
+
+    async def extract_prepared(
+        self,
+        b64_image: str,
+        model: str = "gpt-4o-mini",
+        profile: ExtractionProfile = "full"
+    ) -> ReceiptDetails:
+        """
+        Extract receipt details from an image already prepared by ``_prepare_image``.
+        
+        Lets callers that send one image to several models preprocess it once.
+        ``staged`` is not supported here.
+        """
+        try:
+            output = await self._run_extraction(b64_image, model, profile)
+            if isinstance(output, LeanReceiptDetails):
+                return output.to_receipt_details()
+            return output
 
         except Exception as e:
-            print(f"=== EXTRACTION ERROR: {e} ===", flush=True)
-            logger.error(f"Error during extraction: {str(e)}")
+            logger.error(f"Error during extraction: {str(e)}", extra={"model": model})
+            record_error(f"extraction_{profile}", model)
+            record_fallback("extraction", "empty_receipt")
 
             # Return empty receipt as fallback
-            from src.models.receipt import Location
-            return ReceiptDetails(
-                merchant=None,
-                location=Location(city=None, state=None, zipcode=None),
-                time=None,
-                items=[],
-                subtotal=None,
-                tax=None,
-                total=None,
-                handwritten_notes=[]
-            )
\ No newline at end of file
+            return _empty_receipt()
+
+    async def extract_receipt_staged(
+        self,
+        file_data: bytes,
+        filename: str,
+        model: str = "gpt-4o-mini"
+    ) -> Tuple[ReceiptDetails, List[str]]:
+        """
+        Extract receipt details in up to two passes.
+        
+        A low-detail pass reads the merchant, expense category, totals and
+        handwritten notes. The lean line-item pass only runs when
+        ``line_items_needed`` says the audit cannot be decided from the header,
+        e.g. to check the math of a multi-item receipt.
+        
+        Returns:
+            Tuple of (receipt details, stages run), where stages are
+            ``"header"`` and/or ``"line_items"``
+        """
+        logger.debug("Starting extraction", extra={"profile": "staged", "model": model})
+        b64_image = await self._prepare_image(file_data, filename)
+        stages: List[str] = []
+
+        try:
+            header = await self._run_extraction(b64_image, model, "header", detail="low")
+            stages.append("header")
+            reason = line_items_needed(header)
+            if reason is None:
+                return header.to_receipt_details(), stages
+            logger.info("Running line item extraction", extra={"reason": reason, "model": model})
+        except Exception as e:
+            logger.warning(
+                f"Header extraction failed, running line item extraction: {str(e)}",
+                extra={"model": model}
+            )
+            record_error("extraction_header", model)
+            record_fallback("extraction", "header_failed")
+
+        try:
+            output = await self._run_extraction(b64_image, model, "lean")
+            stages.append("line_items")
+            return output.to_receipt_details(), stages
+
+        except Exception as e:
+            logger.error(f"Error during extraction: {str(e)}", extra={"model": model})
+            record_error("extraction_lean", model)
+            record_fallback("extraction", "empty_receipt")
+            return _empty_receipt(), stages
@@ -0,0 +1,244 @@
+"""
+Concurrent multi-model comparison.
+
+Each receipt image and its ground truth are read once, the image is
+preprocessed and encoded once (only if some model's extraction isn't cached),
+and the shared payload is sent to every model at the same time. Time spent
+waiting for that preprocessing is reported separately from model latency, so
+the model that happens to start it isn't charged for it. Each model has
+its own concurrency limit and optional requests-per-minute pacing, so a slow
+or rate-limited model doesn't hold back the others' calls, and a comparison
+takes roughly as long as its slowest model rather than the sum of all of them.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from src.core.config import settings
+from src.core.timing import RequestTimings, current_timings
+from src.models.audit import AuditDecision, EvaluationRecord
+from src.models.receipt import ReceiptDetails
+from src.services.evaluation_pipeline import EvaluationPipeline, ProgressCallback, _log_progress
+from src.utils.cost_calculator import estimate_model_cost
+from src.utils.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Limits one model's receipts in flight and, optionally, how often they start.
+
+    Args:
+        max_concurrent: Receipts processed by the model at once
+        per_minute: Receipts started per minute (unlimited when None)
+    """
+
+    def __init__(self, max_concurrent: int, per_minute: Optional[float] = None):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._interval = 60 / per_minute if per_minute else 0.0
+        self._next_start = 0.0
+
+    async def __aenter__(self) -> None:
+        await self._semaphore.acquire()
+        if self._interval:
+            # Reserve the next start slot before sleeping so waiters queue up in order
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+@dataclass
+class ModelRun:
+    """One model's dataset items, per-receipt latencies and token usage."""
+    model: str
+    items: List[Dict] = field(default_factory=list)
+    latencies_ms: List[float] = field(default_factory=list)
+    # Wait for the shared image preprocessing, on receipts whose extraction wasn't cached
+    preprocess_ms: List[float] = field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> Dict:
+        """Accuracy, latency percentiles, tokens and estimated cost."""
+        from src.services.cost_analysis import audit_confusion_matrices
+        from src.utils.graders import get_extraction_graders
+        from src.utils.local_graders import run_local_graders
+
+        count = len(self.items)
+        needs_audit = audit_confusion_matrices(self.items)["needs_audit"]
+        pass_rates = [
+            result.pass_rate
+            for result in run_local_graders(get_extraction_graders(), self.items)
+            if result.pass_rate is not None
+        ]
+        cost = estimate_model_cost(self.model, self.input_tokens, self.output_tokens)
+        return {
+            "model": self.model,
+            "records": count,
+            "errors": len(self.errors),
+            "audit_accuracy": needs_audit["accuracy"],
+            "fp_rate": needs_audit["fp_rate"],
+            "fn_rate": needs_audit["fn_rate"],
+            "extraction_pass_rate": sum(pass_rates) / len(pass_rates) if pass_rates else 0.0,
+            "latency_ms": summarize(self.latencies_ms),
+            "preprocess_ms": summarize(self.preprocess_ms),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": cost,
+            "cost_per_receipt": cost / count if count else 0.0,
+        }
+
+
+async def compare_models(
+    pipeline: EvaluationPipeline,
+    receipt_image_dir: Path,
+    ground_truth_dir: Path,
+    models: Sequence[str],
+    concurrency: Optional[int] = None,
+    model_concurrency: Optional[int] = None,
+    requests_per_minute: Optional[Dict[str, float]] = None,
+    on_progress: Optional[ProgressCallback] = None
+) -> Dict[str, ModelRun]:
+    """
+    Run extraction and audit for every image with every model concurrently.
+
+    Args:
+        pipeline: Pipeline whose services and prediction cache are used
+        concurrency: Images in flight at once (default ``EVAL_CONCURRENCY``)
+        model_concurrency: Receipts in flight per model (default ``concurrency``)
+        requests_per_minute: Receipts started per minute, by model
+        on_progress: Called once per image; the error names the failing models
+
+    Returns:
+        Runs by model, in ``models`` order, with items in image name order
+    """
+    concurrency = concurrency or settings.EVAL_CONCURRENCY
+    requests_per_minute = requests_per_minute or {}
+    limiters = {
+        model: RateLimiter(model_concurrency or concurrency, requests_per_minute.get(model))
+        for model in models
+    }
+    runs = {model: ModelRun(model) for model in models}
+    records: Dict[str, Dict[str, EvaluationRecord]] = {model: {} for model in models}
+    image_paths = sorted(receipt_image_dir.glob("*.jpg"))
+    total = len(image_paths)
+    completed = 0
+    on_progress = on_progress or _log_progress
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_model(
+        model: str,
+        image_path: Path,
+        image_data: bytes,
+        prepare,
+        correct_details: ReceiptDetails,
+        correct_audit: AuditDecision
+    ) -> None:
+        # Runs as its own task, so token usage is collected for this model only
+        timings = RequestTimings()
+        current_timings.set(timings)
+        run = runs[model]
+        preprocess_ms: List[float] = []
+
+        async def timed_prepare() -> str:
+            prepare_start = time.perf_counter()
+            try:
+                return await prepare()
+            finally:
+                preprocess_ms.append((time.perf_counter() - prepare_start) * 1000)
+
+        async with limiters[model]:
+            start = time.perf_counter()
+            try:
+                details = await pipeline.predict_extraction(image_data, image_path.name, model, prepare=timed_prepare)
+                decision = await pipeline.predict_audit(details, model, image_path.stem)
+            except Exception as e:
+                run.errors[image_path.name] = f"{type(e).__name__}: {e}"
+                return
+            run.latencies_ms.append((time.perf_counter() - start) * 1000 - sum(preprocess_ms))
+            run.preprocess_ms.extend(preprocess_ms)
+        run.input_tokens += timings.metadata.get("input_tokens", 0)
+        run.output_tokens += timings.metadata.get("output_tokens", 0)
+        records[model][image_path.name] = EvaluationRecord(
+            receipt_image_path=image_path.name,
+            correct_receipt_details=correct_details,
+            predicted_receipt_details=details,
+            correct_audit_decision=correct_audit,
+            predicted_audit_decision=decision,
+        )
+
+    async def process(image_path: Path) -> None:
+        nonlocal completed
+        error = None
+        async with semaphore:
+            try:
+                correct_details = ReceiptDetails.model_validate_json(
+                    (ground_truth_dir / "extraction" / f"{image_path.stem}.json").read_text()
+                )
+                correct_audit = AuditDecision.model_validate_json(
+                    (ground_truth_dir / "audit_results" / f"{image_path.stem}.json").read_text()
+                )
+                image_data = image_path.read_bytes()
+                prepared: Optional[asyncio.Task] = None
+
+                async def prepare() -> str:
+                    # The first model that misses the cache starts preprocessing; the rest share it
+                    nonlocal prepared
+                    if prepared is None:
+                        prepared = asyncio.ensure_future(
+                            pipeline.extraction_service._prepare_image(image_data, image_path.name)
+                        )
+                    return await prepared
+
+                await asyncio.gather(*(
+                    run_model(model, image_path, image_data, prepare, correct_details, correct_audit)
+                    for model in models
+                ))
+                failed = [model for model in models if image_path.name in runs[model].errors]
+                if failed:
+                    error = "; ".join(f"{model}: {runs[model].errors[image_path.name]}" for model in failed)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        completed += 1
+        on_progress(completed, total, image_path.name, error)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(process(image_path) for image_path in image_paths))
+    for model, run in runs.items():
+        run.items = [
+            {"item": records[model][path.name].model_dump()}
+            for path in image_paths if path.name in records[model]
+        ]
+    logger.info(
+        f"Compared {len(models)} models on {total} images in {time.perf_counter() - start:.1f}s",
+        extra={"models": list(models)}
+    )
+    return runs
+
+
+def format_comparison(summaries: Sequence[Dict]) -> str:
+    """Side-by-side table of model summaries."""
+    lines = [
+        f"{'model':<20} {'records':>7} {'errors':>6} {'audit acc':>9} {'extract':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'prep ms':>7} {'in tok/r':>8} {'out tok/r':>9} {'$/receipt':>10} {'total $':>9}"
+    ]
+    for s in summaries:
+        count = s["records"] or 1
+        lines.append(
+            f"{s['model']:<20} {s['records']:>7} {s['errors']:>6} {s['audit_accuracy']:>9.1%} "
+            f"{s['extraction_pass_rate']:>7.1%} {s['latency_ms']['p50']:>8.0f} {s['latency_ms']['p95']:>8.0f} "
+            f"{s['preprocess_ms']['p50']:>7.0f} "
+            f"{s['input_tokens'] / count:>8.0f} {s['output_tokens'] / count:>9.0f} "
+            f"{s['cost_per_receipt']:>10.5f} {s['cost']:>9.4f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+"""
+Content-addressed cache of evaluation predictions.
+
+Extractions are keyed by the image's hash, the model and a hash of the
+extraction prompt and output schema; audits by the extracted receipt, the
+model, the reasoning mode and a hash of the audit prompt, few-shot examples
+and output schema. Changing a prompt or model changes the key, so only stale
+predictions are recomputed, while re-running an eval to iterate on graders or
+cost analysis costs nothing.
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Literal, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from src.core.config import settings
+from src.models.audit import AuditDecision, ReasoningMode, TerseAuditDecision
+from src.models.receipt import ReceiptDetails
+
+logger = logging.getLogger(__name__)
+
+Stage = Literal["extraction", "audit"]
+STAGES = ("extraction", "audit")
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    """SHA-256 of raw bytes, e.g. an image file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def extraction_prompt_hash() -> str:
+    """Version of the extraction prompt and output schema used by evaluations."""
+    from src.prompts.extraction_prompt import EXTRACTION_PROMPT
+    return _sha256(EXTRACTION_PROMPT, json.dumps(ReceiptDetails.model_json_schema(), sort_keys=True))[:16]
+
+
+def audit_prompt_hash(reasoning_mode: ReasoningMode) -> str:
+    """
+    Version of the audit prompt for a reasoning mode.
+
+    Covers the prompt template, the mode's output schema, static examples and,
+    when example retrieval is on, its settings and the example bank's contents.
+    Cached per mode and retrieval configuration.
+    """
+    return _audit_prompt_hash(
+        reasoning_mode,
+        settings.AUDIT_EXAMPLE_RETRIEVAL,
+        settings.AUDIT_EXAMPLE_BANK_DIR,
+        settings.AUDIT_EXAMPLES_K,
+        settings.AUDIT_EXAMPLES_TOKEN_BUDGET,
+    )
+
+
+@lru_cache(maxsize=None)
+def _audit_prompt_hash(reasoning_mode: ReasoningMode, retrieval: bool, bank_dir: str, k: int, budget: int) -> str:
+    from src.prompts.audit_prompts import AUDIT_PROMPT_IMPROVED, AUDIT_TERSE_INSTRUCTIONS
+    from src.services.audit import static_examples
+    from src.services.example_bank import get_example_bank
+
+    terse = reasoning_mode == "terse"
+    schema = TerseAuditDecision if terse else AuditDecision
+    parts = [
+        AUDIT_PROMPT_IMPROVED,
+        AUDIT_TERSE_INSTRUCTIONS if terse else "",
+        json.dumps(schema.model_json_schema(), sort_keys=True),
+        static_examples(terse),
+    ]
+    if retrieval and get_example_bank().labelled_count > 0:
+        parts.append(f"k={k};budget={budget}")
+        parts.extend(example.text for example in get_example_bank().examples)
+    return _sha256(*parts)[:16]
+
+
+class PredictionCache:
+    """
+    Stores predictions as JSON files under ``<root>/<stage>/<key>.json``.
+
+    Args:
+        root: Cache directory (default: ``PREDICTION_CACHE_DIR``)
+        refresh: Stages to recompute even when cached; fresh results still
+            replace the cached ones
+    """
+
+    def __init__(self, root: Optional[Path] = None, refresh: Iterable[Stage] = ()):
+        self.root = Path(root or settings.PREDICTION_CACHE_DIR)
+        self.refresh = set(refresh)
+        self.stats: Counter = Counter()
+
+    def extraction_key(self, image_hash: str, model: str) -> Dict[str, str]:
+        return {"image": image_hash, "model": model, "prompt": extraction_prompt_hash()}
+
+    def audit_key(
+        self,
+        receipt: ReceiptDetails,
+        model: str,
+        reasoning_mode: ReasoningMode,
+        prompt_hash: str,
+        example_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        key = {
+            "receipt": _sha256(receipt.model_dump_json())[:32],
+            "model": model,
+            "reasoning_mode": reasoning_mode,
+            "prompt": prompt_hash,
+        }
+        if example_id and settings.AUDIT_EXAMPLE_RETRIEVAL:
+            # Excluding the receipt's own bank entry changes the retrieved examples
+            key["exclude"] = example_id
+        return key
+
+    def _path(self, stage: Stage, key: Dict[str, str]) -> Path:
+        digest = _sha256(*(f"{name}={value}" for name, value in sorted(key.items())))
+        return self.root / stage / f"{digest}.json"
+
+    def get(self, stage: Stage, key: Dict[str, str], model_type: Type[M]) -> Optional[M]:
+        """Return the cached prediction, or None when missing, unreadable or being refreshed."""
+        path = self._path(stage, key)
+        if stage in self.refresh or not path.exists():
+            self.stats[f"{stage}_miss"] += 1
+            return None
+        try:
+            value = model_type.model_validate(json.loads(path.read_text())["value"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            self.stats[f"{stage}_miss"] += 1
+            return None
+        self.stats[f"{stage}_hit"] += 1
+        return value
+
+    def put(self, stage: Stage, key: Dict[str, str], value: BaseModel) -> None:
+        """Store a prediction, replacing any cached one atomically."""
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({
+            "key": key,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "value": value.model_dump(mode="json"),
+        }))
+        os.replace(tmp_path, path)
+
+    def summary(self) -> str:
+        """One-line hit/miss summary per stage."""
+        return ", ".join(
+            f"{stage} {self.stats[f'{stage}_hit']} cached / {self.stats[f'{stage}_miss']} computed"
+            for stage in STAGES
+        )
+
+
+def is_fallback_extraction(receipt: ReceiptDetails) -> bool:
+    """True for the empty receipt the extraction service returns when a call fails."""
+    return receipt.merchant is None and receipt.total is None and not receipt.items
+
+
+def is_fallback_audit(decision: AuditDecision) -> bool:
+    """True for the forced audit the audit service returns when a call fails."""
+    return decision.reasoning.startswith("Audit error:")
+
+
+def cache_from_options(no_cache: bool = False, refresh: Optional[str] = None) -> Optional[PredictionCache]:
+    """
+    Build the cache for CLI options.
+
+    Args:
+        no_cache: Neither read nor write cached predictions
+        refresh: ``all``, ``extraction`` or ``audit`` to recompute those stages
+            and overwrite their cached predictions
+    """
+    if no_cache:
+        return None
+    stages = STAGES if refresh == "all" else (refresh,) if refresh else ()
+    return PredictionCache(refresh=stages)
@@ -0,0 +1,199 @@
+"""
+Startup warm-up.
+
+Runs the one-off costs of the first request during startup instead: loading
+the Agents SDK and generating the structured output schemas, PIL plugin
+loading and codec setup on every image worker thread, the PyMuPDF import and
+first render, the few-shot example index, and the first TLS connection to the
+provider. Warm-up runs in the background from ``lifespan`` so liveness checks
+answer immediately, and ``/health/ready`` reports not ready until it finishes.
+"""
+import asyncio
+import io
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.core.config import settings
+from src.core.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+_state: Dict = {"status": "pending", "steps": {}}
+_task: Optional[asyncio.Task] = None
+
+
+def _build_agents() -> None:
+    """Import the Agents SDK and build the agents and output schemas used per request."""
+    from src.core.agent_cache import get_agent, output_schema
+    from src.models.audit import (
+        AuditDecision,
+        PackedAuditResult,
+        PackedTerseAuditResult,
+        TerseAuditDecision,
+    )
+    from src.services.audit import AuditService, static_examples
+    from src.services.extraction import EXTRACTION_PROFILES
+
+    for instructions, output_type, _ in EXTRACTION_PROFILES.values():
+        get_agent("receipt_extraction_agent", instructions, settings.DEFAULT_EXTRACTION_MODEL, output_type)
+
+    audit_service = AuditService()
+    for terse, output_type in ((True, TerseAuditDecision), (False, AuditDecision)):
+        prompt = audit_service._build_prompt(static_examples(terse), terse)
+        get_agent("receipt_audit_agent", prompt, settings.DEFAULT_AUDIT_MODEL, output_type)
+    for output_type in (PackedAuditResult, PackedTerseAuditResult):
+        output_schema(output_type)
+
+
+def _build_example_bank() -> None:
+    from src.services.example_bank import get_example_bank
+    get_example_bank()
+
+
+def _synthetic_receipt() -> bytes:
+    """A small receipt-like JPEG."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (600, 1000), "white")
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(("WARM UP STORE", "Coffee   3.50", "Tax      0.28", "TOTAL    3.78")):
+        draw.text((40, 60 + line * 40), text, fill="black")
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def _process_image(image_data: bytes) -> None:
+    from src.api.dependencies import optimize_image_bytes
+    from src.utils.image_processing import encode_image_to_base64, preprocess_image
+
+    optimized = optimize_image_bytes(image_data)
+    encode_image_to_base64(preprocess_image(optimized), "warmup.jpg")
+
+
+def _render_pdf() -> None:
+    import fitz  # PyMuPDF
+    from src.api.dependencies import render_pdf_pages
+
+    document = fitz.open()
+    page = document.new_page(width=200, height=300)
+    page.insert_text((20, 50), "TOTAL 3.78")
+    pdf_data = document.tobytes()
+    document.close()
+    render_pdf_pages(pdf_data)
+
+
+async def _warm_agents() -> None:
+    await run_blocking(_build_agents)
+
+
+async def _warm_examples() -> None:
+    if settings.AUDIT_EXAMPLE_RETRIEVAL:
+        await run_blocking(_build_example_bank)
+
+
+async def _warm_images() -> None:
+    # One job per worker so every thread has PIL loaded before the first upload
+    image_data = await run_blocking(_synthetic_receipt)
+    await asyncio.gather(*(
+        run_blocking(_process_image, image_data) for _ in range(settings.IMAGE_WORKERS)
+    ))
+
+
+async def _warm_pdf() -> None:
+    await run_blocking(_render_pdf)
+
+
+async def _warm_connections() -> None:
+    """Open a pooled connection on the client the Agents SDK will use for model calls."""
+    from src.core.provider import (
+        build_openai_client, configure_provider, get_openai_client, probe_provider, use_openai_client
+    )
+
+    await run_blocking(configure_provider)
+    client = get_openai_client()
+    if client is None:
+        client = await run_blocking(build_openai_client)
+        use_openai_client(client, tracing=True)
+    result = await probe_provider(client)
+    if result["status"] != "reachable":
+        raise RuntimeError(f"provider {result['status']}")
+
+
+_STEP_FUNCTIONS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "agents": _warm_agents,
+    "examples": _warm_examples,
+    "images": _warm_images,
+    "pdf": _warm_pdf,
+    "connections": _warm_connections,
+}
+
+
+async def run_warmup(steps: Optional[List[str]] = None) -> Dict:
+    """
+    Run the warm-up steps in order.
+
+    A failing step is logged and recorded but doesn't stop the others or keep
+    the instance unready; the first request then pays for that step instead.
+
+    Args:
+        steps: Steps to run (default: ``WARMUP_STEPS`` setting)
+
+    Returns:
+        Warm-up status with per-step durations
+    """
+    _state["status"] = "running"
+    _state["steps"] = {}
+    start = time.perf_counter()
+    for step in steps if steps is not None else settings.WARMUP_STEPS:
+        step_start = time.perf_counter()
+        try:
+            await _STEP_FUNCTIONS[step]()
+            result = {"status": "ok"}
+        except Exception as e:
+            logger.warning(f"Warm-up step {step} failed: {e}", extra={"warmup_step": step})
+            result = {"status": "failed", "error": str(e)}
+        result["ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+        _state["steps"][step] = result
+    _state["status"] = "complete"
+    _state["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("Warm-up complete", extra={"warmup_ms": _state["ms"], "warmup_steps": _state["steps"]})
+    return warmup_status()
+
+
+def warmup_status() -> Dict:
+    """Current warm-up state: ``pending``, ``running`` or ``complete``, with step results."""
+    return {**_state, "steps": dict(_state["steps"])}
+
+
+def warmup_complete() -> bool:
+    """True once warm-up has finished, or when it is disabled."""
+    return not settings.WARMUP_ENABLED or _state["status"] == "complete"
+
+
+def start_warmup() -> None:
+    """Start warm-up in the background on the running loop, if enabled."""
+    global _task
+    if settings.WARMUP_ENABLED and _task is None:
+        _state.clear()
+        _state.update(status="pending", steps={})
+        _task = asyncio.get_running_loop().create_task(run_warmup())
+
+
+async def wait_for_warmup() -> None:
+    """Wait for a background warm-up started by ``start_warmup`` to finish."""
+    if _task is not None:
+        await asyncio.shield(_task)
+
+
+async def stop_warmup() -> None:
+    """Cancel a warm-up still running at shutdown."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -1,6 +1,61 @@
 """Business cost calculations from the notebook."""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
 
-def calculate_costs(fp_rate: float, fn_rate: float, per_receipt_cost: float) -> float:
+import numpy as np
+
+# The notebook's business model: $2 per audit, $30 per missed audit,
+# 1M receipts a year of which 5% need an audit
+AUDIT_COST = 2.0
+MISSED_AUDIT_COST = 30.0
+RECEIPT_COUNT = 1e6
+AUDIT_FRACTION = 0.05
+
+# Parameters of calculate_costs, in order, that a sweep can vary
+COST_AXES = (
+    "fp_rate",
+    "fn_rate",
+    "per_receipt_cost",
+    "audit_cost",
+    "missed_audit_cost",
+    "receipt_count",
+    "audit_fraction",
+)
+
+# Dollars per 1M (input, output) tokens, matched by longest model-name prefix
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "o4-mini": (1.10, 4.40),
+    "o3": (2.00, 8.00),
+}
+
+
+def estimate_model_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    Estimate the dollar cost of a model call from its token usage.
+
+    Unknown models are priced at zero rather than guessed.
+    """
+    matches = [prefix for prefix in MODEL_PRICING if model.startswith(prefix)]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICING[max(matches, key=len)]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def calculate_costs(
+    fp_rate,
+    fn_rate,
+    per_receipt_cost,
+    audit_cost=AUDIT_COST,
+    missed_audit_cost=MISSED_AUDIT_COST,
+    receipt_count=RECEIPT_COUNT,
+    audit_fraction=AUDIT_FRACTION
+):
     """
     Calculate total system cost based on error rates.
     
@@ -10,12 +65,10 @@ def calculate_costs(fp_rate: float, fn_rate: float, per_receipt_cost: float) ->
     - Missing an audit costs $30
     - 5% of receipts need auditing
     - Current system: 97% true positive rate, 2% false positive rate
-    """
-    audit_cost = 2
-    missed_audit_cost = 30
-    receipt_count = 1e6
-    audit_fraction = 0.05
 
+    Any argument may be a NumPy array; arrays broadcast against each other,
+    so one call prices a whole grid of scenarios.
+    """
     needs_audit_count = receipt_count * audit_fraction
     no_needs_audit_count = receipt_count - needs_audit_count
 
@@ -62,3 +115,137 @@ def calculate_system_metrics(tp: int, fp: int, tn: int, fn: int) -> dict:
         "fp_rate": fp_rate,
         "fn_rate": fn_rate
     }
+
+
+def axis_values(spec: str) -> np.ndarray:
+    """
+    Parse a sweep axis: ``"0.01,0.02,0.05"`` for explicit values or
+    ``"start:stop:num"`` for ``num`` evenly spaced values including both ends.
+    """
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(value) for value in spec.split(",")])
+
+
+@dataclass
+class CostSweep:
+    """Costs over the outer product of the swept axes (one array dimension per axis)."""
+    axes: Dict[str, np.ndarray]
+    costs: np.ndarray
+
+    def cheapest(self) -> Dict[str, float]:
+        """Parameters and cost of the cheapest grid point."""
+        index = np.unravel_index(np.argmin(self.costs), self.costs.shape)
+        point = {name: float(values[i]) for (name, values), i in zip(self.axes.items(), index)}
+        point["cost"] = float(self.costs[index])
+        return point
+
+    def summary(self) -> Dict:
+        return {
+            "points": int(self.costs.size),
+            "axes": {name: values.tolist() for name, values in self.axes.items()},
+            "min": float(self.costs.min()),
+            "max": float(self.costs.max()),
+            "mean": float(self.costs.mean()),
+            "cheapest": self.cheapest(),
+        }
+
+
+def sweep_costs(**axes: Sequence[float]) -> CostSweep:
+    """
+    Evaluate ``calculate_costs`` over every combination of the given values.
+
+    Args:
+        **axes: Values for any of ``COST_AXES``; ``fp_rate``, ``fn_rate`` and
+            ``per_receipt_cost`` are required, the rest default to the
+            notebook's business model
+
+    Returns:
+        A sweep whose ``costs`` has one dimension per axis, in ``COST_AXES`` order
+    """
+    unknown = set(axes) - set(COST_AXES)
+    if unknown:
+        raise ValueError(f"Unknown cost axes: {', '.join(sorted(unknown))}")
+    defaults = {
+        "audit_cost": AUDIT_COST,
+        "missed_audit_cost": MISSED_AUDIT_COST,
+        "receipt_count": RECEIPT_COUNT,
+        "audit_fraction": AUDIT_FRACTION,
+    }
+    values = {
+        name: np.atleast_1d(np.asarray(axes[name] if name in axes else defaults[name], dtype=float))
+        for name in COST_AXES
+    }
+    # Give each axis its own dimension so the arithmetic broadcasts to the full grid
+    shaped = {
+        name: array.reshape([-1 if i == dim else 1 for i in range(len(COST_AXES))])
+        for dim, (name, array) in enumerate(values.items())
+    }
+    return CostSweep(axes=values, costs=calculate_costs(**shaped))
+
+
+def bootstrap_costs(
+    tp: int,
+    fp: int,
+    tn: int,
+    fn: int,
+    per_receipt_cost: float,
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    **cost_params: float
+) -> Dict:
+    """
+    Bootstrap confidence intervals for the error rates and cost of a system.
+
+    Resampling records with replacement only changes the confusion counts, so
+    each resample is drawn directly as a multinomial over the four cells,
+    which is exact and independent of the number of records.
+
+    Returns:
+        Point estimates and ``[low, high]`` intervals for ``fp_rate``,
+        ``fn_rate`` and ``cost``
+    """
+    counts = np.array([tp, fp, tn, fn], dtype=float)
+    total = int(counts.sum())
+    if total == 0:
+        raise ValueError("No records to resample")
+    rng = np.random.default_rng(seed)
+    samples = rng.multinomial(total, counts / total, size=n_resamples)
+    s_tp, s_fp, s_tn, s_fn = samples.T
+    fp_rates = np.divide(s_fp, s_fp + s_tn, out=np.zeros(n_resamples), where=(s_fp + s_tn) > 0)
+    fn_rates = np.divide(s_fn, s_fn + s_tp, out=np.zeros(n_resamples), where=(s_fn + s_tp) > 0)
+    costs = calculate_costs(fp_rates, fn_rates, per_receipt_cost, **cost_params)
+
+    metrics = calculate_system_metrics(tp, fp, tn, fn)
+    tail = (1 - confidence) / 2 * 100
+
+    def interval(values: np.ndarray):
+        return [float(v) for v in np.percentile(values, [tail, 100 - tail])]
+
+    return {
+        "fp_rate": metrics["fp_rate"],
+        "fn_rate": metrics["fn_rate"],
+        "cost": float(calculate_costs(metrics["fp_rate"], metrics["fn_rate"], per_receipt_cost, **cost_params)),
+        "fp_rate_ci": interval(fp_rates),
+        "fn_rate_ci": interval(fn_rates),
+        "cost_ci": interval(costs),
+        "confidence": confidence,
+        "resamples": n_resamples,
+    }
+
+
+def pareto_frontier(per_receipt_cost: Sequence[float], fp_rate: Sequence[float], fn_rate: Sequence[float]) -> np.ndarray:
+    """
+    Mask of the systems no other system beats on all of per-receipt cost, FP
+    rate and FN rate.
+
+    Total cost increases with each of the three for any audit prices and
+    volume, so a system off the frontier is never the cheapest choice.
+    """
+    points = np.column_stack([per_receipt_cost, fp_rate, fn_rate]).astype(float)
+    # dominated[i, j]: system j is at least as good as i everywhere and better somewhere
+    no_worse = (points[None, :, :] <= points[:, None, :]).all(axis=2)
+    better = (points[None, :, :] < points[:, None, :]).any(axis=2)
+    return ~(no_worse & better).any(axis=1)
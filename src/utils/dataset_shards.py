@@ -0,0 +1,222 @@
+"""
+Packed, memory-mapped dataset shards.
+
+``build_shards`` preprocesses every receipt image of a split once (the same
+``preprocess_image`` step extraction runs) and packs the model-ready JPEG
+payloads back to back into ``<split>.bin``. ``<split>.index.json`` records
+each payload's offset and length, SHA-256 hashes of the payload and of the
+original file, and the receipt's ground truth when there is one.
+
+``DatasetShard`` memory-maps the payload file, so reading an image is a slice
+of the mapping: no per-file open, no copy and no PIL work. The original file's
+hash keeps prediction cache keys identical to runs over the image directory.
+"""
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.utils.image_processing import preprocess_image
+
+SHARD_FORMAT = "receipt-shard"
+SHARD_VERSION = 1
+SPLITS = ("train", "valid", "test")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+@dataclass(frozen=True)
+class ShardRecord:
+    """One image in a shard: its payload (a view into the mapping) and metadata."""
+    name: str
+    payload: memoryview
+    sha256: str
+    source_sha256: str
+    ground_truth: Optional[Dict]
+
+
+def _load_ground_truth(ground_truth_dir: Optional[Path], stem: str) -> Optional[Dict]:
+    if ground_truth_dir is None:
+        return None
+    extraction_path = ground_truth_dir / "extraction" / f"{stem}.json"
+    audit_path = ground_truth_dir / "audit_results" / f"{stem}.json"
+    if not extraction_path.exists() or not audit_path.exists():
+        return None
+    return {
+        "extraction": json.loads(extraction_path.read_text()),
+        "audit": json.loads(audit_path.read_text()),
+    }
+
+
+def _prepare(path: Path) -> Tuple[bytes, str]:
+    data = path.read_bytes()
+    return preprocess_image(data), hashlib.sha256(data).hexdigest()
+
+
+def build_shard(
+    image_dir: Path,
+    output_dir: Path,
+    split: str,
+    ground_truth_dir: Optional[Path] = None,
+    workers: Optional[int] = None
+) -> Dict:
+    """
+    Pack one split's images into ``<split>.bin`` and ``<split>.index.json``.
+
+    Images are preprocessed on a thread pool and written in name order. Both
+    files are written under temporary names and renamed into place, payload
+    file first, so readers never see a partial shard.
+
+    Returns:
+        The index
+    """
+    paths = sorted(path for path in image_dir.iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    bin_path = output_dir / f"{split}.bin"
+    index_path = output_dir / f"{split}.index.json"
+
+    records = []
+    offset = 0
+    tmp_bin = bin_path.with_suffix(".bin.tmp")
+    with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool, open(tmp_bin, "wb") as f:
+        # map() yields in input order, so payloads land in name order
+        for path, (payload, source_sha256) in zip(paths, pool.map(_prepare, paths)):
+            f.write(payload)
+            records.append({
+                "name": path.name,
+                "offset": offset,
+                "length": len(payload),
+                "sha256": hashlib.sha256(payload).hexdigest(),
+                "source_sha256": source_sha256,
+                "ground_truth": _load_ground_truth(ground_truth_dir, path.stem),
+            })
+            offset += len(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+    index = {
+        "format": SHARD_FORMAT,
+        "version": SHARD_VERSION,
+        "split": split,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "payload_file": bin_path.name,
+        "size": offset,
+        "records": records,
+    }
+    tmp_index = index_path.with_suffix(".json.tmp")
+    tmp_index.write_text(json.dumps(index))
+    os.replace(tmp_bin, bin_path)
+    os.replace(tmp_index, index_path)
+    return index
+
+
+def build_shards(
+    data_dir: Path,
+    output_dir: Path,
+    splits: Sequence[str] = SPLITS,
+    ground_truth_dir: Optional[Path] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Build a shard for each split directory under ``data_dir``.
+
+    Args:
+        ground_truth_dir: Ground truth to embed (default ``data_dir/ground_truth``)
+
+    Returns:
+        Index by split, for the splits that exist
+    """
+    ground_truth_dir = ground_truth_dir or data_dir / "ground_truth"
+    return {
+        split: build_shard(data_dir / split, output_dir, split, ground_truth_dir, workers)
+        for split in splits
+        if (data_dir / split).is_dir()
+    }
+
+
+class DatasetShard:
+    """
+    Read-only, memory-mapped view of a shard.
+
+    Records and payloads are views into the mapping; copy a payload with
+    ``bytes()`` if it must outlive the shard.
+
+    Args:
+        index_path: Path to ``<split>.index.json``
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.index = json.loads(self.index_path.read_text())
+        if self.index.get("format") != SHARD_FORMAT or self.index.get("version") != SHARD_VERSION:
+            raise ValueError(f"{index_path} is not a version {SHARD_VERSION} receipt shard")
+        self.split: str = self.index["split"]
+        self._records: List[Dict] = self.index["records"]
+        self._positions = {record["name"]: i for i, record in enumerate(self._records)}
+
+        bin_path = self.index_path.parent / self.index["payload_file"]
+        self._file = open(bin_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size != self.index["size"]:
+            self._file.close()
+            raise ValueError(f"{bin_path} is {size} bytes, index expects {self.index['size']}")
+        # mmap can't map an empty file
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+
+    @classmethod
+    def open(cls, shard_dir: Path, split: str) -> "DatasetShard":
+        return cls(Path(shard_dir) / f"{split}.index.json")
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def names(self) -> List[str]:
+        return [record["name"] for record in self._records]
+
+    def _record(self, entry: Dict) -> ShardRecord:
+        start = entry["offset"]
+        return ShardRecord(
+            name=entry["name"],
+            payload=self._view[start:start + entry["length"]],
+            sha256=entry["sha256"],
+            source_sha256=entry["source_sha256"],
+            ground_truth=entry["ground_truth"],
+        )
+
+    def __getitem__(self, name: str) -> ShardRecord:
+        return self._record(self._records[self._positions[name]])
+
+    def __iter__(self) -> Iterator[ShardRecord]:
+        for entry in self._records:
+            yield self._record(entry)
+
+    def verify(self) -> List[str]:
+        """Names of records whose payload doesn't match its hash."""
+        return [
+            record.name for record in self
+            if hashlib.sha256(record.payload).hexdigest() != record.sha256
+        ]
+
+    def close(self) -> None:
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Payload views are still in use; the mapping closes when they're released
+                pass
+        self._file.close()
+
+    def __enter__(self) -> "DatasetShard":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
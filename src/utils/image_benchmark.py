@@ -0,0 +1,217 @@
+"""
+Microbenchmark for image and PDF preprocessing.
+
+Runs each preprocessing path over the receipt images in ``scripts/data`` and
+records per-image time, output bytes, output dimensions and estimated vision
+tokens, so resize, resampling and encoding settings can be chosen from data.
+"""
+import io
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from src.utils.image_processing import encode_image_to_base64, preprocess_image
+from src.utils.load_benchmark import DEFAULT_IMAGE_DIRS, find_images
+from src.utils.stats import summarize
+from src.utils.tokens import estimate_image_tokens
+
+RESAMPLING_FILTERS = {
+    "lanczos": Image.Resampling.LANCZOS,
+    "bicubic": Image.Resampling.BICUBIC,
+    "bilinear": Image.Resampling.BILINEAR,
+    "box": Image.Resampling.BOX,
+}
+
+
+@dataclass(frozen=True)
+class PreprocessVariant:
+    """A resize and re-encode setting to compare against the current pipeline."""
+    name: str
+    max_dimension: int = 2048
+    resample: str = "lanczos"
+    format: str = "JPEG"
+    quality: int = 85
+    grayscale: bool = False
+
+    def apply(self, image_data: bytes) -> bytes:
+        img = Image.open(io.BytesIO(image_data))
+        img = img.convert("L" if self.grayscale else "RGB")
+        if max(img.size) > self.max_dimension:
+            img.thumbnail(
+                (self.max_dimension, self.max_dimension),
+                RESAMPLING_FILTERS[self.resample],
+            )
+        output = io.BytesIO()
+        if self.format == "PNG":
+            img.save(output, format="PNG", optimize=True)
+        else:
+            img.save(output, format=self.format, quality=self.quality)
+        return output.getvalue()
+
+
+DEFAULT_VARIANTS: Tuple[PreprocessVariant, ...] = (
+    *(PreprocessVariant(f"resample_{name}", resample=name) for name in RESAMPLING_FILTERS),
+    *(PreprocessVariant(f"jpeg_q{q}", quality=q) for q in (95, 85, 75, 60)),
+    PreprocessVariant("jpeg_q85_1536px", max_dimension=1536),
+    PreprocessVariant("jpeg_q85_1024px", max_dimension=1024),
+    PreprocessVariant("webp_q80", format="WEBP", quality=80),
+    PreprocessVariant("png", format="PNG"),
+    PreprocessVariant("grayscale_jpeg_q85", grayscale=True),
+)
+
+
+@dataclass
+class Measurement:
+    """One preprocessing path applied to one input."""
+    path: str
+    image: str
+    ms: float
+    input_bytes: int
+    output_bytes: int
+    width: int
+    height: int
+    vision_tokens: int
+    base64_chars: int = 0
+
+
+def _optimize_for_ocr(image_data: bytes) -> bytes:
+    from src.api.dependencies import optimize_image_bytes
+    return optimize_image_bytes(image_data)
+
+
+def _process_pipeline(image_data: bytes) -> bytes:
+    # What /process does today: optimize in the endpoint, preprocess in the service
+    return preprocess_image(_optimize_for_ocr(image_data))
+
+
+def _pdf_first_page(pdf_data: bytes) -> bytes:
+    from src.api.dependencies import render_pdf_pages
+    return render_pdf_pages(pdf_data)[0]
+
+
+def image_to_pdf(image_data: bytes) -> bytes:
+    """Wrap an image in a one-page PDF for the PDF rendering path."""
+    output = io.BytesIO()
+    Image.open(io.BytesIO(image_data)).convert("RGB").save(output, format="PDF")
+    return output.getvalue()
+
+
+def _measure(
+    path: str,
+    image: Path,
+    image_data: bytes,
+    transform: Callable[[bytes], bytes],
+    repeat: int
+) -> Tuple[Measurement, float]:
+    """Time ``transform`` on one input, then time base64 encoding of its output."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = transform(image_data)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    data_uri = encode_image_to_base64(output, "image.bin")
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    width, height = Image.open(io.BytesIO(output)).size
+    return Measurement(
+        path=path,
+        image=image.name,
+        ms=round(min(timings), 3),
+        input_bytes=len(image_data),
+        output_bytes=len(output),
+        width=width,
+        height=height,
+        vision_tokens=estimate_image_tokens(width, height),
+        base64_chars=len(data_uri),
+    ), encode_ms
+
+
+def run_image_benchmark(
+    image_dirs: Sequence[Path] = DEFAULT_IMAGE_DIRS,
+    variants: Sequence[PreprocessVariant] = DEFAULT_VARIANTS,
+    limit: Optional[int] = None,
+    repeat: int = 1,
+    include_pdf: bool = True
+) -> Dict:
+    """
+    Benchmark every preprocessing path over the images in ``image_dirs``.
+
+    Args:
+        image_dirs: Directories to read images from
+        variants: Resize/re-encode settings to compare
+        limit: Maximum number of images (all when None)
+        repeat: Runs per image and path; the fastest is reported
+        include_pdf: Also time PDF rendering on a one-page PDF of each image
+
+    Returns:
+        ``{"summary": {path: stats}, "measurements": [...]}``
+    """
+    images = [p for p in find_images(image_dirs) if p.suffix.lower() != ".pdf"][:limit]
+    if not images:
+        raise ValueError(f"No images found in {', '.join(str(d) for d in image_dirs)}")
+
+    paths: List[Tuple[str, Callable[[bytes], bytes]]] = [
+        ("original", lambda data: data),
+        ("optimize_image_for_ocr", _optimize_for_ocr),
+        ("preprocess_image", preprocess_image),
+        ("process_pipeline", _process_pipeline),
+        *((variant.name, variant.apply) for variant in variants),
+    ]
+
+    measurements: List[Measurement] = []
+    encode_ms: Dict[str, List[float]] = {}
+    for image in images:
+        image_data = image.read_bytes()
+        for name, transform in paths:
+            measurement, encode_time = _measure(name, image, image_data, transform, repeat)
+            measurements.append(measurement)
+            encode_ms.setdefault(name, []).append(encode_time)
+        if include_pdf:
+            pdf_data = image_to_pdf(image_data)
+            measurement, encode_time = _measure(
+                "process_pdf_to_images", image, pdf_data, _pdf_first_page, repeat
+            )
+            measurements.append(measurement)
+            encode_ms.setdefault("process_pdf_to_images", []).append(encode_time)
+
+    summary = {}
+    for name in encode_ms:
+        rows = [m for m in measurements if m.path == name]
+        summary[name] = {
+            "images": len(rows),
+            "ms": summarize([m.ms for m in rows]),
+            "base64_ms": summarize(encode_ms[name]),
+            "mean_output_bytes": round(sum(m.output_bytes for m in rows) / len(rows)),
+            "mean_base64_chars": round(sum(m.base64_chars for m in rows) / len(rows)),
+            "mean_vision_tokens": round(sum(m.vision_tokens for m in rows) / len(rows), 1),
+            "max_dimension": max(max(m.width, m.height) for m in rows),
+        }
+
+    return {
+        "images": len(images),
+        "repeat": repeat,
+        "variants": [asdict(v) for v in variants],
+        "summary": summary,
+        "measurements": [asdict(m) for m in measurements],
+    }
+
+
+def format_table(summary: Dict[str, Dict]) -> str:
+    """Render the per-path summary as a fixed-width text table."""
+    header = (
+        f"{'path':<24} {'p50 ms':>8} {'p95 ms':>8} {'b64 ms':>7} "
+        f"{'mean KB':>8} {'max px':>7} {'tokens':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, stats in summary.items():
+        lines.append(
+            f"{name:<24} {stats['ms']['p50']:>8.1f} {stats['ms']['p95']:>8.1f} "
+            f"{stats['base64_ms']['p50']:>7.2f} {stats['mean_output_bytes'] / 1024:>8.1f} "
+            f"{stats['max_dimension']:>7} {stats['mean_vision_tokens']:>7.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,308 @@
+"""
+End-to-end load benchmark for ``/receipts/process``.
+
+Drives the FastAPI app in-process at a fixed concurrency with the receipt
+images in ``scripts/data``, with model calls answered by the local stub
+provider, and reports throughput, per-stage latency percentiles, CPU time,
+peak RSS and event-loop lag. Results are JSON so runs can be compared and
+regressions caught before deploy.
+"""
+import asyncio
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import cycle
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from src.core.config import settings
+from src.utils.stats import summarize
+from src.utils.stub_provider import StubConfig, create_stub_app
+
+DEFAULT_IMAGE_DIRS = (
+    Path("scripts/data/test"),
+    Path("scripts/data/valid"),
+    Path("scripts/data/train"),
+)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".pdf"}
+
+# Metrics compared against a baseline, with the direction that counts as worse
+REGRESSION_METRICS = {
+    "throughput_rps": "lower",
+    "latency_ms.total.p50": "higher",
+    "latency_ms.total.p95": "higher",
+    "latency_ms.server_overhead.p95": "higher",
+    "cpu_ms_per_request": "higher",
+    "peak_rss_mb": "higher",
+}
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parameters for one benchmark run."""
+    image_dirs: Sequence[Path] = DEFAULT_IMAGE_DIRS
+    requests: int = 200
+    concurrency: int = 16
+    warmup_requests: int = 4
+    extraction_profile: str = settings.PROCESS_EXTRACTION_PROFILE
+    extraction_model: str = settings.DEFAULT_EXTRACTION_MODEL
+    audit_model: str = settings.DEFAULT_AUDIT_MODEL
+    stub: StubConfig = field(default_factory=StubConfig)
+
+
+def find_images(image_dirs: Sequence[Path]) -> List[Path]:
+    """List benchmark inputs from the given directories."""
+    images: List[Path] = []
+    for image_dir in image_dirs:
+        if image_dir.exists():
+            images.extend(
+                path for path in sorted(image_dir.iterdir())
+                if path.suffix.lower() in IMAGE_EXTENSIONS
+            )
+    return images
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic timer."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (loop.time() - expected) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Parse a ``Server-Timing`` header into ``{stage: milliseconds}``."""
+    stages = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                stages[name] = float(value)
+    return stages
+
+
+def _stage_timings(result: Dict, total_ms: float, server_timing: str = "") -> Dict[str, float]:
+    """Per-stage timings for one ``/process`` response."""
+    costs = result.get("costs", {})
+    extraction_ms = costs.get("extraction_time_ms", 0.0)
+    audit_ms = costs.get("audit_time_ms", 0.0)
+    stages = {
+        "total": total_ms,
+        "processing": result.get("processing_time_ms", 0.0),
+        "extraction": extraction_ms,
+        "audit": audit_ms,
+        # Upload, validation, preprocessing and response serialisation
+        "server_overhead": max(0.0, total_ms - extraction_ms - audit_ms),
+    }
+    # Finer breakdown (validation, optimize, base64, each model call) when available
+    for stage, ms in parse_server_timing(server_timing).items():
+        if stage != "total":
+            stages[f"server.{stage}"] = ms
+    return stages
+
+
+async def _post(
+    client: httpx.AsyncClient,
+    image: Path,
+    payload: bytes,
+    config: BenchmarkConfig
+) -> Tuple[bool, Dict[str, float]]:
+    content_type = "application/pdf" if image.suffix.lower() == ".pdf" else "image/jpeg"
+    start = time.perf_counter()
+    response = await client.post(
+        f"{settings.API_V1_STR}/receipts/process",
+        files={"file": (image.name, payload, content_type)},
+        params={
+            "extraction_model": config.extraction_model,
+            "audit_model": config.audit_model,
+            "extraction_profile": config.extraction_profile,
+        },
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        return False, {"total": total_ms}
+    result = response.json()
+    return result.get("processing_successful", False), _stage_timings(
+        result, total_ms, response.headers.get("server-timing", "")
+    )
+
+
+async def run_benchmark(config: BenchmarkConfig) -> Dict:
+    """
+    Run the benchmark in-process against the stub provider.
+
+    Args:
+        config: Benchmark parameters
+
+    Returns:
+        Results dictionary (see ``REGRESSION_METRICS`` for the compared keys)
+    """
+    from src.core.provider import build_openai_client, get_openai_client, use_openai_client
+    from src.main import app
+    from src.services.warmup import wait_for_warmup
+
+    images = find_images(config.image_dirs)
+    if not images:
+        raise ValueError(f"No images found in {', '.join(str(d) for d in config.image_dirs)}")
+    payloads = {image: image.read_bytes() for image in images}
+
+    # Per-request client logging would dominate the run's CPU time and output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    stub_app = create_stub_app(config.stub)
+    stub_http = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_app), base_url="http://stub")
+    stub_client = build_openai_client(http_client=stub_http)
+    stub_client.base_url = "http://stub/v1/"
+
+    previous_client = get_openai_client()
+    use_openai_client(stub_client)
+
+    timings: Dict[str, List[float]] = {}
+    failures = 0
+    queue = cycle(images)
+    remaining = config.requests
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal failures, remaining
+        while remaining > 0:
+            remaining -= 1
+            image = next(queue)
+            try:
+                ok, stages = await _post(client, image, payloads[image], config)
+            except Exception:
+                ok, stages = False, {}
+            if not ok:
+                failures += 1
+            for stage, value in stages.items():
+                timings.setdefault(stage, []).append(value)
+
+    try:
+        async with app.router.lifespan_context(app):
+            await wait_for_warmup()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=120
+            ) as client:
+                for image in images[:config.warmup_requests]:
+                    await _post(client, image, payloads[image], config)
+
+                monitor = LoopLagMonitor()
+                monitor.start()
+                cpu_start = _cpu_seconds()
+                wall_start = time.perf_counter()
+
+                await asyncio.gather(*(worker(client) for _ in range(config.concurrency)))
+
+                wall_seconds = time.perf_counter() - wall_start
+                cpu_seconds = _cpu_seconds() - cpu_start
+                await monitor.stop()
+    finally:
+        use_openai_client(previous_client)
+        await stub_http.aclose()
+
+    completed = config.requests
+    stub_config = asdict(config.stub)
+    stub_config["ground_truth_dir"] = str(stub_config["ground_truth_dir"])
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": config.requests,
+            "concurrency": config.concurrency,
+            "images": len(images),
+            "extraction_profile": config.extraction_profile,
+            "extraction_model": config.extraction_model,
+            "audit_model": config.audit_model,
+            "stub": stub_config,
+            # The stub answers model calls in this process, so its work is in both
+            "stub_in_process": True,
+            "note": "cpu_ms_per_request and peak_rss_mb include the in-process stub provider",
+        },
+        "requests": completed,
+        "failures": failures,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(completed / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_ms": {stage: summarize(values) for stage, values in timings.items()},
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_ms_per_request": round(cpu_seconds * 1000 / completed, 3) if completed else 0.0,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "event_loop_lag_ms": summarize(monitor.lags_ms),
+        "model_calls": dict(stub_app.state.provider.stats.by_output_type),
+    }
+
+
+def _lookup(results: Dict, dotted_key: str) -> Optional[float]:
+    value = results
+    for key in dotted_key.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[str]:
+    """
+    Compare a run against a baseline.
+
+    Args:
+        current: Results of this run
+        baseline: Results of the reference run
+        tolerance: Allowed relative change in the worse direction
+
+    Returns:
+        Human-readable descriptions of every metric that regressed
+    """
+    regressions = []
+    for metric, worse in REGRESSION_METRICS.items():
+        new, old = _lookup(current, metric), _lookup(baseline, metric)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if (worse == "higher" and change > tolerance) or (worse == "lower" and -change > tolerance):
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def save_results(results: Dict, output_path: Path) -> None:
+    """Write results as indented JSON, creating parent directories."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(results, indent=2))
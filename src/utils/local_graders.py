@@ -0,0 +1,276 @@
+"""
+Local grader engine.
+
+Runs the deterministic graders from ``src/utils/graders.py`` (``string_check``
+and ``text_similarity`` with ``bleu`` or ``fuzzy_match``) over evaluation
+records without a round trip to the evals platform. Each template is rendered
+once per record into a column, string checks compare whole columns with numpy,
+and similarity scores are computed once per distinct input/reference pair, so
+pass rates for a dataset of any size come back in seconds. Model-based graders
+(``score_model``, ``label_model``, ...) are skipped and stay on the platform.
+"""
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.models.audit import EvaluationRecord
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+_BLEU_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+STRING_CHECK_OPERATIONS = ("eq", "ne", "like", "ilike")
+
+
+@dataclass
+class GraderResult:
+    """Per-record scores of one grader, or why it was skipped."""
+    name: str
+    type: str
+    scores: Optional[np.ndarray] = None
+    passed: Optional[np.ndarray] = None
+    skipped: Optional[str] = None
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        return float(self.passed.mean()) if self.passed is not None and self.passed.size else None
+
+    @property
+    def mean_score(self) -> Optional[float]:
+        return float(self.scores.mean()) if self.scores is not None and self.scores.size else None
+
+    def as_dict(self) -> Dict:
+        result = {"name": self.name, "type": self.type}
+        if self.skipped:
+            result["skipped"] = self.skipped
+        else:
+            result.update(
+                count=int(self.passed.size),
+                passed=int(self.passed.sum()),
+                pass_rate=self.pass_rate,
+                mean_score=self.mean_score,
+            )
+        return result
+
+
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, ...], ...]]:
+    """
+    Split a ``{{ item.a.b }}`` template into its literal text and placeholder paths.
+
+    Returns:
+        ``(literals, paths)`` with one more literal than paths
+    """
+    literals = _PLACEHOLDER.split(template)[::2]
+    paths = tuple(tuple(expr.split(".")) for expr in _PLACEHOLDER.findall(template))
+    return tuple(literals), paths
+
+
+def _format(value: Any) -> str:
+    # Missing and null values render as empty, scalars as JSON would show them
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _lookup(context: Dict, path: Sequence[str]) -> Any:
+    value: Any = context
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def render_column(template: str, contexts: Sequence[Dict]) -> np.ndarray:
+    """Render ``template`` against each ``{"item": ...}`` context into a string array."""
+    literals, paths = compile_template(template)
+    if not paths:
+        return np.full(len(contexts), template, dtype=object)
+    if len(paths) == 1 and literals == ("", ""):
+        path = paths[0]
+        return np.array([_format(_lookup(context, path)) for context in contexts], dtype=object)
+    rendered = []
+    for context in contexts:
+        parts = [literals[0]]
+        for path, literal in zip(paths, literals[1:]):
+            parts.append(_format(_lookup(context, path)))
+            parts.append(literal)
+        rendered.append("".join(parts))
+    return np.array(rendered, dtype=object)
+
+
+def fuzzy_match(hypothesis: str, reference: str) -> float:
+    """Normalized edit similarity in [0, 1] (1 for identical strings)."""
+    if not hypothesis and not reference:
+        return 1.0
+    return SequenceMatcher(None, hypothesis, reference, autojunk=False).ratio()
+
+
+def _ngrams(tokens: Sequence[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def bleu(hypothesis: str, reference: str, max_order: int = 4) -> float:
+    """
+    Sentence BLEU in [0, 1].
+
+    Uses n-gram orders up to the hypothesis length so short strings such as
+    merchant names can still score 1, and exponential smoothing for higher
+    orders with no matches. No matching tokens at all scores 0.
+    """
+    hyp, ref = _BLEU_TOKEN.findall(hypothesis), _BLEU_TOKEN.findall(reference)
+    if not hyp or not ref:
+        return float(hyp == ref)
+    order = min(max_order, len(hyp))
+    log_precision = 0.0
+    smoothing = 1.0
+    for n in range(1, order + 1):
+        matches = sum((_ngrams(hyp, n) & _ngrams(ref, n)).values())
+        total = len(hyp) - n + 1
+        if matches == 0:
+            if n == 1:
+                return 0.0
+            smoothing *= 2
+            log_precision += math.log(1 / (smoothing * total))
+        else:
+            log_precision += math.log(matches / total)
+    brevity = 1.0 if len(hyp) > len(ref) else math.exp(1 - len(ref) / len(hyp))
+    return brevity * math.exp(log_precision / order)
+
+
+SIMILARITY_METRICS: Dict[str, Callable[[str, str], float]] = {
+    "bleu": bleu,
+    "fuzzy_match": fuzzy_match,
+}
+
+
+def _string_check(operation: str, inputs: np.ndarray, references: np.ndarray) -> np.ndarray:
+    inputs, references = inputs.astype(str), references.astype(str)
+    if operation == "eq":
+        return inputs == references
+    if operation == "ne":
+        return inputs != references
+    if operation == "ilike":
+        inputs, references = np.char.lower(inputs), np.char.lower(references)
+    return np.char.find(inputs, references) >= 0
+
+
+def _text_similarity(metric: str, inputs: np.ndarray, references: np.ndarray) -> np.ndarray:
+    # Datasets repeat values heavily (same merchant, empty notes), so score each pair once
+    score = SIMILARITY_METRICS[metric]
+    memo: Dict[Tuple[str, str], float] = {}
+    scores = np.empty(len(inputs))
+    for i, pair in enumerate(zip(inputs, references)):
+        if pair not in memo:
+            memo[pair] = score(*pair)
+        scores[i] = memo[pair]
+    return scores
+
+
+def _skip_reason(grader: Dict) -> Optional[str]:
+    grader_type = grader.get("type")
+    if grader_type == "string_check":
+        if grader.get("operation") not in STRING_CHECK_OPERATIONS:
+            return f"unsupported operation {grader.get('operation')!r}"
+        return None
+    if grader_type == "text_similarity":
+        if grader.get("evaluation_metric") not in SIMILARITY_METRICS:
+            return f"unsupported metric {grader.get('evaluation_metric')!r}"
+        return None
+    return f"{grader_type} graders run remotely"
+
+
+def _contexts(records: Iterable[Union[EvaluationRecord, Dict]]) -> List[Dict]:
+    contexts = []
+    for record in records:
+        if isinstance(record, EvaluationRecord):
+            contexts.append({"item": record.model_dump(mode="json")})
+        elif "item" in record:
+            contexts.append(record)
+        else:
+            contexts.append({"item": record})
+    return contexts
+
+
+def run_local_graders(
+    graders: Sequence[Dict],
+    records: Iterable[Union[EvaluationRecord, Dict]]
+) -> List[GraderResult]:
+    """
+    Grade records locally with every supported grader.
+
+    Args:
+        graders: Grader definitions as passed to ``client.evals.create``
+        records: ``EvaluationRecord``s, or dataset items (``{"item": {...}}``
+            or the bare item dict)
+
+    Returns:
+        One result per grader, in order; unsupported graders are marked skipped
+    """
+    contexts = _contexts(records)
+    columns: Dict[str, np.ndarray] = {}
+
+    def column(template: str) -> np.ndarray:
+        if template not in columns:
+            columns[template] = render_column(template, contexts)
+        return columns[template]
+
+    results = []
+    for grader in graders:
+        result = GraderResult(name=grader["name"], type=grader["type"])
+        result.skipped = _skip_reason(grader)
+        if result.skipped:
+            results.append(result)
+            continue
+        inputs, references = column(grader["input"]), column(grader["reference"])
+        if grader["type"] == "string_check":
+            result.passed = _string_check(grader["operation"], inputs, references)
+            result.scores = result.passed.astype(float)
+        else:
+            result.scores = _text_similarity(grader["evaluation_metric"], inputs, references)
+            result.passed = result.scores >= grader["pass_threshold"]
+        results.append(result)
+    return results
+
+
+def load_dataset_items(path: Path) -> List[Dict]:
+    """Read dataset items from a JSONL file, skipping unreadable lines."""
+    items = []
+    with open(path) as f:
+        for line in f:
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                continue
+    return items
+
+
+def format_results(results: Sequence[GraderResult]) -> str:
+    """Table of pass rates and mean scores, one row per grader."""
+    width = max((len(result.name) for result in results), default=0)
+    lines = [f"{'grader':<{width}}  {'pass rate':>9}  {'mean score':>10}  passed"]
+    for result in results:
+        if result.skipped:
+            lines.append(f"{result.name:<{width}}  {'-':>9}  {'-':>10}  skipped ({result.skipped})")
+        elif not result.passed.size:
+            lines.append(f"{result.name:<{width}}  {'-':>9}  {'-':>10}  0/0")
+        else:
+            lines.append(
+                f"{result.name:<{width}}  {result.pass_rate:>9.1%}  {result.mean_score:>10.3f}  "
+                f"{int(result.passed.sum())}/{result.passed.size}"
+            )
+    return "\n".join(lines)
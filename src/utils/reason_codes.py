@@ -0,0 +1,160 @@
+"""
+Reason codes for terse audit decisions.
+
+Terse audits return a reason code per criterion instead of prose. These helpers
+render the human-readable reasoning locally and derive codes for existing
+(prose) decisions so they can be used as terse few-shot examples.
+"""
+import re
+
+from src.models.audit import AuditDecision, TerseAuditDecision
+from src.models.receipt import ReceiptDetails
+
+TRAVEL_REASONS = {
+    "FUEL": "The purchase is fuel, which is travel-related",
+    "LODGING": "The purchase is lodging, which is travel-related",
+    "AIRFARE": "The purchase is airfare, which is travel-related",
+    "CAR_RENTAL": "The purchase is a car rental, which is travel-related",
+    "VEHICLE_SUPPLIES": "The purchase is vehicle supplies or maintenance, which may be required while traveling",
+    "OTHER_TRAVEL": "The purchase is a travel-related expense",
+    "NON_TRAVEL_ITEMS": "The receipt lists items that are not travel-related",
+}
+
+AMOUNT_REASONS = {
+    "UNDER_LIMIT": "The total is {total}, which is under $50",
+    "OVER_LIMIT": "The total is {total}, which exceeds $50",
+    "TOTAL_MISSING": "The total could not be read from the receipt",
+}
+
+MATH_REASONS = {
+    "TOTALS_MATCH": "The line items and tax sum to the total",
+    "WITHIN_ONE_CENT": "The line items and tax sum to within $0.01 of the total",
+    "TOTALS_MISMATCH": "The line items and tax do not sum to the total",
+    "INSUFFICIENT_DATA": "There is not enough information on the receipt to check the math",
+}
+
+HANDWRITTEN_REASONS = {
+    "NO_NOTES": "There are no handwritten notes",
+    "NO_X_IN_NOTES": "There is no 'X' in the handwritten notes",
+    "X_IN_NOTES": "There is an 'X' in the handwritten notes",
+}
+
+# Keywords used to pick a travel reason code for prose decisions
+_TRAVEL_KEYWORDS = [
+    ("FUEL", ("fuel", "gas", "unleaded", "diesel", "e-85")),
+    ("LODGING", ("hotel", "lodging", "motel", "inn")),
+    ("AIRFARE", ("air", "flight")),
+    ("CAR_RENTAL", ("rental", "rent a car")),
+    ("VEHICLE_SUPPLIES", ("auto", "oil", "vehicle", "tire", "car wash")),
+]
+
+
+def _flag(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def render_reasoning(decision: TerseAuditDecision, receipt: ReceiptDetails) -> str:
+    """
+    Render the prose reasoning for a terse audit decision.
+
+    Args:
+        decision: Terse decision returned by the model
+        receipt: Receipt the decision was made for
+
+    Returns:
+        Numbered reasoning in the same shape as the few-shot examples
+    """
+    total = f"${receipt.total}" if receipt.total else "unknown"
+    lines = [
+        f"1. {TRAVEL_REASONS[decision.not_travel_related_reason]}, "
+        f"so NOT_TRAVEL_RELATED is {_flag(decision.not_travel_related)}.",
+        f"2. {AMOUNT_REASONS[decision.amount_over_limit_reason].format(total=total)}, "
+        f"so AMOUNT_OVER_LIMIT is {_flag(decision.amount_over_limit)}.",
+        f"3. {MATH_REASONS[decision.math_error_reason]}, "
+        f"so MATH_ERROR is {_flag(decision.math_error)}.",
+        f"4. {HANDWRITTEN_REASONS[decision.handwritten_x_reason]}, "
+        f"so HANDWRITTEN_X is {_flag(decision.handwritten_x)}.",
+    ]
+
+    violated = [
+        name for name, value in (
+            ("NOT_TRAVEL_RELATED", decision.not_travel_related),
+            ("AMOUNT_OVER_LIMIT", decision.amount_over_limit),
+            ("MATH_ERROR", decision.math_error),
+            ("HANDWRITTEN_X", decision.handwritten_x),
+        ) if value
+    ]
+    if violated:
+        names = " and ".join(violated) if len(violated) < 3 else f"{', '.join(violated[:-1])} and {violated[-1]}"
+        condition = f"{names} {'is' if len(violated) == 1 else 'are'} true"
+    # The closing sentence follows the model's NEEDS_AUDIT, even where it disagrees with the criteria
+    if decision.needs_audit:
+        lines.append(
+            f"Since {condition}, the receipt needs auditing." if violated
+            else "The receipt was flagged for auditing."
+        )
+    else:
+        lines.append(
+            f"Although {condition}, the receipt was not flagged for auditing." if violated
+            else "None of the criteria are violated, so the receipt does not need auditing."
+        )
+
+    return " ".join(lines)
+
+
+def to_audit_decision(decision: TerseAuditDecision, receipt: ReceiptDetails) -> AuditDecision:
+    """Convert a terse decision into an ``AuditDecision`` with rendered reasoning."""
+    return AuditDecision(
+        not_travel_related=decision.not_travel_related,
+        amount_over_limit=decision.amount_over_limit,
+        math_error=decision.math_error,
+        handwritten_x=decision.handwritten_x,
+        reasoning=render_reasoning(decision, receipt),
+        needs_audit=decision.needs_audit,
+    )
+
+
+def _travel_reason(decision: AuditDecision, receipt: ReceiptDetails) -> str:
+    """Pick the travel reason code that best describes a receipt."""
+    if decision.not_travel_related:
+        return "NON_TRAVEL_ITEMS"
+
+    text = " ".join(
+        f"{item.category or ''} {item.description or ''}" for item in receipt.items
+    ).lower() + f" {(receipt.merchant or '').lower()}"
+    for code, keywords in _TRAVEL_KEYWORDS:
+        if any(re.search(rf"\b{re.escape(keyword)}\b", text) for keyword in keywords):
+            return code
+    return "OTHER_TRAVEL"
+
+
+def to_terse_decision(decision: AuditDecision, receipt: ReceiptDetails) -> TerseAuditDecision:
+    """
+    Derive reason codes for a prose decision.
+
+    Used to turn the labelled few-shot examples into terse examples; the
+    booleans and ``needs_audit`` are copied unchanged.
+    """
+    if not receipt.total:
+        amount_reason = "TOTAL_MISSING"
+    else:
+        amount_reason = "OVER_LIMIT" if decision.amount_over_limit else "UNDER_LIMIT"
+
+    if decision.handwritten_x:
+        handwritten_reason = "X_IN_NOTES"
+    elif not receipt.handwritten_notes:
+        handwritten_reason = "NO_NOTES"
+    else:
+        handwritten_reason = "NO_X_IN_NOTES"
+
+    return TerseAuditDecision(
+        not_travel_related=decision.not_travel_related,
+        not_travel_related_reason=_travel_reason(decision, receipt),
+        amount_over_limit=decision.amount_over_limit,
+        amount_over_limit_reason=amount_reason,
+        math_error=decision.math_error,
+        math_error_reason="TOTALS_MISMATCH" if decision.math_error else "TOTALS_MATCH",
+        handwritten_x=decision.handwritten_x,
+        handwritten_x_reason=handwritten_reason,
+        needs_audit=decision.needs_audit,
+    )
@@ -0,0 +1,24 @@
+"""Small summary statistics shared by the benchmarks and runtime monitors."""
+import math
+from typing import Dict, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of ``values``."""
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
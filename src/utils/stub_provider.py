@@ -0,0 +1,344 @@
+"""
+Local OpenAI-compatible stub provider for offline benchmarking and load tests.
+
+Speaks enough of the Responses API for the Agents SDK: ``POST /v1/responses``
+returns a schema-valid structured output for each of our output types, drawn
+from the ground truth data where possible, after a configurable latency and
+with configurable 429/500 failure rates and token usage.
+
+Run it with ``python -m src.cli stub-provider`` and point the API at it with
+``OPENAI_BASE_URL=http://localhost:8100/v1``.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.core.config import settings
+from src.models.audit import (
+    AuditDecision,
+    PackedAuditDecision,
+    PackedTerseAuditDecision,
+    TerseAuditDecision,
+)
+from src.models.receipt import (
+    LeanReceiptDetails,
+    Location,
+    ReceiptDetails,
+    ReceiptHeader,
+)
+from src.services.example_bank import load_ground_truth
+from src.utils.reason_codes import to_terse_decision
+from src.utils.tokens import estimate_tokens
+
+# Header expense category for each terse travel reason code
+_HEADER_CATEGORIES = {
+    "FUEL": "fuel",
+    "LODGING": "lodging",
+    "AIRFARE": "airfare",
+    "CAR_RENTAL": "car_rental",
+    "VEHICLE_SUPPLIES": "vehicle_supplies",
+    "OTHER_TRAVEL": "other_travel",
+    "NON_TRAVEL_ITEMS": "non_travel",
+}
+
+_RECEIPT_BLOCK_RE = re.compile(r'<receipt id=\\?"([^"\\]+)\\?">(.*?)</receipt>', re.DOTALL)
+
+Sample = Tuple[ReceiptDetails, AuditDecision]
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub provider."""
+    latency_median_ms: float = 800.0
+    latency_sigma: float = 0.4  # Shape of the lognormal latency distribution
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with 429
+    server_error_rate: float = 0.0  # Fraction of requests answered with 500
+    image_tokens: int = 765  # Input tokens per "auto"/"high" detail image
+    low_detail_image_tokens: int = 85
+    output_tokens: Optional[int] = None  # Fixed output token count; estimated when None
+    ground_truth_dir: Path = field(
+        default_factory=lambda: Path(__file__).parent.parent.parent / "scripts" / "data" / "ground_truth"
+    )
+    seed: Optional[int] = None
+
+
+@dataclass
+class StubStats:
+    """Counters exposed at ``GET /stub/stats``."""
+    requests: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    by_output_type: Dict[str, int] = field(default_factory=dict)
+
+
+def _header_payload(receipt: ReceiptDetails, decision: AuditDecision) -> Dict:
+    terse = to_terse_decision(decision, receipt)
+    return ReceiptHeader(
+        m=receipt.merchant,
+        c=_HEADER_CATEGORIES[terse.not_travel_related_reason],
+        ni=len(receipt.items),
+        st=receipt.subtotal,
+        tx=receipt.tax,
+        tt=receipt.total,
+        n=receipt.handwritten_notes,
+    ).model_dump()
+
+
+def _packed_payload(terse: bool) -> Callable:
+    def build(samples: List[Tuple[str, Sample]]) -> Dict:
+        decisions = []
+        for receipt_id, (receipt, decision) in samples:
+            output = to_terse_decision(decision, receipt) if terse else decision
+            decisions.append({"receipt_id": receipt_id, **output.model_dump()})
+        return {"decisions": decisions}
+    return build
+
+
+# Payload builders keyed by the top-level properties of each output type's schema
+_SINGLE_BUILDERS: Dict[frozenset, Tuple[str, Callable[[ReceiptDetails, AuditDecision], Dict]]] = {
+    frozenset(ReceiptDetails.model_fields): (
+        "ReceiptDetails", lambda r, d: r.model_dump()),
+    frozenset(LeanReceiptDetails.model_fields): (
+        "LeanReceiptDetails", lambda r, d: LeanReceiptDetails.from_receipt_details(r).model_dump()),
+    frozenset(ReceiptHeader.model_fields): (
+        "ReceiptHeader", _header_payload),
+    frozenset(AuditDecision.model_fields): (
+        "AuditDecision", lambda r, d: d.model_dump()),
+    frozenset(TerseAuditDecision.model_fields): (
+        "TerseAuditDecision", lambda r, d: to_terse_decision(d, r).model_dump()),
+}
+
+# Packed outputs are keyed by the properties of one ``decisions`` item
+_PACKED_BUILDERS: Dict[frozenset, Tuple[str, Callable]] = {
+    frozenset(PackedAuditDecision.model_fields): (
+        "PackedAuditResult", _packed_payload(terse=False)),
+    frozenset(PackedTerseAuditDecision.model_fields): (
+        "PackedTerseAuditResult", _packed_payload(terse=True)),
+}
+
+
+def _placeholder(schema: Dict, defs: Dict) -> Any:
+    """Generate a minimal value that satisfies a JSON schema (unknown output types)."""
+    if "$ref" in schema:
+        return _placeholder(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        return _placeholder(schema["anyOf"][0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == "object":
+        return {
+            name: _placeholder(prop, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return []
+    return {"string": "", "integer": 0, "number": 0, "boolean": False, "null": None}.get(schema_type)
+
+
+class StubProvider:
+    """Generates Responses API payloads for the stub server."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats = StubStats()
+        self.samples: List[Sample] = [
+            (receipt, decision)
+            for _, receipt, decision in load_ground_truth(config.ground_truth_dir)
+        ]
+        if not self.samples:
+            self.samples = [(
+                ReceiptDetails(location=Location(), items=[], total="0.00", handwritten_notes=[]),
+                AuditDecision(
+                    not_travel_related=False,
+                    amount_over_limit=False,
+                    math_error=False,
+                    handwritten_x=False,
+                    reasoning="Stub decision",
+                    needs_audit=False,
+                ),
+            )]
+
+    def latency_seconds(self) -> float:
+        """Draw a response latency from the configured lognormal distribution."""
+        if self.config.latency_median_ms <= 0:
+            return 0.0
+        mu = math.log(self.config.latency_median_ms / 1000)
+        return self.random.lognormvariate(mu, self.config.latency_sigma)
+
+    def failure_status(self) -> Optional[int]:
+        """Pick an injected failure status code, if any."""
+        roll = self.random.random()
+        if roll < self.config.rate_limit_rate:
+            return 429
+        if roll < self.config.rate_limit_rate + self.config.server_error_rate:
+            return 500
+        return None
+
+    def _match_sample(self, text: str) -> Sample:
+        """Prefer the ground truth receipt whose merchant and total appear in the input."""
+        for receipt, decision in self.samples:
+            if receipt.merchant and receipt.total and receipt.merchant in text and receipt.total in text:
+                return receipt, decision
+        return self.random.choice(self.samples)
+
+    def build_output(self, body: Dict) -> Tuple[str, Any]:
+        """
+        Build the structured output for a request.
+
+        Returns:
+            Tuple of (output type name, JSON-serialisable payload)
+        """
+        text_format = (body.get("text") or {}).get("format") or {}
+        schema = text_format.get("schema") or {}
+        properties = frozenset(schema.get("properties", {}))
+        input_text = json.dumps(body.get("input", ""))
+
+        if properties in _SINGLE_BUILDERS:
+            name, build = _SINGLE_BUILDERS[properties]
+            return name, build(*self._match_sample(input_text))
+
+        if properties == frozenset({"decisions"}):
+            item_schema = schema["properties"]["decisions"].get("items", {})
+            if "$ref" in item_schema:
+                item_schema = schema.get("$defs", {})[item_schema["$ref"].split("/")[-1]]
+            item_properties = frozenset(item_schema.get("properties", {}))
+            if item_properties in _PACKED_BUILDERS:
+                name, build = _PACKED_BUILDERS[item_properties]
+                blocks = _RECEIPT_BLOCK_RE.findall(input_text)
+                return name, build([
+                    (receipt_id, self._match_sample(block)) for receipt_id, block in blocks
+                ])
+
+        if schema:
+            return "unknown", _placeholder(schema, schema.get("$defs", {}))
+        return "text", "Stub response"
+
+    def input_tokens(self, body: Dict) -> int:
+        """Estimate input tokens from the instructions, text input and images."""
+        tokens = estimate_tokens(body.get("instructions") or "")
+        items = body.get("input", "")
+        if isinstance(items, str):
+            return tokens + estimate_tokens(items)
+        for item in items:
+            content = item.get("content", "")
+            if isinstance(content, str):
+                tokens += estimate_tokens(content)
+                continue
+            for part in content:
+                if part.get("type") == "input_image":
+                    tokens += (
+                        self.config.low_detail_image_tokens
+                        if part.get("detail") == "low"
+                        else self.config.image_tokens
+                    )
+                else:
+                    tokens += estimate_tokens(part.get("text", ""))
+        return tokens
+
+    def response(self, body: Dict) -> Dict:
+        """Build a complete Responses API response object."""
+        name, payload = self.build_output(body)
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        input_tokens = self.input_tokens(body)
+        output_tokens = self.config.output_tokens or estimate_tokens(text)
+
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        self.stats.by_output_type[name] = self.stats.by_output_type.get(name, 0) + 1
+
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": body.get("model", "stub"),
+            "output": [{
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "error": None,
+            "incomplete_details": None,
+            "instructions": None,
+            "metadata": {},
+            "temperature": 1.0,
+            "top_p": 1.0,
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+
+def create_stub_app(config: Optional[StubConfig] = None) -> FastAPI:
+    """Create the stub provider application."""
+    provider = StubProvider(config or StubConfig())
+    app = FastAPI(title="Stub Model Provider")
+    app.state.provider = provider
+
+    @app.post("/v1/responses")
+    async def create_response(request: Request):
+        body = await request.json()
+        provider.stats.requests += 1
+
+        await asyncio.sleep(provider.latency_seconds())
+
+        status = provider.failure_status()
+        if status == 429:
+            provider.stats.rate_limited += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {
+                    "message": "Rate limit reached (stub provider)",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                }},
+            )
+        if status == 500:
+            provider.stats.server_errors += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {
+                    "message": "Injected server error (stub provider)",
+                    "type": "server_error",
+                    "code": None,
+                }},
+            )
+
+        return provider.response(body)
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [
+            {"id": settings.DEFAULT_EXTRACTION_MODEL, "object": "model", "owned_by": "stub"},
+        ]}
+
+    @app.get("/stub/stats")
+    async def stats():
+        return provider.stats.__dict__
+
+    return app
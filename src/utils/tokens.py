@@ -0,0 +1,50 @@
+"""
+Token estimation helpers.
+"""
+import math
+
+# Rough average for English/JSON text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Prompt or payload text
+
+    Returns:
+        Approximate token count (never less than 1 for non-empty text)
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def estimate_image_tokens(width: int, height: int, detail: str = "auto") -> int:
+    """
+    Estimate the input tokens charged for an image.
+
+    Follows OpenAI's tiling rule for GPT-4o class models: ``low`` detail is a
+    flat 85 tokens; otherwise the image is scaled to fit 2048x2048, then so its
+    short side is at most 768px, and charged 170 tokens per 512px tile plus 85.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        detail: ``low``, ``high`` or ``auto`` (treated as ``high``)
+
+    Returns:
+        Estimated image input tokens
+    """
+    if detail == "low":
+        return 85
+
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 85 + 170 * tiles
@@ -1,10 +1,14 @@
 """
 Test configuration and fixtures.
 """
+import io
+
 import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
 
+from PIL import Image
+
 from src.main import app
 
 
@@ -20,14 +24,23 @@ def test_data_dir():
     return Path(__file__).parent.parent / "data" / "test"
 
 
+@pytest.fixture
+def image_upload():
+    """Build a ``files`` payload with a blank white JPEG of the given size."""
+    def make(size=(40, 60)):
+        buffer = io.BytesIO()
+        Image.new("RGB", size, color="white").save(buffer, format="JPEG")
+        return {"file": ("receipt.jpg", buffer.getvalue(), "image/jpeg")}
+    return make
+
+
 @pytest.fixture
 def mock_openai_response(monkeypatch):
     """Mock OpenAI API responses."""
     from src.models.receipt import ReceiptDetails, Location, LineItem
     from src.models.audit import AuditDecision
     
-    async def mock_extract_receipt_details(self, image_data, filename, model="gpt-4o-mini"):
-        """Mock extraction service method."""
+    def mock_receipt():
         return ReceiptDetails(
             merchant="Test Store",
             location=Location(city="Test City", state="CA", zipcode="12345"),
@@ -39,7 +52,15 @@ def mock_openai_response(monkeypatch):
             handwritten_notes=[]
         )
     
-    async def mock_evaluate_receipt_for_audit(self, receipt_details, model="gpt-4o-mini"):
+    async def mock_extract_receipt_details(self, image_data, filename, model="gpt-4o-mini", profile="full"):
+        """Mock extraction service method."""
+        return mock_receipt()
+    
+    async def mock_extract_receipt_staged(self, image_data, filename, model="gpt-4o-mini"):
+        """Mock staged extraction service method."""
+        return mock_receipt(), ["header"]
+    
+    async def mock_audit_receipt(self, receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
         """Mock audit service method."""
         return AuditDecision(
             not_travel_related=False,
@@ -53,5 +74,7 @@ def mock_openai_response(monkeypatch):
     # Mock the service methods directly
     monkeypatch.setattr("src.services.extraction.ExtractionService.extract_receipt_details", 
                        mock_extract_receipt_details)
-    monkeypatch.setattr("src.services.audit.AuditService.evaluate_receipt_for_audit", 
-                       mock_evaluate_receipt_for_audit)
\ No newline at end of file
+    monkeypatch.setattr("src.services.extraction.ExtractionService.extract_receipt_staged", 
+                       mock_extract_receipt_staged)
+    monkeypatch.setattr("src.services.audit.AuditService.audit_receipt", 
+                       mock_audit_receipt)
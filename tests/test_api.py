@@ -5,7 +5,9 @@ import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
 import json
+import time
 
+from src.core.config import settings
 from src.main import app
 from src.models.receipt import ReceiptDetails, Location
 from src.models.audit import AuditDecision
@@ -67,12 +69,28 @@ def test_health_check(client):
     assert "timestamp" in data
 
 
-def test_readiness_check(client):
-    """Test readiness check endpoint."""
-    response = client.get("/api/v1/health/ready")
-    assert response.status_code == 200
-    data = response.json()
-    assert data["status"] == "ready"
+def test_readiness_check(monkeypatch):
+    """Test readiness check endpoint flips to ready once warm-up completes."""
+    from src.core import provider
+
+    async def probe(client=None):
+        return {"status": "reachable", "latency_ms": 0.0, "checked_at": "now"}
+
+    # Stay offline: skip the provider connection step and fake the readiness probe
+    monkeypatch.setattr(settings, "WARMUP_STEPS", ["agents", "examples", "images", "pdf"])
+    monkeypatch.setattr(provider, "_run_probe", probe)
+    monkeypatch.setattr(provider, "_probe_result", None)
+    with TestClient(app) as client:
+        for _ in range(600):
+            response = client.get("/api/v1/health/ready")
+            if response.status_code == 200:
+                break
+            assert response.json()["problems"] == ["warming_up"]
+            time.sleep(0.1)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["warmup"]["status"] == "complete"
 
 
 def test_process_receipt_invalid_file(client, mock_openai_response):
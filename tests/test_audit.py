@@ -138,7 +138,7 @@ def test_processing_result_model():
 async def test_audit_service_initialization(audit_service):
     """Test audit service is properly initialized."""
     assert audit_service is not None
-    assert hasattr(audit_service, 'evaluate_receipt_for_audit')
+    assert hasattr(audit_service, 'audit_receipt')
 
 
 def test_audit_criteria_logic():
@@ -185,4 +185,259 @@ def test_audit_criteria_logic():
         reasoning="Multiple violations detected",
         needs_audit=True
     )
-    assert decision4.needs_audit
\ No newline at end of file
+    assert decision4.needs_audit
+
+def test_example_bank_retrieves_similar_receipts(sample_receipt_under_limit):
+    """Test that the example bank ranks fuel receipts above non-travel ones."""
+    from src.services.example_bank import NEAR_DUPLICATE_SCORE, ExampleBank, Example, format_example
+
+    def make_example(example_id, receipt, needs_audit):
+        decision = AuditDecision(
+            not_travel_related=needs_audit,
+            amount_over_limit=False,
+            math_error=False,
+            handwritten_x=False,
+            reasoning="Test",
+            needs_audit=needs_audit
+        )
+        text = format_example(receipt, decision)
+        return Example(example_id=example_id, receipt=receipt, decision=decision, text=text, tokens=100)
+
+    office_receipt = ReceiptDetails(
+        merchant="Office Depot",
+        location=Location(),
+        items=[LineItem(description="Printer Paper", category="Office", total="12.00")],
+        total="12.00",
+        handwritten_notes=[]
+    )
+    bank = ExampleBank([
+        make_example("office", office_receipt, True),
+        make_example("fuel", sample_receipt_under_limit, False),
+    ])
+
+    results = bank.retrieve(sample_receipt_under_limit, k=2, token_budget=1000, relative_cutoff=0.0)
+    assert [r.example.example_id for r in results] == ["fuel", "office"]
+
+    # With the evaluation cutoff a copy of the receipt being audited is skipped
+    results = bank.retrieve(
+        sample_receipt_under_limit, k=2, token_budget=1000, relative_cutoff=0.0, max_score=NEAR_DUPLICATE_SCORE
+    )
+    assert [r.example.example_id for r in results] == ["office"]
+
+    # Token budget limits how many examples are returned
+    results = bank.retrieve(sample_receipt_under_limit, k=2, token_budget=150, relative_cutoff=0.0)
+    assert len(results) == 1
+
+    # Excluded examples are never returned
+    results = bank.retrieve(sample_receipt_under_limit, exclude={"fuel"}, relative_cutoff=0.0)
+    assert all(r.example.example_id != "fuel" for r in results)
+
+
+def test_example_bank_loads_ground_truth():
+    """Test that the example bank indexes ground truth pairs plus static examples."""
+    from pathlib import Path
+    from src.services.example_bank import ExampleBank
+
+    ground_truth_dir = Path(__file__).parent.parent / "scripts" / "data" / "ground_truth"
+    bank = ExampleBank.from_ground_truth(ground_truth_dir)
+
+    assert len(bank.examples) > 3
+    assert {"static:0", "static:1", "static:2"} <= {e.example_id for e in bank.examples}
+
+
+def test_empty_example_bank_disables_retrieval(audit_service, sample_receipt_under_limit, monkeypatch, tmp_path, caplog):
+    """A bank without labelled examples falls back to the static examples with a warning."""
+    from src.core.config import settings
+    from src.services.audit import static_examples
+    from src.services.example_bank import get_example_bank, retrieval_enabled
+
+    monkeypatch.setattr(settings, "AUDIT_EXAMPLE_RETRIEVAL", True)
+    monkeypatch.setattr(settings, "AUDIT_EXAMPLE_BANK_DIR", str(tmp_path))
+    get_example_bank.cache_clear()
+    try:
+        with caplog.at_level("WARNING"):
+            assert not retrieval_enabled()
+        assert "no labelled examples" in caplog.text
+        assert audit_service._select_examples(sample_receipt_under_limit) == static_examples(False)
+    finally:
+        get_example_bank.cache_clear()
+
+
+def test_default_example_bank_is_held_out_from_eval_ground_truth():
+    """The configured bank never contains receipts from the evaluation ground truth."""
+    from pathlib import Path
+    from src.core.config import settings
+    from src.services.example_bank import load_ground_truth
+
+    ground_truth_dir = Path(__file__).parent.parent / "scripts" / "data" / "ground_truth"
+    eval_ids = {example_id for example_id, _, _ in load_ground_truth(ground_truth_dir)}
+    bank_ids = {example_id for example_id, _, _ in load_ground_truth(Path(settings.AUDIT_EXAMPLE_BANK_DIR))}
+
+    assert eval_ids
+    assert Path(settings.AUDIT_EXAMPLE_BANK_DIR).resolve() != ground_truth_dir.resolve()
+    assert not eval_ids & bank_ids
+
+
+@pytest.mark.asyncio
+async def test_packed_audit_falls_back_for_missing_ids(
+    audit_service, sample_receipt_under_limit, sample_receipt_over_limit, monkeypatch
+):
+    """Test that packed audits keep input order and re-audit receipts missing from the output."""
+    from types import SimpleNamespace
+    from src.models.audit import PackedAuditDecision, PackedAuditResult
+
+    async def mock_run(agent, input_message):
+        # Only return a decision for the first receipt
+        return SimpleNamespace(final_output=PackedAuditResult(decisions=[
+            PackedAuditDecision(
+                receipt_id="r0",
+                not_travel_related=False,
+                amount_over_limit=False,
+                math_error=False,
+                handwritten_x=False,
+                reasoning="Packed",
+                needs_audit=False
+            )
+        ]))
+
+    async def mock_audit_receipt(self, receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
+        return AuditDecision(
+            not_travel_related=True,
+            amount_over_limit=True,
+            math_error=False,
+            handwritten_x=False,
+            reasoning="Single",
+            needs_audit=True
+        )
+
+    monkeypatch.setattr("agents.Runner.run", mock_run)
+    monkeypatch.setattr(AuditService, "audit_receipt", mock_audit_receipt)
+
+    decisions = await audit_service.audit_receipts_packed(
+        [sample_receipt_under_limit, sample_receipt_over_limit],
+        reasoning_mode="verbose"
+    )
+
+    assert [d.reasoning for d in decisions] == ["Packed", "Single"]
+
+
+def test_pack_respects_receipt_limit(audit_service, monkeypatch):
+    """Test that receipts are split into packs by count."""
+    monkeypatch.setattr("src.services.audit.settings.AUDIT_PACK_MAX_RECEIPTS", 2)
+    packs = audit_service._pack(["{}"] * 5)
+    assert packs == [[0, 1], [2, 3], [4]]
+
+
+def test_terse_decision_renders_reasoning(sample_receipt_over_limit):
+    """Test that terse reason codes render to reasoning without changing the booleans."""
+    from src.models.audit import TerseAuditDecision
+    from src.utils.reason_codes import to_audit_decision, to_terse_decision
+
+    terse = TerseAuditDecision(
+        not_travel_related=True,
+        not_travel_related_reason="NON_TRAVEL_ITEMS",
+        amount_over_limit=True,
+        amount_over_limit_reason="OVER_LIMIT",
+        math_error=False,
+        math_error_reason="TOTALS_MATCH",
+        handwritten_x=False,
+        handwritten_x_reason="NO_NOTES",
+        needs_audit=True
+    )
+
+    decision = to_audit_decision(terse, sample_receipt_over_limit)
+
+    assert decision.not_travel_related is True
+    assert decision.amount_over_limit is True
+    assert decision.math_error is False
+    assert decision.handwritten_x is False
+    assert decision.needs_audit is True
+    assert "$108.00, which exceeds $50" in decision.reasoning
+    assert "Since NOT_TRAVEL_RELATED and AMOUNT_OVER_LIMIT are true, the receipt needs auditing." in decision.reasoning
+
+    # Round-tripping back to codes keeps the same decision
+    assert to_terse_decision(decision, sample_receipt_over_limit) == terse
+
+
+def test_terse_reasoning_closing_follows_needs_audit(sample_receipt_over_limit):
+    """The closing sentence agrees in number and reflects the model's NEEDS_AUDIT."""
+    from src.models.audit import TerseAuditDecision
+    from src.utils.reason_codes import render_reasoning
+
+    def closing(needs_audit, **flags):
+        fields = dict(
+            not_travel_related=False, not_travel_related_reason="FUEL",
+            amount_over_limit=False, amount_over_limit_reason="UNDER_LIMIT",
+            math_error=False, math_error_reason="TOTALS_MATCH",
+            handwritten_x=False, handwritten_x_reason="NO_NOTES",
+            needs_audit=needs_audit,
+        )
+        fields.update(flags)
+        return render_reasoning(TerseAuditDecision(**fields), sample_receipt_over_limit).rsplit(". ", 1)[-1]
+
+    assert closing(True, math_error=True) == "Since MATH_ERROR is true, the receipt needs auditing."
+    assert closing(True, math_error=True, handwritten_x=True, amount_over_limit=True) == (
+        "Since AMOUNT_OVER_LIMIT, MATH_ERROR and HANDWRITTEN_X are true, the receipt needs auditing."
+    )
+    assert closing(False, math_error=True) == "Although MATH_ERROR is true, the receipt was not flagged for auditing."
+    assert closing(True) == "The receipt was flagged for auditing."
+    assert closing(False) == "None of the criteria are violated, so the receipt does not need auditing."
+
+
+def test_terse_codes_for_fuel_receipt(sample_receipt_under_limit):
+    """Test reason codes derived for a travel-related receipt."""
+    from src.utils.reason_codes import to_terse_decision
+
+    decision = AuditDecision(
+        not_travel_related=False,
+        amount_over_limit=False,
+        math_error=False,
+        handwritten_x=False,
+        reasoning="Fuel under limit",
+        needs_audit=False
+    )
+    terse = to_terse_decision(decision, sample_receipt_under_limit)
+
+    assert terse.not_travel_related_reason == "FUEL"
+    assert terse.amount_over_limit_reason == "UNDER_LIMIT"
+    assert terse.handwritten_x_reason == "NO_NOTES"
+
+
+@pytest.mark.asyncio
+async def test_packed_audit_limits_packs_in_flight(audit_service, sample_receipt_under_limit, monkeypatch):
+    """Packs of one batch are sent at most AUDIT_PACK_CONCURRENCY at a time."""
+    import asyncio
+
+    monkeypatch.setattr("src.services.audit.settings.AUDIT_PACK_MAX_RECEIPTS", 1)
+    monkeypatch.setattr("src.services.audit.settings.AUDIT_PACK_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def audit_pack(receipts, receipt_jsons, model, reasoning_mode, exclude_examples=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [AuditDecision(
+            not_travel_related=False,
+            amount_over_limit=False,
+            math_error=False,
+            handwritten_x=False,
+            reasoning="Packed",
+            needs_audit=False
+        )]
+
+    monkeypatch.setattr(audit_service, "_audit_pack", audit_pack)
+    decisions = await audit_service.audit_receipts_packed([sample_receipt_under_limit] * 6)
+
+    assert len(decisions) == 6
+    assert peak == 2
+
+
+def test_audit_batch_rejects_oversized_batches(client, sample_receipt_under_limit, monkeypatch):
+    """Batches over AUDIT_BATCH_MAX_RECEIPTS are rejected before any model call."""
+    monkeypatch.setattr("src.core.config.settings.AUDIT_BATCH_MAX_RECEIPTS", 2)
+    body = [sample_receipt_under_limit.model_dump()] * 3
+    response = client.post("/api/v1/receipts/audit/batch", json=body)
+    assert response.status_code == 422
+    assert "maximum is 2" in response.json()["detail"]
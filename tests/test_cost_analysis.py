@@ -0,0 +1,73 @@
+"""
+Tests for confusion matrices and the business cost summary.
+"""
+import numpy as np
+
+from src.services.cost_analysis import (
+    AUDIT_FIELDS,
+    audit_confusion_matrices,
+    confusion_counts,
+    summarize_costs_from_eval,
+    summarize_costs_from_records,
+)
+from src.utils.cost_calculator import calculate_costs
+
+
+def _item(actual, predicted):
+    return {"item": {
+        "correct_audit_decision": dict(zip(AUDIT_FIELDS, actual)),
+        "predicted_audit_decision": dict(zip(AUDIT_FIELDS, predicted)),
+    }}
+
+
+def test_confusion_counts_match_elementwise_comparison():
+    rng = np.random.default_rng(0)
+    actual = rng.random((1000, 3)) < 0.3
+    predicted = rng.random((1000, 3)) < 0.3
+
+    counts = confusion_counts(actual, predicted)
+
+    for column in range(3):
+        pairs = list(zip(actual[:, column], predicted[:, column]))
+        assert counts["tp"][column] == pairs.count((True, True))
+        assert counts["fp"][column] == pairs.count((False, True))
+        assert counts["tn"][column] == pairs.count((False, False))
+        assert counts["fn"][column] == pairs.count((True, False))
+
+
+def test_audit_confusion_matrices_per_field():
+    items = [
+        _item([True, False, True, False, False], [True, False, True, False, False]),
+        _item([True, False, False, True, False], [False, False, False, False, False]),
+        _item([False, False, False, False, False], [True, False, False, True, False]),
+    ]
+
+    matrices = audit_confusion_matrices(items)
+
+    assert {k: matrices["needs_audit"][k] for k in ("tp", "fp", "tn", "fn")} == {"tp": 1, "fp": 1, "tn": 0, "fn": 1}
+    assert matrices["math_error"]["fp"] == 1 and matrices["math_error"]["fn"] == 1
+    assert matrices["not_travel_related"]["tn"] == 3
+    assert audit_confusion_matrices([])["needs_audit"]["total"] == 0
+
+
+def test_cost_rates_are_conditional_on_true_class():
+    """FP rate is over receipts not needing audit and FN rate over those needing one."""
+    summary = summarize_costs_from_eval(
+        {"metrics": {"true_positives": 9, "false_positives": 0, "true_negatives": 10, "false_negatives": 1}},
+        per_receipt_cost=0.2,
+    )
+
+    assert summary["fp_rate"] == 0.0
+    assert summary["fn_rate"] == 0.1
+    assert summary["total_cost"] == calculate_costs(0.0, 0.1, 0.2)
+
+
+def test_summarize_costs_from_records():
+    items = [_item([True] * 5, [True] * 5)] * 3 + [_item([False] * 5, [True] * 5)]
+
+    summary = summarize_costs_from_records(items, per_receipt_cost=0.2)
+
+    assert summary["metrics"] == {"tp": 3, "fp": 1, "tn": 0, "fn": 0}
+    assert summary["fp_rate"] == 1.0
+    assert summary["total_cost"] == calculate_costs(1.0, 0.0, 0.2)
+    assert set(summary["confusion_matrices"]) == set(AUDIT_FIELDS)
@@ -0,0 +1,63 @@
+"""
+Tests for the vectorized cost sweep, bootstrap intervals and Pareto frontier.
+"""
+import numpy as np
+import pytest
+
+from src.utils.cost_calculator import (
+    axis_values,
+    bootstrap_costs,
+    calculate_costs,
+    pareto_frontier,
+    sweep_costs,
+)
+
+
+def test_axis_values():
+    assert axis_values("0.1,0.2").tolist() == [0.1, 0.2]
+    assert axis_values("0:1:5").tolist() == [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def test_sweep_matches_scalar_costs():
+    """Every grid point equals the scalar calculation for its parameters."""
+    sweep = sweep_costs(
+        fp_rate=[0.0, 0.05],
+        fn_rate=[0.01, 0.1, 0.2],
+        per_receipt_cost=[0.003],
+        audit_cost=[2, 4],
+        receipt_count=[1e5, 1e6],
+    )
+
+    assert sweep.costs.shape == (2, 3, 1, 2, 1, 2, 1)
+    assert sweep.costs[1, 2, 0, 1, 0, 0, 0] == pytest.approx(
+        calculate_costs(0.05, 0.2, 0.003, audit_cost=4, receipt_count=1e5)
+    )
+    assert sweep.cheapest() == {
+        "fp_rate": 0.0, "fn_rate": 0.01, "per_receipt_cost": 0.003, "audit_cost": 2.0,
+        "missed_audit_cost": 30.0, "receipt_count": 1e5, "audit_fraction": 0.05,
+        "cost": pytest.approx(calculate_costs(0.0, 0.01, 0.003, receipt_count=1e5)),
+    }
+    with pytest.raises(ValueError):
+        sweep_costs(fp_rate=[0], fn_rate=[0], per_receipt_cost=[0], volume=[1])
+
+
+def test_bootstrap_interval_contains_point_estimate():
+    result = bootstrap_costs(tp=45, fp=20, tn=900, fn=5, per_receipt_cost=0.003, seed=0)
+
+    low, high = result["cost_ci"]
+    assert low < result["cost"] < high
+    assert result["fn_rate"] == 0.1
+    assert result["fn_rate_ci"][0] < 0.1 < result["fn_rate_ci"][1]
+
+
+def test_pareto_frontier_drops_dominated_models():
+    on_frontier = pareto_frontier(
+        per_receipt_cost=[0.003, 0.04, 0.01, 0.003],
+        fp_rate=[0.10, 0.02, 0.12, 0.10],
+        fn_rate=[0.05, 0.05, 0.05, 0.05],
+    )
+
+    # The third model is worse than the first on every axis; the first and
+    # fourth are identical so neither dominates the other
+    assert on_frontier.tolist() == [True, True, False, True]
+    assert np.asarray(calculate_costs(np.array([0.1, 0.2]), 0.0, 0.0)).shape == (2,)
@@ -0,0 +1,90 @@
+"""
+Tests for packed, memory-mapped dataset shards.
+"""
+import asyncio
+import hashlib
+import io
+
+import pytest
+from PIL import Image
+
+from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.prediction_cache import PredictionCache, hash_bytes
+from src.utils.dataset_shards import DatasetShard, build_shards
+from src.utils.image_processing import preprocess_image
+from tests.test_evaluation_pipeline import _record
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Two splits of small JPEGs, with ground truth for the first test image only."""
+    for split, count in (("train", 3), ("test", 2)):
+        (tmp_path / split).mkdir()
+        for i in range(count):
+            output = io.BytesIO()
+            Image.new("RGB", (40 + i, 30), (i * 40, 0, 0)).save(output, format="JPEG")
+            (tmp_path / split / f"{split}_{i}.jpg").write_bytes(output.getvalue())
+    record = _record("test_0.jpg")
+    for kind, value in (("extraction", record.correct_receipt_details), ("audit_results", record.correct_audit_decision)):
+        (tmp_path / "ground_truth" / kind).mkdir(parents=True)
+        (tmp_path / "ground_truth" / kind / "test_0.json").write_text(value.model_dump_json())
+    return tmp_path
+
+
+def test_build_and_read_shards(data_dir, tmp_path):
+    """Payloads are the preprocessed images, addressed by name through the memory map."""
+    indexes = build_shards(data_dir, tmp_path / "shards")
+
+    assert set(indexes) == {"train", "test"}
+    with DatasetShard.open(tmp_path / "shards", "test") as shard:
+        assert shard.names() == ["test_0.jpg", "test_1.jpg"]
+        original = (data_dir / "test" / "test_1.jpg").read_bytes()
+        record = shard["test_1.jpg"]
+        assert bytes(record.payload) == preprocess_image(original)
+        assert record.source_sha256 == hashlib.sha256(original).hexdigest()
+        assert record.ground_truth is None
+        assert shard["test_0.jpg"].ground_truth["audit"]["needs_audit"] is False
+        assert shard.verify() == []
+
+
+def test_truncated_shard_is_rejected(data_dir, tmp_path):
+    build_shards(data_dir, tmp_path / "shards", splits=["train"])
+    payload = tmp_path / "shards" / "train.bin"
+    payload.write_bytes(payload.read_bytes()[:-1])
+
+    with pytest.raises(ValueError):
+        DatasetShard.open(tmp_path / "shards", "train")
+
+
+def test_dataset_from_shard_skips_preprocessing(data_dir, tmp_path, monkeypatch):
+    """Shard records reach the model without preprocessing and share cache keys with image files."""
+    build_shards(data_dir, tmp_path / "shards", splits=["test"])
+    pipeline = EvaluationPipeline(cache=PredictionCache(tmp_path / "cache"))
+    record = _record("x.jpg")
+    sent = []
+
+    async def prepare_image(file_data, filename):
+        raise AssertionError("shard payloads are already preprocessed")
+
+    async def extract_prepared(b64_image, model, profile="full"):
+        sent.append(b64_image)
+        return record.predicted_receipt_details
+
+    async def audit_receipt(receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
+        return record.predicted_audit_decision
+
+    monkeypatch.setattr(pipeline.extraction_service, "_prepare_image", prepare_image)
+    monkeypatch.setattr(pipeline.extraction_service, "extract_prepared", extract_prepared)
+    monkeypatch.setattr(pipeline.audit_service, "audit_receipt", audit_receipt)
+    errors = {}
+
+    with DatasetShard.open(tmp_path / "shards", "test") as shard:
+        dataset = asyncio.run(pipeline.create_dataset_from_shard(
+            shard, on_progress=lambda completed, total, name, error: errors.__setitem__(name, error),
+        ))
+
+    assert [item["item"]["receipt_image_path"] for item in dataset] == ["test_0.jpg"]
+    assert errors["test_1.jpg"].startswith("LookupError")
+    assert len(sent) == 1
+    key = pipeline.cache.extraction_key(hash_bytes((data_dir / "test" / "test_0.jpg").read_bytes()), "gpt-4o-mini")
+    assert pipeline.cache.get("extraction", key, type(record.predicted_receipt_details)) is not None
@@ -0,0 +1,135 @@
+"""
+Tests for the incremental eval run results downloader.
+"""
+import asyncio
+import math
+
+from src.services.eval_results import (
+    EvalResultsCache, columns_to_json, download_run_items, format_grader_summary, grader_columns,
+    summarize_graders,
+)
+
+
+class _Item:
+    def __init__(self, data):
+        self.data = data
+
+    def model_dump(self, mode="python"):
+        return dict(self.data)
+
+
+class _Page:
+    def __init__(self, items, order, limit):
+        self._items = items
+        self._order = order
+        self._limit = limit
+        self.data = [_Item(item) for item in items[:limit]]
+
+    def has_next_page(self):
+        return len(self._items) > self._limit
+
+    async def get_next_page(self):
+        return _Page(self._items[self._limit:], self._order, self._limit)
+
+
+class _FakeClient:
+    """Cursor-paged output items, in creation order, as the evals API serves them."""
+
+    def __init__(self, items, status="completed"):
+        self.items = items
+        self.status = status
+        self.requests = []
+        self.evals = self
+        self.runs = self
+        self.output_items = self
+
+    async def retrieve(self, run_id, eval_id):
+        self.requests.append(("retrieve", None, None))
+        return type("Run", (), {"status": self.status})
+
+    async def list(self, run_id, eval_id, order, limit, after=None):
+        items = self.items if order == "asc" else self.items[::-1]
+        if after:
+            items = items[[item["id"] for item in items].index(after) + 1:]
+        self.requests.append(("list", order, after))
+        page = _Page(items, order, limit)
+        original = page.get_next_page
+
+        async def get_next_page():
+            self.requests.append(("list", order, "next"))
+            return await original()
+
+        page.get_next_page = get_next_page
+        return page
+
+
+def _output_item(i, passed=True):
+    return {
+        "id": f"outputitem_{i:03d}",
+        "datasource_item_id": i,
+        "datasource_item": {"receipt_image_path": f"receipt_{i}.jpg"},
+        "status": "pass" if passed else "fail",
+        "results": [
+            {"name": "Merchant", "passed": passed, "score": 1.0 if passed else 0.0},
+            {"name": "Total", "passed": True, "score": 0.5 + i / 100},
+        ],
+    }
+
+
+def test_download_caches_items_and_refetches_only_new_ones(tmp_path):
+    """Both walkers cover the run once; later runs page only as far as the newest cached item."""
+    cache = EvalResultsCache(tmp_path)
+    client = _FakeClient([_output_item(i) for i in range(23)], status="in_progress")
+
+    run = asyncio.run(download_run_items("eval_1", "run_1", client=client, cache=cache, page_size=5))
+    assert [item["datasource_item_id"] for item in run.items] == list(range(23))
+    assert run.fetched == 23
+    # Forward and backward walkers meet in the middle instead of one walking all 5 pages
+    assert run.requests - 1 <= 5 + 1
+    assert len(cache.load_items("run_1")) == 23
+
+    client.items.extend(_output_item(i) for i in range(23, 26))
+    client.status = "completed"
+    client.requests.clear()
+    run = asyncio.run(download_run_items("eval_1", "run_1", client=client, cache=cache, page_size=5))
+    assert run.fetched == 3
+    assert len(run.items) == 26
+    assert client.requests == [("retrieve", None, None), ("list", "desc", None)]
+
+    # Finished and fully cached: no requests at all
+    client.requests.clear()
+    run = asyncio.run(download_run_items("eval_1", "run_1", client=client, cache=cache, page_size=5))
+    assert (run.fetched, run.requests, len(run.items)) == (0, 0, 26)
+    assert client.requests == []
+
+
+def test_interrupted_download_resumes_forward_walk(tmp_path):
+    """A download stopped partway continues after the last forward page it saved."""
+    cache = EvalResultsCache(tmp_path)
+    items = [_output_item(i) for i in range(12)]
+    cache.append_items("run_1", items[:4])
+    cache.save_manifest("run_1", {"forward_after": items[3]["id"], "complete": False, "run_status": None})
+
+    client = _FakeClient(items)
+    run = asyncio.run(download_run_items("eval_1", "run_1", client=client, cache=cache, page_size=3))
+    assert [item["id"] for item in run.items] == [item["id"] for item in items]
+    assert run.fetched == 8
+    assert ("list", "asc", items[3]["id"]) in client.requests
+    assert cache.load_manifest("run_1")["complete"]
+
+
+def test_grader_columns_and_summary():
+    items = [_output_item(0), _output_item(1, passed=False), _output_item(2)]
+    del items[2]["results"][1]
+    columns = grader_columns(items)
+    assert columns["datasource_item_id"] == [0, 1, 2]
+    assert list(columns["graders"]["Merchant"]["passed"]) == [1.0, 0.0, 1.0]
+    assert math.isnan(columns["graders"]["Total"]["score"][2])
+
+    summary = {row["name"]: row for row in summarize_graders(columns)}
+    assert summary["Merchant"]["count"] == 3
+    assert math.isclose(summary["Merchant"]["pass_rate"], 2 / 3)
+    assert summary["Total"]["count"] == 2
+    assert math.isclose(summary["Total"]["mean_score"], 0.505)
+    assert columns_to_json(columns)["graders"]["Total"]["score"][2] is None
+    assert "Merchant" in format_grader_summary(summarize_graders(columns))
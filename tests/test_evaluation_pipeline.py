@@ -0,0 +1,246 @@
+"""
+Tests for evaluation dataset generation.
+"""
+import asyncio
+
+import pytest
+
+from src.models.audit import AuditDecision, EvaluationRecord
+from src.models.receipt import Location, ReceiptDetails
+from src.services.evaluation_pipeline import DatasetWriter, EvaluationPipeline, load_checkpoint
+
+
+def _record(name: str) -> EvaluationRecord:
+    receipt = ReceiptDetails(
+        merchant="Test Store",
+        location=Location(city=None, state=None, zipcode=None),
+        time=None,
+        items=[],
+        subtotal=None,
+        tax=None,
+        total="1.00",
+        handwritten_notes=[],
+    )
+    decision = AuditDecision(
+        not_travel_related=False,
+        amount_over_limit=False,
+        math_error=False,
+        handwritten_x=False,
+        reasoning="ok",
+        needs_audit=False,
+    )
+    return EvaluationRecord(
+        receipt_image_path=name,
+        correct_receipt_details=receipt,
+        predicted_receipt_details=receipt,
+        correct_audit_decision=decision,
+        predicted_audit_decision=decision,
+    )
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    directory = tmp_path / "images"
+    directory.mkdir()
+    for i in range(6):
+        (directory / f"receipt_{i}.jpg").write_bytes(b"")
+    return directory
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Pipeline whose records are built without model calls, tracking concurrency."""
+    pipeline = EvaluationPipeline()
+    pipeline.in_flight = pipeline.max_in_flight = 0
+    pipeline.calls = []
+    pipeline.failing = set()
+
+    async def create_evaluation_record(image_path, ground_truth_dir, model="gpt-4o-mini"):
+        pipeline.calls.append(image_path.name)
+        pipeline.in_flight += 1
+        pipeline.max_in_flight = max(pipeline.max_in_flight, pipeline.in_flight)
+        await asyncio.sleep(0.01)
+        pipeline.in_flight -= 1
+        if image_path.name in pipeline.failing:
+            raise RuntimeError("rate limited")
+        return _record(image_path.name)
+
+    monkeypatch.setattr(pipeline, "create_evaluation_record", create_evaluation_record)
+    return pipeline
+
+
+def test_concurrency_limit_and_checkpoint(pipeline, image_dir, tmp_path):
+    """Records are processed under the limit and appended to the checkpoint."""
+    checkpoint = tmp_path / "run.jsonl"
+    dataset = asyncio.run(pipeline.create_dataset_content(
+        image_dir, tmp_path, concurrency=2, checkpoint_path=checkpoint
+    ))
+
+    assert pipeline.max_in_flight == 2
+    assert [item["item"]["receipt_image_path"] for item in dataset] == [f"receipt_{i}.jpg" for i in range(6)]
+    assert set(load_checkpoint(checkpoint)) == {f"receipt_{i}.jpg" for i in range(6)}
+
+
+def test_failures_are_kept_out_and_retried_on_resume(pipeline, image_dir, tmp_path):
+    """A failing image doesn't lose the others, and resume only reruns what's missing."""
+    checkpoint = tmp_path / "run.jsonl"
+    progress = []
+    pipeline.failing = {"receipt_3.jpg"}
+    dataset = asyncio.run(pipeline.create_dataset_content(
+        image_dir, tmp_path, checkpoint_path=checkpoint,
+        on_progress=lambda *args: progress.append(args)
+    ))
+
+    assert len(dataset) == 5
+    assert [args[3] for args in progress if args[2] == "receipt_3.jpg"] == ["RuntimeError: rate limited"]
+    assert progress[-1][:2] == (6, 6)
+
+    # An interrupted write leaves a partial last line, which resume ignores
+    with open(checkpoint, "a") as f:
+        f.write('{"item": {"receipt_image')
+    pipeline.failing = set()
+    pipeline.calls = []
+    dataset = asyncio.run(pipeline.create_dataset_content(
+        image_dir, tmp_path, checkpoint_path=checkpoint, resume=True
+    ))
+
+    assert pipeline.calls == ["receipt_3.jpg"]
+    assert len(dataset) == 6
+    assert len(load_checkpoint(checkpoint)) == 6
+
+
+def test_stream_records_bounds_in_flight_and_yields_as_completed(pipeline):
+    """Records stream out in completion order with at most ``concurrency`` started."""
+    started = []
+
+    async def create_record(name):
+        started.append(name)
+        pipeline.in_flight += 1
+        pipeline.max_in_flight = max(pipeline.max_in_flight, pipeline.in_flight)
+        await asyncio.sleep(0.05 if name == "slow" else 0.01)
+        pipeline.in_flight -= 1
+        if name == "bad":
+            raise ValueError("no ground truth")
+        return _record(name)
+
+    def names():
+        yield from ["slow", "a", "b", "bad", "c"]
+
+    async def run():
+        return [result async for result in pipeline.stream_records(names(), create_record, concurrency=2)]
+
+    results = asyncio.run(run())
+
+    assert pipeline.max_in_flight == 2
+    assert [result.name for result in results][-1] == "slow"
+    assert {result.name: result.error for result in results}["bad"] == "ValueError: no ground truth"
+    assert sum(result.record is not None for result in results) == 4
+
+
+def test_dataset_writer_batches_and_resumes(tmp_path):
+    """Items reach the file per batch, and resume keeps complete lines only."""
+    path = tmp_path / "dataset.jsonl"
+    with DatasetWriter(path, batch_size=2) as writer:
+        writer.write({"item": _record("a.jpg").model_dump()})
+        assert path.read_text() == ""
+        writer.write({"item": _record("b.jpg").model_dump()})
+        assert len(path.read_text().splitlines()) == 2
+        writer.write({"item": _record("c.jpg").model_dump()})
+    assert writer.written == 3
+
+    with open(path, "a") as f:
+        f.write('{"item": {"receipt_image')
+    with DatasetWriter(path, resume=True) as writer:
+        assert writer.completed == {"a.jpg", "b.jpg", "c.jpg"}
+        writer.write({"item": _record("d.jpg").model_dump()})
+    assert list(load_checkpoint(path)) == ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+    assert len(path.read_text().splitlines()) == 4
+
+    with DatasetWriter(path) as writer:
+        assert not writer.completed
+    assert path.read_text() == ""
+
+
+def test_audit_only_uses_ground_truth_extractions(monkeypatch):
+    """Audit-only records audit the ground truth extraction and never call extraction."""
+    from pathlib import Path
+
+    from src.services.cost_analysis import audit_confusion_matrices
+
+    pipeline = EvaluationPipeline()
+    audited = []
+
+    async def fail_extraction(*args, **kwargs):
+        raise AssertionError("extraction must not run")
+
+    async def audit(receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
+        audited.append(receipt_details)
+        return AuditDecision(
+            not_travel_related=False,
+            amount_over_limit=False,
+            math_error=False,
+            handwritten_x=False,
+            reasoning="ok",
+            needs_audit=False,
+        )
+
+    monkeypatch.setattr(pipeline.extraction_service, "extract_receipt_details", fail_extraction)
+    monkeypatch.setattr(pipeline.audit_service, "audit_receipt", audit)
+
+    data_dir = Path(__file__).parent.parent / "scripts" / "data"
+    if not (data_dir / "test").exists():
+        pytest.skip("Test data not available")
+    records = asyncio.run(pipeline.create_audit_only_records(
+        data_dir / "test", data_dir / "ground_truth", concurrency=4
+    ))
+
+    assert len(records) == len(list((data_dir / "test").glob("*.jpg")))
+    assert all(r.predicted_receipt_details == r.correct_receipt_details for r in records)
+    assert len(audited) == len(records)
+
+    matrices = audit_confusion_matrices(records)
+    needs_audit = matrices["needs_audit"]
+    positives = sum(r.correct_audit_decision.needs_audit for r in records)
+    assert (needs_audit["tp"], needs_audit["fp"], needs_audit["fn"]) == (0, 0, positives)
+    assert needs_audit["tn"] == len(records) - positives
+
+
+def test_audit_only_prompt_never_contains_the_receipt_under_evaluation(monkeypatch):
+    """Even with the eval ground truth as the example bank, no audit sees its own pair."""
+    from pathlib import Path
+
+    from src.core.config import settings
+    from src.services.example_bank import format_example, get_example_bank
+
+    data_dir = Path(__file__).parent.parent / "scripts" / "data"
+    if not (data_dir / "test").exists():
+        pytest.skip("Test data not available")
+    ground_truth_dir = data_dir / "ground_truth"
+
+    prompts = {}
+
+    def get_agent(name, prompt, model, output_type):
+        return prompt
+
+    async def run_agent(prompt, input_message):
+        prompts[input_message] = prompt
+        raise RuntimeError("no model calls in tests")
+
+    monkeypatch.setattr(settings, "AUDIT_EXAMPLE_RETRIEVAL", True)
+    monkeypatch.setattr(settings, "AUDIT_EXAMPLE_BANK_DIR", str(ground_truth_dir))
+    monkeypatch.setattr("src.services.audit.get_agent", get_agent)
+    monkeypatch.setattr("src.services.audit.run_agent", run_agent)
+    get_example_bank.cache_clear()
+    try:
+        records = asyncio.run(EvaluationPipeline().create_audit_only_records(
+            data_dir / "test", ground_truth_dir, concurrency=4
+        ))
+    finally:
+        get_example_bank.cache_clear()
+
+    assert records and len(prompts) == len(records)
+    for record in records:
+        receipt = record.correct_receipt_details
+        prompt = prompts[f"Audit this receipt data:\n\n{receipt.model_dump_json(indent=2)}"]
+        assert receipt.model_dump_json() not in prompt
+        assert format_example(receipt, record.correct_audit_decision) not in prompt
@@ -0,0 +1,40 @@
+"""
+Tests for the preprocessing microbenchmark.
+"""
+import io
+
+from PIL import Image
+
+from src.utils.image_benchmark import PreprocessVariant, format_table, run_image_benchmark
+from src.utils.tokens import estimate_image_tokens
+
+
+def test_estimate_image_tokens():
+    """Image tokens follow the 512px tiling rule."""
+    assert estimate_image_tokens(1024, 1024) == 765
+    assert estimate_image_tokens(2048, 4096) == 1105
+    assert estimate_image_tokens(4000, 3000, detail="low") == 85
+
+
+def test_image_benchmark_reports_each_path(tmp_path):
+    """Every path is measured per image with output size and tokens."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (3000, 1500), color="white").save(buffer, format="JPEG")
+    (tmp_path / "receipt.jpg").write_bytes(buffer.getvalue())
+
+    variants = [
+        PreprocessVariant("jpeg_q60_1024px", max_dimension=1024, quality=60),
+        PreprocessVariant("grayscale", grayscale=True),
+    ]
+    results = run_image_benchmark([tmp_path], variants=variants)
+
+    summary = results["summary"]
+    assert set(summary) == {
+        "original", "optimize_image_for_ocr", "preprocess_image", "process_pipeline",
+        "jpeg_q60_1024px", "grayscale", "process_pdf_to_images",
+    }
+    assert summary["jpeg_q60_1024px"]["max_dimension"] == 1024
+    assert summary["optimize_image_for_ocr"]["max_dimension"] == 2048
+    assert summary["jpeg_q60_1024px"]["mean_vision_tokens"] < summary["original"]["mean_vision_tokens"]
+    assert len(results["measurements"]) == 7
+    assert "jpeg_q60_1024px" in format_table(summary)
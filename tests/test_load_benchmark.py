@@ -0,0 +1,56 @@
+"""
+Tests for the /process load benchmark.
+"""
+import asyncio
+import io
+
+from PIL import Image
+
+from src.utils.load_benchmark import BenchmarkConfig, compare_results, run_benchmark
+from src.utils.stats import percentile
+from src.utils.stub_provider import StubConfig
+
+
+def test_percentile_nearest_rank():
+    """Percentiles use the nearest-rank definition."""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def test_benchmark_runs_against_stub(tmp_path):
+    """A small run reports throughput, stage latencies and resource usage."""
+    for i in range(2):
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 300), color="white").save(buffer, format="JPEG")
+        (tmp_path / f"receipt_{i}.jpg").write_bytes(buffer.getvalue())
+
+    config = BenchmarkConfig(
+        image_dirs=[tmp_path],
+        requests=4,
+        concurrency=2,
+        warmup_requests=0,
+        extraction_profile="full",
+        stub=StubConfig(latency_median_ms=0, seed=0),
+    )
+    results = asyncio.run(run_benchmark(config))
+
+    assert results["requests"] == 4
+    assert results["failures"] == 0
+    assert results["throughput_rps"] > 0
+    assert results["latency_ms"]["extraction"]["count"] == 4
+    assert results["model_calls"] == {"ReceiptDetails": 4, "AuditDecision": 4}
+    assert results["config"]["stub_in_process"]
+
+
+def test_compare_results_flags_regressions():
+    """Throughput drops and latency increases beyond tolerance are reported."""
+    baseline = {"throughput_rps": 100.0, "latency_ms": {"total": {"p50": 10.0, "p95": 20.0}}}
+    current = {"throughput_rps": 80.0, "latency_ms": {"total": {"p50": 10.5, "p95": 30.0}}}
+
+    regressions = compare_results(current, baseline, tolerance=0.10)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("throughput_rps")
+    assert regressions[1].startswith("latency_ms.total.p95")
@@ -0,0 +1,53 @@
+"""
+Tests for the local grader engine.
+"""
+from src.utils.graders import get_all_graders
+from src.utils.local_graders import bleu, fuzzy_match, render_column, run_local_graders
+
+
+def _item(merchant, predicted_merchant, total="10.00", predicted_total="10.00", notes=(), predicted_notes=()):
+    return {"item": {
+        "correct_receipt_details": {"merchant": merchant, "total": total, "handwritten_notes": list(notes)},
+        "predicted_receipt_details": {
+            "merchant": predicted_merchant, "total": predicted_total, "handwritten_notes": list(predicted_notes),
+        },
+        "correct_audit_decision": {"needs_audit": True},
+        "predicted_audit_decision": {"needs_audit": False},
+    }}
+
+
+def test_render_column_formats_values():
+    """Templates render nulls as empty, booleans as JSON and allow surrounding text."""
+    contexts = [_item("Costco", None), _item("Shell", "Shell")]
+
+    assert list(render_column("{{ item.predicted_receipt_details.merchant }}", contexts)) == ["", "Shell"]
+    assert list(render_column("{{item.correct_audit_decision.needs_audit}}", contexts)) == ["true", "true"]
+    assert list(render_column("at {{ item.correct_receipt_details.merchant }}!", contexts)) == ["at Costco!", "at Shell!"]
+    assert list(render_column("{{ item.missing.field }}", contexts)) == ["", ""]
+
+
+def test_similarity_metrics():
+    assert bleu("Costco", "Costco") == 1.0
+    assert bleu("Costco Wholesale", "Costco") == 0.5
+    assert bleu("Shell", "Costco") == 0.0
+    assert fuzzy_match("558 653", "558653") > 0.9
+    assert fuzzy_match("", "") == 1.0
+
+
+def test_run_local_graders_pass_rates_and_skips():
+    """Deterministic graders are scored per record; model graders are skipped."""
+    items = [
+        _item("Costco", "Costco", notes=["Tundra"], predicted_notes=["Tundra"]),
+        _item("Costco", "Costco Wholesale", predicted_total="11.00"),
+        _item("Shell", "Shell", notes=["558653"], predicted_notes=["558 653"]),
+    ]
+
+    results = {result.name: result for result in run_local_graders(get_all_graders(), items)}
+
+    assert results["Total Amount Accuracy"].passed.tolist() == [True, False, True]
+    assert results["Merchant Name Accuracy"].passed.tolist() == [True, False, True]
+    assert results["Handwritten Notes Accuracy"].pass_rate == 1.0
+    assert results["Needs Audit Accuracy"].pass_rate == 0.0
+    assert results["Missed Line Items"].skipped
+    assert results["Audit Reasoning Quality"].as_dict()["skipped"]
+    assert results["Total Amount Accuracy"].as_dict()["passed"] == 2
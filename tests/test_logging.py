@@ -0,0 +1,66 @@
+"""
+Tests for structured, non-blocking logging.
+"""
+import json
+import logging
+import queue
+
+from src.core.logging import (
+    ContextFilter,
+    JsonFormatter,
+    LevelSamplingFilter,
+    NonBlockingQueueHandler,
+    request_id_var,
+)
+from src.core.metrics import stage_timer
+
+
+def _record(level=logging.INFO, msg="Receipt %s", args=("r1",), **extra):
+    record = logging.LogRecord("src.test", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_records_carry_request_and_stage_context():
+    """Records are tagged with the request ID and the enclosing stage."""
+    token = request_id_var.set("req-123")
+    try:
+        with stage_timer("audit"):
+            record = _record(model="gpt-4o-mini")
+            ContextFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Receipt r1"
+    assert entry["request_id"] == "req-123"
+    assert entry["stage"] == "audit"
+    assert entry["model"] == "gpt-4o-mini"
+    assert entry["level"] == "INFO"
+
+
+def test_level_sampling_keeps_unlisted_levels():
+    """Sampled levels are dropped at rate 0; other levels always pass."""
+    sampler = LevelSamplingFilter({"DEBUG": 0.0})
+    assert not sampler.filter(_record(level=logging.DEBUG))
+    assert sampler.filter(_record(level=logging.WARNING))
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    """A full queue drops records and counts them."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().msg == "Receipt r1"
+
+
+def test_request_id_header(client):
+    """Responses carry a generated or propagated X-Request-ID."""
+    generated = client.get("/api/v1/health/")
+    assert len(generated.headers["x-request-id"]) == 32
+
+    propagated = client.get("/api/v1/health/", headers={"X-Request-ID": "lb-42"})
+    assert propagated.headers["x-request-id"] == "lb-42"
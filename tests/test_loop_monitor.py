@@ -0,0 +1,126 @@
+"""
+Tests for the event-loop lag monitor and the readiness report.
+"""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from src.core import provider
+from src.core.config import settings
+from src.core.loop_monitor import LoopMonitor
+from src.main import app
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_monitor_samples_blocking_stack():
+    """A stall beyond the threshold is recorded with the blocking function's stack."""
+    async def run():
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    snapshot = monitor.snapshot()
+
+    assert snapshot["blocked_count"] == 1
+    sample = snapshot["recent_blocks"][0]
+    assert any("_block_the_loop" in frame for frame in sample["stack"])
+    assert sample["blocked_ms"] >= 250
+    assert snapshot["lag_ms"]["max"] >= 250
+
+
+async def _fake_probe(client=None):
+    _fake_probe.calls += 1
+    return {"status": "reachable", "latency_ms": 1.0, "checked_at": "now"}
+
+
+def test_provider_probe_is_cached(monkeypatch):
+    """Repeated readiness checks within the TTL share one provider probe."""
+    _fake_probe.calls = 0
+    monkeypatch.setattr(provider, "_run_probe", _fake_probe)
+    monkeypatch.setattr(provider, "_probe_result", None)
+
+    async def run():
+        return await asyncio.gather(*(provider.probe_provider() for _ in range(5)))
+
+    results = asyncio.run(run())
+    asyncio.run(provider.probe_provider())
+
+    assert _fake_probe.calls == 1
+    assert all(result["status"] == "reachable" for result in results)
+
+
+def test_cached_probe_refreshes_in_background(monkeypatch):
+    """Readiness serves the last result at once and refreshes stale ones with the pooled client."""
+    pooled = object()
+    clients = []
+    release = None
+
+    async def slow_probe(client=None):
+        clients.append(client)
+        await release.wait()
+        return {"status": "reachable", "latency_ms": 1.0, "checked_at": f"probe {len(clients)}"}
+
+    monkeypatch.setattr(provider, "_run_probe", slow_probe)
+    monkeypatch.setattr(provider, "_probe_result", None)
+    monkeypatch.setattr(provider, "_refresh_task", None)
+    monkeypatch.setattr(provider, "get_openai_client", lambda: pooled)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first = provider.cached_probe()
+        await asyncio.sleep(0)
+        second = provider.cached_probe()
+        release.set()
+        await provider._refresh_task
+        fresh = provider.cached_probe()
+
+        # Past the TTL the stale result is still served while a refresh runs
+        monkeypatch.setattr(provider, "_probe_checked", time.monotonic() - settings.PROVIDER_PROBE_TTL_S - 1)
+        release = asyncio.Event()
+        stale = provider.cached_probe()
+        release.set()
+        await provider._refresh_task
+        return first, second, fresh, stale, provider.cached_probe()
+
+    first, second, fresh, stale, refreshed = asyncio.run(run())
+
+    assert first["status"] == second["status"] == "pending"
+    assert fresh["checked_at"] == stale["checked_at"] == "probe 1"
+    assert refreshed["checked_at"] == "probe 2"
+    assert clients == [pooled, pooled]
+
+
+def test_readiness_reports_lag_and_executor(monkeypatch):
+    """Readiness includes loop lag percentiles and fails when the executor queue is over the limit."""
+    _fake_probe.calls = 0
+    monkeypatch.setattr(provider, "_run_probe", _fake_probe)
+    monkeypatch.setattr(provider, "_probe_result", None)
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", False)
+
+    with TestClient(app) as client:
+        time.sleep(0.2)
+        # The first check starts the provider probe in the background
+        client.get("/api/v1/health/ready")
+        time.sleep(0.1)
+        response = client.get("/api/v1/health/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["services"]["openai"]["status"] == "reachable"
+        assert data["event_loop"]["lag_ms"]["count"] > 0
+        assert data["executor"]["workers"] == settings.IMAGE_WORKERS
+
+        monkeypatch.setattr(settings, "READY_MAX_EXECUTOR_QUEUE", -1)
+        response = client.get("/api/v1/health/ready")
+        assert response.status_code == 503
+        assert response.json()["problems"] == ["executor_queue"]
@@ -0,0 +1,101 @@
+"""
+Tests for the Prometheus metrics registry and endpoint.
+"""
+import asyncio
+import io
+
+from PIL import Image
+
+from src.core import executor
+from src.core.config import settings
+from src.core.metrics import (
+    ERRORS, FALLBACKS, MODEL_TOKENS, Counter, Histogram, Registry, STAGE_DURATION, record_error, record_fallback,
+    record_usage,
+)
+from src.core.timing import RequestTimings, current_timings
+from src.utils.cost_calculator import estimate_model_cost
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Histogram buckets are cumulative and end with +Inf, _sum and _count."""
+    registry = Registry()
+    histogram = registry.register(Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("test_total", "Test", ("reason",)))
+
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+    counter.inc('with "quotes"')
+
+    text = registry.render()
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a"} 3' in text
+    assert 'test_total{reason="with \\"quotes\\""} 1.0' in text
+
+
+def test_metrics_endpoint_reports_process_stages(client, mock_openai_response):
+    """A /process request records upload, validation and optimize stages by endpoint."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (10, 10), color="white").save(buffer, format="JPEG")
+    endpoint = "/api/v1/receipts/process"
+    before = STAGE_DURATION.count("upload_read", "", endpoint)
+
+    response = client.post(endpoint, files={"file": ("r.jpg", buffer.getvalue(), "image/jpeg")})
+    assert response.status_code == 200
+
+    assert STAGE_DURATION.count("upload_read", "", endpoint) == before + 1
+    assert STAGE_DURATION.count("optimize", "", endpoint) >= 1
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert 'receipt_stage_duration_seconds_count{stage="validation",model="",endpoint="/api/v1/receipts/process"}' in metrics.text
+    assert "receipt_requests_in_flight" in metrics.text
+    assert "receipt_executor_queue_depth 0" in metrics.text
+
+
+def test_disabled_metrics_skip_counters_but_keep_request_tokens(monkeypatch):
+    """With METRICS_ENABLED off nothing is counted, but per-request token usage is still recorded."""
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    usage = type("Usage", (), {"input_tokens": 100, "output_tokens": 20})
+    result = type("Result", (), {"context_wrapper": type("Wrapper", (), {"usage": usage})})
+    before = (
+        ERRORS.value("test_stage", "m"),
+        FALLBACKS.value("test_component", "r"),
+        MODEL_TOKENS.value("test_stage", "m", "input"),
+    )
+
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        record_error("test_stage", "m")
+        record_fallback("test_component", "r")
+        record_usage("test_stage", "m", result)
+    finally:
+        current_timings.reset(token)
+
+    assert (
+        ERRORS.value("test_stage", "m"),
+        FALLBACKS.value("test_component", "r"),
+        MODEL_TOKENS.value("test_stage", "m", "input"),
+    ) == before
+    assert timings.metadata == {"input_tokens": 100, "output_tokens": 20}
+
+
+def test_run_blocking_tracks_queue_depth():
+    """Executor counters return to zero once jobs finish."""
+    async def run():
+        results = await asyncio.gather(*(executor.run_blocking(pow, 2, i) for i in range(20)))
+        return results
+
+    assert asyncio.run(run()) == [2 ** i for i in range(20)]
+    assert executor.queue_depth() == 0
+    assert executor.active_jobs() == 0
+
+
+def test_estimate_model_cost_uses_longest_prefix():
+    """Model prices match the most specific prefix; unknown models cost zero."""
+    assert estimate_model_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == 0.15
+    assert estimate_model_cost("gpt-4o", 0, 1_000_000) == 10.0
+    assert estimate_model_cost("custom-model", 1000, 1000) == 0.0
@@ -0,0 +1,106 @@
+"""
+Tests for concurrent multi-model comparison.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.core.timing import add_tokens
+from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.model_comparison import RateLimiter, compare_models, format_comparison
+from tests.test_evaluation_pipeline import _record
+
+
+def _ground_truth(tmp_path, count):
+    image_dir = tmp_path / "images"
+    gt_dir = tmp_path / "ground_truth"
+    for directory in (image_dir, gt_dir / "extraction", gt_dir / "audit_results"):
+        directory.mkdir(parents=True)
+    for i in range(count):
+        record = _record(f"receipt_{i}.jpg")
+        (image_dir / f"receipt_{i}.jpg").write_bytes(f"image {i}".encode())
+        (gt_dir / "extraction" / f"receipt_{i}.json").write_text(record.correct_receipt_details.model_dump_json())
+        (gt_dir / "audit_results" / f"receipt_{i}.json").write_text(record.correct_audit_decision.model_dump_json())
+    return image_dir, gt_dir
+
+
+def test_models_share_preprocessing_and_run_concurrently(tmp_path, monkeypatch):
+    """Each image is prepared once, every model sees it, and models overlap in time."""
+    image_dir, gt_dir = _ground_truth(tmp_path, 4)
+    pipeline = EvaluationPipeline()
+    prepared, extracted = [], []
+    record = _record("x.jpg")
+
+    async def prepare_image(image_data, filename):
+        prepared.append(filename)
+        await asyncio.sleep(0.05)
+        return "b64"
+
+    async def extract_prepared(b64_image, model, profile="full"):
+        extracted.append((model, b64_image))
+        add_tokens(100 if model == "slow" else 10, 5)
+        await asyncio.sleep(0.1 if model == "slow" else 0.01)
+        return record.predicted_receipt_details
+
+    async def audit_receipt(receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
+        if model == "broken":
+            raise RuntimeError("rate limited")
+        return record.predicted_audit_decision
+
+    monkeypatch.setattr(pipeline.extraction_service, "_prepare_image", prepare_image)
+    monkeypatch.setattr(pipeline.extraction_service, "extract_prepared", extract_prepared)
+    monkeypatch.setattr(pipeline.audit_service, "audit_receipt", audit_receipt)
+    errors = []
+
+    start = time.perf_counter()
+    runs = asyncio.run(compare_models(
+        pipeline, image_dir, gt_dir, ["slow", "fast", "broken"], concurrency=4,
+        on_progress=lambda completed, total, name, error: errors.append(error),
+    ))
+    elapsed = time.perf_counter() - start
+
+    assert sorted(prepared) == [f"receipt_{i}.jpg" for i in range(4)]
+    assert len(extracted) == 12
+    assert elapsed < 0.35
+    assert len(runs["slow"].items) == len(runs["fast"].items) == 4
+    assert runs["slow"].input_tokens == 400 and runs["fast"].input_tokens == 40
+    assert len(runs["broken"].errors) == 4 and not runs["broken"].items
+    assert all("broken: RuntimeError" in error for error in errors)
+
+    summaries = [run.summary() for run in runs.values()]
+    assert summaries[0]["audit_accuracy"] == 1.0
+    assert summaries[0]["latency_ms"]["p50"] >= 100
+    # Waiting for the shared preprocessing is reported apart from model latency
+    assert summaries[1]["latency_ms"]["p50"] < 50
+    assert summaries[1]["preprocess_ms"]["count"] == 4 and summaries[1]["preprocess_ms"]["p50"] >= 50
+    assert "fast" in format_comparison(summaries)
+
+
+def test_rate_limiter_spaces_starts(monkeypatch):
+    """Each start reserves the next slot one interval later, whatever the scheduler does."""
+    from types import SimpleNamespace
+
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    # A frozen clock: every waiter sees the same "now", so only the reservations space them
+    monkeypatch.setattr("src.services.model_comparison.time", SimpleNamespace(monotonic=lambda: 100.0))
+    monkeypatch.setattr("src.services.model_comparison.asyncio.sleep", sleep)
+
+    async def run():
+        limiter = RateLimiter(max_concurrent=10, per_minute=1200)
+
+        async def call():
+            async with limiter:
+                pass
+
+        await asyncio.gather(*(call() for _ in range(4)))
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter._interval == pytest.approx(0.05)
+    assert sorted(sleeps) == pytest.approx([0.05, 0.10, 0.15])
+    assert limiter._next_start == pytest.approx(100.0 + 4 * 0.05)
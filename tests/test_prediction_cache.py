@@ -0,0 +1,118 @@
+"""
+Tests for the evaluation prediction cache.
+"""
+import asyncio
+
+import pytest
+
+from src.models.audit import AuditDecision
+from src.models.receipt import Location, ReceiptDetails
+from src.services.evaluation_pipeline import EvaluationPipeline
+from src.services.prediction_cache import PredictionCache, _audit_prompt_hash, audit_prompt_hash
+
+
+def _receipt(total="11.00") -> ReceiptDetails:
+    return ReceiptDetails(
+        merchant="Test Store",
+        location=Location(city="Test City", state="CA", zipcode="12345"),
+        time=None,
+        items=[],
+        subtotal=None,
+        tax=None,
+        total=total,
+        handwritten_notes=[],
+    )
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """Pipeline with a temporary cache and services that count their calls."""
+    monkeypatch.setattr("src.core.config.settings.AUDIT_EXAMPLE_RETRIEVAL", False)
+    pipeline = EvaluationPipeline(cache=PredictionCache(tmp_path / "cache"))
+    pipeline.calls = {"extraction": 0, "audit": 0}
+    pipeline.extraction_result = _receipt()
+
+    async def extract(image_data, filename, model="gpt-4o-mini", profile="full"):
+        pipeline.calls["extraction"] += 1
+        return pipeline.extraction_result
+
+    async def audit(receipt_details, model="gpt-4o-mini", reasoning_mode=None, exclude_examples=None):
+        pipeline.calls["audit"] += 1
+        return AuditDecision(
+            not_travel_related=False,
+            amount_over_limit=False,
+            math_error=False,
+            handwritten_x=False,
+            reasoning="ok",
+            needs_audit=False,
+        )
+
+    monkeypatch.setattr(pipeline.extraction_service, "extract_receipt_details", extract)
+    monkeypatch.setattr(pipeline.audit_service, "audit_receipt", audit)
+    return pipeline
+
+
+def _predict(pipeline, image=b"image-1", model="gpt-4o-mini"):
+    async def run():
+        details = await pipeline.predict_extraction(image, "receipt.jpg", model)
+        return details, await pipeline.predict_audit(details, model)
+    return asyncio.run(run())
+
+
+def test_unchanged_predictions_are_reused(pipeline):
+    """A second pass over the same image, model and prompts makes no model calls."""
+    first = _predict(pipeline)
+    second = _predict(pipeline)
+
+    assert first == second
+    assert pipeline.calls == {"extraction": 1, "audit": 1}
+    _predict(pipeline, image=b"image-2")
+    _predict(pipeline, model="gpt-4o")
+    assert pipeline.calls == {"extraction": 3, "audit": 2}
+
+
+def test_audit_prompt_change_only_recomputes_audits(pipeline, monkeypatch):
+    """Changing the audit prompt keeps cached extractions."""
+    _predict(pipeline)
+    monkeypatch.setattr("src.prompts.audit_prompts.AUDIT_PROMPT_IMPROVED", "New prompt {examples}")
+    # The prompt hash is computed once per process; a prompt edit means a restart
+    _audit_prompt_hash.cache_clear()
+    try:
+        _predict(pipeline)
+    finally:
+        _audit_prompt_hash.cache_clear()
+
+    assert pipeline.calls == {"extraction": 1, "audit": 2}
+
+
+def test_audit_prompt_hash_differs_per_reasoning_mode(pipeline):
+    """Terse and verbose audits use different schemas, so they never share cache keys."""
+    assert audit_prompt_hash("terse") != audit_prompt_hash("verbose")
+    assert audit_prompt_hash("terse") == audit_prompt_hash("terse")
+
+
+def test_refresh_stage(pipeline):
+    """Refreshing extraction recomputes it; an unchanged result still hits the audit cache."""
+    _predict(pipeline)
+    pipeline.cache.refresh = {"extraction"}
+    _predict(pipeline)
+
+    assert pipeline.calls == {"extraction": 2, "audit": 1}
+
+
+def test_fallback_extraction_is_not_cached(pipeline):
+    """The empty receipt from a failed call is retried on the next run."""
+    pipeline.extraction_result = ReceiptDetails(
+        merchant=None,
+        location=Location(city=None, state=None, zipcode=None),
+        time=None,
+        items=[],
+        subtotal=None,
+        tax=None,
+        total=None,
+        handwritten_notes=[],
+    )
+    _predict(pipeline)
+    _predict(pipeline)
+
+    assert pipeline.calls["extraction"] == 2
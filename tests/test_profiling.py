@@ -0,0 +1,62 @@
+"""
+Tests for opt-in per-request profiling.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.config import settings
+from src.core.profiling import ProfilingMiddleware
+from src.main import app
+
+
+@pytest.fixture
+def profiling_settings(monkeypatch, tmp_path):
+    """Enable profiling with an admin token and a temporary profile directory."""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_profiled_request_is_stored_and_listed(profiling_settings, mock_openai_response, image_upload):
+    """A request with the admin header is profiled and appears in the index."""
+    profiled_client = TestClient(ProfilingMiddleware(app, path_prefix="/api/v1/receipts"))
+
+    response = profiled_client.post(
+        "/api/v1/receipts/process", files=image_upload((400, 600)), headers={"X-Profile": "secret"}
+    )
+    profile_id = response.headers["x-profile-id"]
+    assert (profiling_settings / f"{profile_id}.json").exists()
+    assert (profiling_settings / f"{profile_id}.folded").exists()
+
+    plain = profiled_client.post("/api/v1/receipts/process", files=image_upload((400, 600)))
+    assert "x-profile-id" not in plain.headers
+
+    client = TestClient(app)
+    index = client.get("/api/v1/admin/profiles", headers={"X-Profile": "secret"}).json()
+    assert [p["id"] for p in index] == [profile_id]
+
+    profile = client.get(f"/api/v1/admin/profiles/{profile_id}", headers={"X-Profile": "secret"}).json()
+    assert profile["path"] == "/api/v1/receipts/process"
+    assert profile["top_allocations"]
+
+
+def test_profile_index_requires_token(profiling_settings):
+    """The index rejects requests without the admin token."""
+    response = TestClient(app).get("/api/v1/admin/profiles")
+    assert response.status_code == 403
+
+
+def test_profile_index_refused_without_configured_token(profiling_settings, monkeypatch):
+    """Profiling without an admin token never serves profiles, even to tokenless requests."""
+    monkeypatch.setattr(settings, "PROFILING_ADMIN_TOKEN", "")
+    client = TestClient(app)
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+    assert client.get("/api/v1/admin/profiles/anything", headers={"X-Profile": ""}).status_code == 403
+
+
+def test_profile_index_hidden_when_disabled():
+    """With profiling disabled the admin endpoints are not found."""
+    response = TestClient(app).get("/api/v1/admin/profiles")
+    assert response.status_code == 404
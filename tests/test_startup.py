@@ -0,0 +1,52 @@
+"""
+Tests for application import time.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# New pods must take traffic within seconds; importing the app should leave
+# the heavy pieces to the lifespan warm-up
+IMPORT_TIME_BUDGET_S = 2.0
+LAZY_MODULES = (
+    "agents",
+    "openai",
+    "fitz",
+    "src.utils.graders",
+    "src.services.evaluation_pipeline",
+)
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _import_app() -> dict:
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "test-key")}
+    output = subprocess.run(
+        [sys.executable, "-c", _SCRIPT % (LAZY_MODULES,)],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_modules():
+    """Importing the app leaves the Agents SDK, PyMuPDF and the eval tooling unloaded."""
+    assert _import_app()["loaded"] == []
+
+
+def test_import_time_budget():
+    """Importing the app stays within the cold-start budget."""
+    # Best of two runs, so a cold disk cache doesn't fail the test
+    seconds = min(_import_app()["seconds"] for _ in range(2))
+    assert seconds < IMPORT_TIME_BUDGET_S
@@ -0,0 +1,116 @@
+"""
+Tests for the local stub model provider.
+"""
+import asyncio
+import io
+from pathlib import Path
+
+import httpx
+import pytest
+from agents import AgentOutputSchema
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from src.models.audit import AuditDecision, PackedTerseAuditResult
+from src.models.receipt import ReceiptDetails, ReceiptHeader
+from src.utils.stub_provider import StubConfig, create_stub_app
+
+GROUND_TRUTH_DIR = Path(__file__).parent.parent / "scripts" / "data" / "ground_truth"
+
+
+def _request_body(output_type, input_text="receipt"):
+    schema = AgentOutputSchema(output_type)
+    return {
+        "model": "gpt-4o-mini",
+        "instructions": "Extract the receipt.",
+        "input": [{"role": "user", "content": [{"type": "input_text", "text": input_text}]}],
+        "text": {"format": {
+            "type": "json_schema",
+            "name": "final_output",
+            "schema": schema.json_schema(),
+            "strict": True,
+        }},
+    }
+
+
+@pytest.fixture
+def stub_client():
+    """Stub provider with no latency or failures."""
+    config = StubConfig(latency_median_ms=0, ground_truth_dir=GROUND_TRUTH_DIR, seed=1)
+    return TestClient(create_stub_app(config))
+
+
+def test_stub_returns_schema_valid_outputs(stub_client):
+    """Each output type gets a payload that validates against its model."""
+    for output_type in (ReceiptDetails, ReceiptHeader, AuditDecision):
+        response = stub_client.post("/v1/responses", json=_request_body(output_type))
+        assert response.status_code == 200
+        data = response.json()
+        text = data["output"][0]["content"][0]["text"]
+        output_type.model_validate_json(text)
+        assert data["usage"]["total_tokens"] == (
+            data["usage"]["input_tokens"] + data["usage"]["output_tokens"]
+        )
+
+    stats = stub_client.get("/stub/stats").json()
+    assert stats["requests"] == 3
+    assert stats["by_output_type"]["ReceiptHeader"] == 1
+
+
+def test_stub_packed_audit_uses_receipt_ids(stub_client):
+    """Packed audits answer every receipt id in the input."""
+    body = _request_body(
+        PackedTerseAuditResult,
+        '<receipt id="r0">{}</receipt>\n<receipt id="r1">{}</receipt>',
+    )
+    response = stub_client.post("/v1/responses", json=body)
+    text = response.json()["output"][0]["content"][0]["text"]
+    result = PackedTerseAuditResult.model_validate_json(text)
+    assert [d.receipt_id for d in result.decisions] == ["r0", "r1"]
+
+
+def test_stub_injects_failures():
+    """Failure rates produce 429 and 500 responses."""
+    app = create_stub_app(StubConfig(
+        latency_median_ms=0,
+        rate_limit_rate=1.0,
+        ground_truth_dir=GROUND_TRUTH_DIR,
+    ))
+    response = TestClient(app).post("/v1/responses", json=_request_body(AuditDecision))
+    assert response.status_code == 429
+
+    app = create_stub_app(StubConfig(
+        latency_median_ms=0,
+        server_error_rate=1.0,
+        ground_truth_dir=GROUND_TRUTH_DIR,
+    ))
+    response = TestClient(app).post("/v1/responses", json=_request_body(AuditDecision))
+    assert response.status_code == 500
+
+
+def test_extraction_service_against_stub():
+    """The extraction service runs end to end against the stub provider."""
+    from src.core.provider import build_openai_client, get_openai_client, use_openai_client
+    from src.services.extraction import ExtractionService
+
+    app = create_stub_app(StubConfig(latency_median_ms=0, ground_truth_dir=GROUND_TRUTH_DIR))
+    http_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://stub"
+    )
+    client = build_openai_client(http_client=http_client)
+    client.base_url = "http://stub/v1/"
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), color="white").save(buffer, format="JPEG")
+
+    previous = get_openai_client()
+    use_openai_client(client)
+    try:
+        receipt = asyncio.run(
+            ExtractionService().extract_receipt_details(buffer.getvalue(), "receipt.jpg", model="gpt-4o-mini")
+        )
+    finally:
+        use_openai_client(previous)
+
+    assert receipt.merchant
+    assert app.state.provider.stats.by_output_type == {"ReceiptDetails": 1}
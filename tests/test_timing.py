@@ -0,0 +1,42 @@
+"""
+Tests for Server-Timing headers and the slow-request log.
+"""
+import json
+
+from src.core import timing
+from src.core.config import settings
+from src.utils.load_benchmark import parse_server_timing
+
+
+def test_process_returns_server_timing(client, mock_openai_response, image_upload):
+    """Receipt endpoints report stage durations in Server-Timing."""
+    response = client.post("/api/v1/receipts/process", files=image_upload((40, 60)))
+
+    stages = parse_server_timing(response.headers["server-timing"])
+    assert {"validation", "upload_read", "optimize", "total"} <= set(stages)
+    assert stages["total"] >= stages["optimize"]
+
+
+def test_health_has_no_server_timing(client):
+    """Non-receipt endpoints are not instrumented."""
+    response = client.get("/api/v1/health/")
+    assert "server-timing" not in response.headers
+
+
+def test_slow_requests_are_logged_with_metadata(client, mock_openai_response, image_upload, monkeypatch, tmp_path):
+    """Requests over the threshold are written to the slow-request log."""
+    log_path = tmp_path / "slow.jsonl"
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0.0)
+    monkeypatch.setattr(settings, "SLOW_REQUEST_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "SLOW_REQUEST_LOG_PATH", str(log_path))
+    timing.close_slow_request_log()
+
+    client.post("/api/v1/receipts/process", params={"extraction_model": "gpt-4o"}, files=image_upload((40, 60)))
+    timing.close_slow_request_log()
+
+    record = json.loads(log_path.read_text().splitlines()[0])
+    assert record["path"] == "/api/v1/receipts/process"
+    assert record["status"] == 200
+    assert record["extraction_model"] == "gpt-4o"
+    assert record["image_width"] == 40 and record["image_height"] == 60
+    assert "optimize" in record["stages_ms"]
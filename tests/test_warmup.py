@@ -0,0 +1,41 @@
+"""
+Tests for the startup warm-up.
+"""
+import asyncio
+
+from src.core.agent_cache import get_agent
+from src.services import warmup
+
+
+def test_warmup_runs_steps():
+    """Warm-up builds the agents and exercises the image and PDF paths."""
+    get_agent.cache_clear()
+    status = asyncio.run(warmup.run_warmup(["agents", "images", "pdf"]))
+
+    assert status["status"] == "complete"
+    assert {step: result["status"] for step, result in status["steps"].items()} == {
+        "agents": "ok", "images": "ok", "pdf": "ok"
+    }
+    assert get_agent.cache_info().currsize >= 5
+
+
+def test_failed_step_does_not_block_readiness(monkeypatch):
+    """A failing step is recorded and warm-up still completes."""
+    async def fail():
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(warmup._STEP_FUNCTIONS, "pdf", fail)
+    status = asyncio.run(warmup.run_warmup(["pdf"]))
+
+    assert status["status"] == "complete"
+    assert status["steps"]["pdf"] == {"status": "failed", "error": "boom", "ms": status["steps"]["pdf"]["ms"]}
+    assert warmup.warmup_complete()
+
+
+def test_readiness_waits_for_warmup(client, monkeypatch):
+    """Readiness reports not ready while warm-up hasn't finished."""
+    monkeypatch.setattr(warmup, "_state", {"status": "running", "steps": {}})
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 503
+    assert "warming_up" in response.json()["problems"]